@@ -1,17 +1,34 @@
 """
 Waste Management System - Flask Backend
-Query Logging: All UPDATE/DELETE queries are logged to database/schema.sql
+Query Logging: All INSERT/UPDATE/DELETE queries are logged to database/audit_log/ (NDJSON segments)
 Fixed: Connection pooling, proper error handling, async logging
 """
-from flask import Flask, render_template, request, jsonify
-import mysql.connector
-from mysql.connector import Error, pooling
+from flask import Flask, render_template, request, jsonify, Response, g, has_app_context, has_request_context
+from mysql.connector import Error
+import hashlib
 import json
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 import os
+import random
 import threading
 import time
 
+from audit_log import AuditLogWriter, SegmentedLog
+from batch_jobs import DbCheckpoints, KeyRangeJob, PeriodicJob
+from cache import TTLCache, TableVersions, SharedTableVersions, EntityCache
+from db_pool import ConnectionManager
+from metrics import Registry, SIZE_BUCKETS, statement_key
+from profiler import SamplingProfiler, collapsed, speedscope
+from slow_queries import SlowQueryLog
+import numpy as np
+
+from forecast import forecast, rank
+from prefork import DEFAULT_BIND, parse_bind
+from scheduler import bin_demand, crew_capacity, assign, release_busy
+from fill_history import ROLLUPS, rollup_rows, parse_step, choose_resolution, partition_plan
+from telemetry import ReadingCoalescer, bin_status
+
 # Get the absolute path to the backend directory
 BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
@@ -47,21 +64,98 @@ DB_CONFIG = {
     'database': 'waste_management'
 }
 
-# Create connection pool (reuse connections, avoid crashes)
-try:
-    cnx_pool = pooling.MySQLConnectionPool(
-        pool_name="waste_pool",
-        pool_size=5,
-        pool_reset_session=True,
-        autocommit=False,
-        connection_timeout=10,
-        **DB_CONFIG
-    )
-except Exception as e:
-    print(f"⚠️ Connection pool error: {e}")
-    cnx_pool = None
-
-# Schema file path for logging queries (from project root, not backend/)
+# ===== METRICS (exported on /metrics) =====
+
+metrics_registry = Registry()
+http_requests = metrics_registry.counter(
+    'http_requests_total', 'Requests handled', ('method', 'route', 'status'))
+http_duration = metrics_registry.histogram(
+    'http_request_duration_seconds', 'Time to build the response', ('method', 'route'))
+http_response_size = metrics_registry.histogram(
+    'http_response_size_bytes', 'Response body size (streamed responses are not counted)',
+    ('method', 'route'), buckets=SIZE_BUCKETS)
+sql_duration = metrics_registry.histogram(
+    'sql_statement_duration_seconds', 'Execute + fetch time per statement fingerprint',
+    ('statement', 'verb', 'table'))
+sql_errors = metrics_registry.counter(
+    'sql_statement_errors_total', 'Statements that raised a database error', ('statement', 'verb', 'table'))
+db_retries = metrics_registry.counter(
+    'db_retries_total', 'Attempts retried by the max_retries loops', ('function',))
+db_unavailable = metrics_registry.counter(
+    'db_unavailable_total', 'Calls that got no database connection', ('function',))
+pool_wait = metrics_registry.histogram(
+    'db_pool_checkout_wait_seconds', 'Time to check out a pooled connection (including connect/ping)')
+
+# Distinct statement fingerprints get their own series up to this many; the rest share 'other'
+SQL_METRICS_MAX_STATEMENTS = int(os.environ.get('SQL_METRICS_MAX_STATEMENTS', 500))
+sql_statements = {}     # fingerprint -> normalized statement text
+
+def record_sql(query, started, failed=False, params=None, rows=None):
+    """Record one statement's execute + fetch time (started is a perf_counter value)
+
+    Statements over SLOW_QUERY_MS also go to the slow query log with their parameters.
+    """
+    elapsed = time.perf_counter() - started
+    (statement, verb, table), text = statement_key(query)
+    if statement not in sql_statements:
+        if len(sql_statements) < SQL_METRICS_MAX_STATEMENTS:
+            sql_statements[statement] = text
+        else:
+            statement = 'other'
+    sql_duration.observe(elapsed, statement, verb, table)
+    if failed:
+        sql_errors.inc(statement, verb, table)
+    if elapsed >= slow_query_log.threshold:
+        route = request.url_rule.rule if has_request_context() and request.url_rule else None
+        slow_query_log.record(elapsed, statement, verb, text, query, params, rows, route)
+
+# Connection manager: connections are opened lazily, so a database that is down at
+# startup doesn't break the app; exhausted-pool callers wait up to POOL_CHECKOUT_TIMEOUT
+db_pool = ConnectionManager(
+    DB_CONFIG,
+    min_size=int(os.environ.get('POOL_SIZE', 5)),
+    max_size=int(os.environ.get('POOL_MAX_SIZE', 20)),
+    checkout_timeout=float(os.environ.get('POOL_CHECKOUT_TIMEOUT', 5)),
+    validate_after=float(os.environ.get('POOL_VALIDATE_AFTER', 5)),
+    idle_timeout=float(os.environ.get('POOL_IDLE_TIMEOUT', 300)),
+    connect_kwargs={'connection_timeout': int(os.environ.get('CONNECTION_TIMEOUT', 10))},
+    on_checkout=pool_wait.observe
+)
+
+# ===== SLOW QUERY LOG (ring buffer at /debug/slow-queries + rotating NDJSON file) =====
+
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', 'True').lower() in ('1', 'true', 'yes')
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+SLOW_QUERY_FILE = os.path.abspath(os.environ.get('SLOW_QUERY_FILE', os.path.join(PROJECT_ROOT, 'logs', 'slow_queries.ndjson')))
+SLOW_QUERY_EXPLAIN_TIMEOUT = float(os.environ.get('SLOW_QUERY_EXPLAIN_TIMEOUT', 1))
+
+def explain_query(query, params):
+    """EXPLAIN FORMAT=JSON plan of a statement, on its own pooled connection"""
+    conn = db_pool.get_connection(timeout=SLOW_QUERY_EXPLAIN_TIMEOUT)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("EXPLAIN FORMAT=JSON " + query, params or None)
+        row = cursor.fetchone()
+        cursor.close()
+        return json.loads(row[0]) if row else None
+    except Error as e:
+        conn.note_error(e)
+        raise
+    finally:
+        conn.close()
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=SLOW_QUERY_MS if SLOW_QUERY_LOG else float('inf'),
+    capacity=int(os.environ.get('SLOW_QUERY_BUFFER', 200)),
+    path=SLOW_QUERY_FILE,
+    max_bytes=int(os.environ.get('SLOW_QUERY_FILE_BYTES', 10 * 1024 * 1024)),
+    backups=int(os.environ.get('SLOW_QUERY_FILE_BACKUPS', 5)),
+    explain=explain_query if os.environ.get('SLOW_QUERY_EXPLAIN', 'True').lower() in ('1', 'true', 'yes') else None,
+    explain_interval=float(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL', 300)),
+    log_params=os.environ.get('SLOW_QUERY_LOG_PARAMS', 'True').lower() in ('1', 'true', 'yes')
+)
+
+# Schema file path (bootstrap only - writes are no longer appended to it)
 SCHEMA_FILE = os.path.join(PROJECT_ROOT, 'database', 'schema.sql')
 SCHEMA_FILE = os.path.abspath(SCHEMA_FILE)  # Resolve to absolute path
 
@@ -70,104 +164,144 @@ if not os.path.exists(os.path.dirname(SCHEMA_FILE)):
 else:
     print(f"✅ Database directory found at: {os.path.dirname(SCHEMA_FILE)}")
 
+# Audit trail of frontend writes: rotating NDJSON segments (replay with replay_audit_log.py)
+AUDIT_LOG_DIR = os.path.abspath(os.environ.get('AUDIT_LOG_DIR', os.path.join(PROJECT_ROOT, 'database', 'audit_log')))
+
+# Single background writer for the query log (bounded queue, batched appends)
+audit_log = AuditLogWriter(
+    SegmentedLog(
+        AUDIT_LOG_DIR,
+        max_bytes=int(os.environ.get('AUDIT_LOG_SEGMENT_BYTES', 64 * 1024 * 1024)),
+        max_age=float(os.environ.get('AUDIT_LOG_SEGMENT_SECONDS', 3600)),
+        compress=os.environ.get('AUDIT_LOG_COMPRESS', 'True').lower() in ('1', 'true', 'yes')
+    ),
+    max_queue=int(os.environ.get('AUDIT_LOG_QUEUE_SIZE', 10000)),
+    batch_size=int(os.environ.get('AUDIT_LOG_BATCH_SIZE', 500)),
+    flush_interval=float(os.environ.get('AUDIT_LOG_FLUSH_INTERVAL', 0.2))
+).start()
+
 # ===== DATABASE HELPER FUNCTIONS =====
 
-def log_query_to_schema_async(query_text, params, operation_type, table_name):
-    """Log UPDATE/DELETE/INSERT queries to schema.sql with actual values (async, non-blocking)"""
-    def async_log():
-        try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Convert parameterized query to actual SQL with values
-            formatted_query = query_text.strip()
-            
-            if params:
-                # Replace %s placeholders with actual values
-                param_list = list(params) if params else []
-                for param in param_list:
-                    if isinstance(param, str):
-                        # Escape single quotes in strings
-                        escaped = param.replace("'", "\\'")
-                        formatted_query = formatted_query.replace('%s', f"'{escaped}'", 1)
-                    elif isinstance(param, (int, float)):
-                        formatted_query = formatted_query.replace('%s', str(param), 1)
-                    elif param is None:
-                        formatted_query = formatted_query.replace('%s', 'NULL', 1)
-                    else:
-                        formatted_query = formatted_query.replace('%s', str(param), 1)
-            
-            if not formatted_query.endswith(';'):
-                formatted_query += ';'
-            
-            # Create detailed log entry with timestamp and operation info
-            log_entry = f"\n-- ========================================\n"
-            log_entry += f"-- FRONTEND AUTO-SAVE: {operation_type} Operation\n"
-            log_entry += f"-- Table: {table_name}\n"
-            log_entry += f"-- Timestamp: {timestamp}\n"
-            log_entry += f"-- Status: Successfully executed and logged\n"
-            log_entry += f"-- ========================================\n"
-            log_entry += f"{formatted_query}\n"
-            
-            # Ensure schema file exists
-            if os.path.exists(SCHEMA_FILE):
-                with open(SCHEMA_FILE, 'a') as f:
-                    f.write(log_entry)
-                print(f"✅ Query auto-saved to schema.sql: {operation_type} on {table_name}")
-            else:
-                print(f"⚠️ Schema file not found at: {SCHEMA_FILE}")
-        except Exception as e:
-            print(f"⚠️ Query auto-save error: {e}")
-    
-    # Log in background thread (don't block request)
-    thread = threading.Thread(target=async_log, daemon=True)
-    thread.start()
+def log_queries_async(query_text, params_list, operation_type, table_name):
+    """Queue a batch of writes sharing one statement for the audit log writer (non-blocking)"""
+    audit_log.submit(query_text, params_list, operation_type, table_name)
+
+def log_query_async(query_text, params, operation_type, table_name):
+    """Log an UPDATE/DELETE/INSERT with its actual parameter values (async, non-blocking)"""
+    log_queries_async(query_text, [params], operation_type, table_name)
 
 def get_db_connection():
-    """Get database connection from pool (with retry logic)"""
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            if cnx_pool:
-                conn = cnx_pool.get_connection()
-                # Test connection (reconnect if needed)
-                if conn:
-                    try:
-                        conn.ping(reconnect=True, attempts=1, delay=0)
-                    except:
-                        conn.close()
-                        conn = cnx_pool.get_connection()
-                return conn
-            else:
-                # Fallback if pool failed
-                return mysql.connector.connect(**DB_CONFIG)
-        except Error as e:
-            if attempt < max_retries - 1:
-                print(f"⚠️ Database connection attempt {attempt + 1} failed, retrying...")
-                import time
-                time.sleep(1)
-            else:
-                print(f"⚠️ Database Connection Error after {max_retries} attempts: {e}")
+    """Check out a pooled connection (waits for a free one up to the checkout deadline)"""
+    try:
+        return db_pool.get_connection()
+    except Error as e:
+        print(f"⚠️ Database Connection Error: {e}")
     return None
 
+# Outside an app context (background threads) a transaction() keeps its connection here
+_db_local = threading.local()
+
+def _db_state():
+    """Holder for the scoped connection: flask.g inside a request/app context, else per-thread"""
+    return g if has_app_context() else _db_local
+
+def acquire_connection():
+    """Return (connection, scoped)
+
+    Inside a request the connection is checked out once, stored on flask.g and reused by
+    every query until teardown (scoped=True). Elsewhere each call gets its own pooled
+    connection, unless a transaction() block is active on this thread.
+    """
+    state = _db_state()
+    conn = getattr(state, 'db_conn', None)
+    if conn is not None:
+        return conn, True
+    conn = get_db_connection()
+    if conn is not None and has_app_context():
+        g.db_conn = conn
+        return conn, True
+    return conn, False
+
+def release_request_connection(exc=None):
+    """Hand the scoped connection back to the pool (rolls back anything uncommitted)"""
+    state = _db_state()
+    conn = getattr(state, 'db_conn', None)
+    state.db_conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+@app.teardown_appcontext
+def teardown_db(exc):
+    release_request_connection(exc)
+
+def in_transaction():
+    return getattr(_db_state(), 'db_tx_depth', 0) > 0
+
+@contextmanager
+def transaction():
+    """Group several execute_update calls into one atomic commit on the scoped connection
+
+        with transaction():
+            execute_update("INSERT INTO Bill ...", params)
+            execute_update("UPDATE Citizen ...", params)
+
+    Inside the block execute_update does not commit and raises on errors; the block commits
+    on success and rolls back on any exception. Cache invalidation and audit logging for the
+    statements run only after the commit. Nested blocks join the outermost transaction.
+    """
+    state = _db_state()
+    owns_connection = getattr(state, 'db_conn', None) is None and not has_app_context()
+    conn, _ = acquire_connection()
+    if conn is None:
+        raise Error("No database connection")
+    if owns_connection:
+        state.db_conn = conn
+    depth = getattr(state, 'db_tx_depth', 0)
+    state.db_tx_depth = depth + 1
+    if depth == 0:
+        state.db_pending_writes = []
+    try:
+        yield conn
+        if depth == 0:
+            conn.commit()
+            for query, params, op_type, table_name in state.db_pending_writes:
+                notify_table_write(table_name, op_type)
+                log_query_async(query, params, op_type, table_name)
+    except Exception:
+        if depth == 0:
+            try:
+                conn.rollback()
+            except Error:
+                pass
+        raise
+    finally:
+        state.db_tx_depth = depth
+        if depth == 0:
+            state.db_pending_writes = []
+            if owns_connection:
+                release_request_connection()
+
 def execute_query(query, params=None, fetch_all=True):
-    """Execute SELECT query with connection pooling and error recovery"""
+    """Execute SELECT query on the request's connection (or a pooled one) with error recovery"""
     conn = None
+    scoped = False
     max_retries = 2
     
     for attempt in range(max_retries):
+        started = None
         try:
-            conn = get_db_connection()
+            conn, scoped = acquire_connection()
             if not conn:
+                # get_db_connection already waited up to the pool checkout deadline
                 print(f"⚠️ Query execution failed: No database connection")
-                if attempt < max_retries - 1:
-                    time.sleep(1)
-                    continue
+                db_unavailable.inc('execute_query')
                 return [] if fetch_all else None
             
             cursor = conn.cursor(dictionary=True)
-            
-            # Set reasonable timeout (30 seconds)
-            conn.connection_timeout = 30
+            started = time.perf_counter()
             
             if params:
                 cursor.execute(query, params)
@@ -175,144 +309,993 @@ def execute_query(query, params=None, fetch_all=True):
                 cursor.execute(query)
             
             result = cursor.fetchall() if fetch_all else cursor.fetchone()
+            record_sql(query, started, params=params, rows=len(result) if fetch_all else int(result is not None))
             cursor.close()
             return result if result else ([] if fetch_all else None)
             
         except Error as e:
             print(f"⚠️ Query Execution Error (attempt {attempt + 1}): {e}")
+            if conn:
+                conn.note_error(e)
+            if started is not None:
+                record_sql(query, started, failed=True, params=params)
+            if in_transaction():
+                raise
+            if scoped:
+                # Don't retry on a connection that may be broken - take a fresh one
+                release_request_connection()
             if attempt < max_retries - 1:
+                db_retries.inc('execute_query')
                 time.sleep(1)
         finally:
-            if conn:
-                try:
-                    if conn.is_connected():
-                        conn.close()
-                except:
-                    pass
+            if conn and not scoped:
+                # Always hand it back: the pool discards broken connections and frees their slot
+                conn.close()
     
     return [] if fetch_all else None
 
-def execute_update(query, params):
-    """Execute INSERT, UPDATE, DELETE with connection pooling and error recovery"""
+def parse_write_query(query):
+    """Return (operation type, table name) for an INSERT/UPDATE/DELETE statement"""
+    query_upper = query.strip().upper()
+    words = query.split()
+    if query_upper.startswith('UPDATE'):
+        op_type = "UPDATE"
+        table_name = words[1] if len(words) > 1 else "Unknown"
+    elif query_upper.startswith('DELETE'):
+        op_type = "DELETE"
+        table_name = query.split('FROM')[1].split()[0] if 'FROM' in query else "Unknown"
+    else:
+        op_type = "INSERT"
+        table_name = words[2] if len(words) > 2 else "Unknown"
+    return op_type, table_name.split('(')[0]
+
+# ON DELETE CASCADE / SET NULL children per table (see database/schema.sql foreign keys)
+CASCADE_TABLES = {
+    'Area': ['Citizen', 'Bins', 'Crew', 'Has_Schedule', 'Collection_Schedule'],
+    'Citizen': ['Waste', 'Bill', 'Payment'],
+    'Crew': ['Has_Schedule', 'Assigned'],
+    'Staff': ['Assigned'],
+    'Bill': ['Payment'],
+}
+
+def affected_tables(table_name, op_type):
+    """Tables whose contents can change when op_type runs on table_name (follows cascades on DELETE)"""
+    tables = [table_name]
+    if op_type == "DELETE":
+        for table in tables:
+            for child in CASCADE_TABLES.get(table, []):
+                if child not in tables:
+                    tables.append(child)
+    return tables
+
+def notify_table_write(table_name, op_type="UPDATE"):
+    """Invalidate cached reads that depend on table_name (called after every committed write)"""
+    tables = affected_tables(table_name, op_type)
+    for table in tables:
+        table_versions.bump(table)
+    if DASHBOARD_TABLES.intersection(tables):
+        dashboard_cache.invalidate()
+
+def execute_update(query, params, audited=True):
+    """Execute INSERT, UPDATE, DELETE on the request's connection (or a pooled one) with error recovery
+
+    audited=False writes derived data: it joins transaction() as usual but is neither
+    audit-logged nor invalidates caches, like execute_maintenance.
+    """
     conn = None
+    scoped = False
     max_retries = 2
     
     for attempt in range(max_retries):
+        started = None
         try:
-            conn = get_db_connection()
+            conn, scoped = acquire_connection()
             if not conn:
+                # get_db_connection already waited up to the pool checkout deadline
                 print(f"⚠️ Update execution failed: No database connection")
-                if attempt < max_retries - 1:
-                    time.sleep(1)
-                    continue
+                db_unavailable.inc('execute_update')
                 return False
             
             cursor = conn.cursor()
-            
-            # Set reasonable timeout (30 seconds)
-            conn.connection_timeout = 30
-            
+            started = time.perf_counter()
             cursor.execute(query, params)
-            conn.commit()
+            record_sql(query, started, params=params, rows=cursor.rowcount)
             
-            # Determine operation type for logging
-            query_upper = query.strip().upper()
-            if query_upper.startswith('UPDATE'):
-                op_type = "UPDATE"
-                table_name = query.split()[1] if len(query.split()) > 1 else "Unknown"
-            elif query_upper.startswith('DELETE'):
-                op_type = "DELETE"
-                match = query.split('FROM')[1].split()[0] if 'FROM' in query else "Unknown"
-                table_name = match
-            else:
-                op_type = "INSERT"
-                table_name = query.split()[2] if len(query.split()) > 2 else "Unknown"
+            # Determine operation type for logging and cache invalidation
+            op_type, table_name = parse_write_query(query)
+            
+            if in_transaction():
+                # Committed (then invalidated and logged) when the transaction() block ends
+                if audited:
+                    _db_state().db_pending_writes.append((query, params, op_type, table_name))
+                cursor.close()
+                return True
             
-            # Log asynchronously (non-blocking) with actual parameter values
-            log_query_to_schema_async(query, params, op_type, table_name)
+            conn.commit()
+            if audited:
+                notify_table_write(table_name, op_type)
+                
+                # Log asynchronously (non-blocking) with actual parameter values
+                log_query_async(query, params, op_type, table_name)
             
             cursor.close()
             return True
             
         except Error as e:
             print(f"⚠️ Update Execution Error (attempt {attempt + 1}): {e}")
+            if conn:
+                conn.note_error(e)
+            if started is not None:
+                record_sql(query, started, failed=True, params=params)
+            if in_transaction():
+                raise
+            if scoped:
+                release_request_connection()
             if attempt < max_retries - 1:
+                db_retries.inc('execute_update')
                 time.sleep(1)
         finally:
-            if conn:
-                try:
-                    if conn.is_connected():
-                        conn.close()
-                except:
-                    pass
+            if conn and not scoped:
+                # Always hand it back: the pool discards broken connections and frees their slot
+                conn.close()
     
     return False
 
+def execute_bulk(query, params_list, chunk_size=1000):
+    """Execute one INSERT/UPDATE statement for many rows with executemany, committing per chunk
+
+    Returns one (success, error) tuple per row. If a chunk fails as a whole it is rolled back
+    and replayed row by row in a single transaction so only the offending rows are rejected.
+    """
+    results = [(False, 'No database connection')] * len(params_list)
+    conn = get_db_connection()
+    if not conn:
+        print(f"⚠️ Bulk execution failed: No database connection")
+        db_unavailable.inc('execute_bulk')
+        return results
+    
+    op_type, table_name = parse_write_query(query)
+    written = False
+    try:
+        cursor = conn.cursor()
+        for start in range(0, len(params_list), chunk_size):
+            chunk = params_list[start:start + chunk_size]
+            started = time.perf_counter()
+            try:
+                cursor.executemany(query, chunk)
+                conn.commit()
+                record_sql(query, started, params=chunk[0], rows=len(chunk))
+                results[start:start + len(chunk)] = [(True, None)] * len(chunk)
+                log_queries_async(query, chunk, op_type, table_name)
+                written = True
+                continue
+            except Error as e:
+                record_sql(query, started, failed=True, params=chunk[0], rows=len(chunk))
+                conn.rollback()
+                print(f"⚠️ Bulk chunk at row {start} failed, retrying row by row: {e}")
+                db_retries.inc('execute_bulk')
+            
+            ok_rows = []
+            for offset, params in enumerate(chunk):
+                try:
+                    cursor.execute(query, params)
+                    results[start + offset] = (True, None)
+                    ok_rows.append(params)
+                except Error as e:
+                    results[start + offset] = (False, str(e))
+            conn.commit()
+            if ok_rows:
+                log_queries_async(query, ok_rows, op_type, table_name)
+                written = True
+        cursor.close()
+    except Error as e:
+        print(f"⚠️ Bulk Execution Error: {e}")
+        conn.note_error(e)
+        try:
+            conn.rollback()
+        except Error:
+            pass
+    finally:
+        if written:
+            notify_table_write(table_name, op_type)
+        conn.close()
+    
+    return results
+
+# ===== ENTITY CACHE (reference data & dropdown lists) =====
+
+ENTITY_CACHE_SIZE = int(os.environ.get('ENTITY_CACHE_SIZE', 256))
+ENTITY_CACHE_TTL = float(os.environ.get('ENTITY_CACHE_TTL', 300))
+# Shared by every process on this host (prefork workers, run_batch_jobs.py) so a write in
+# one invalidates the cached reads of all; empty = per-process counters (single process only)
+TABLE_VERSIONS_FILE = os.environ.get('TABLE_VERSIONS_FILE', os.path.join(PROJECT_ROOT, 'logs', 'table_versions.bin'))
+
+def open_table_versions(path):
+    if path:
+        try:
+            return SharedTableVersions(os.path.abspath(path))
+        except OSError as e:
+            print(f"⚠️  Could not map {path} ({e}); cache invalidation is per process")
+    return TableVersions()
+
+table_versions = open_table_versions(TABLE_VERSIONS_FILE)
+entity_cache = EntityCache(table_versions, max_entries=ENTITY_CACHE_SIZE, ttl=ENTITY_CACHE_TTL)
+
+def cached_json_response(query, tables, params=None):
+    """Serve a read-only query as JSON from the entity cache, answering If-None-Match with 304
+
+    The ETag is a hash of the body and is only honoured against a live cache entry (within
+    ENTITY_CACHE_TTL, source table versions unchanged) or a fresh read, so an expired or
+    written-to list is always re-read before a client is told it is unchanged.
+    """
+    key = (query, params)
+    versions = table_versions.snapshot(tables)
+    entry = entity_cache.get(key, tables)
+    if entry is None:
+        results = execute_query(query, params)
+        body = app.json.dumps(results)
+        entry = (body, hashlib.blake2b(body.encode(), digest_size=8).hexdigest())
+        # Empty results may mean the database was unreachable - don't pin them in the cache
+        if results:
+            entity_cache.set(key, tables, entry, versions)
+    
+    body, etag = entry
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
+# ===== LIST PAGINATION & STREAMING =====
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+STREAM_CHUNK_SIZE = 500
+
+def build_select(select_from, conditions=None, group_by=None, order_by=None, limit=False):
+    """Assemble a SELECT from its base SELECT ... FROM ... JOIN part plus optional clauses"""
+    query = select_from
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if group_by:
+        query += " GROUP BY " + group_by
+    if order_by:
+        query += " ORDER BY " + order_by
+    if limit:
+        query += " LIMIT %s"
+    return query
+
+def fetch_page(select_from, key_column, after=None, limit=DEFAULT_PAGE_LIMIT,
+               conditions=None, params=None, group_by=None):
+    """Fetch one keyset page: WHERE key > after ORDER BY key LIMIT n (uses the primary key index)"""
+    conditions = list(conditions or [])
+    params = list(params or [])
+    if after is not None:
+        conditions.append(f"{key_column} > %s")
+        params.append(after)
+    params.append(limit)
+    query = build_select(select_from, conditions, group_by, order_by=key_column, limit=True)
+    return execute_query(query, tuple(params))
+
+def iter_pages(select_from, key_column, after=None, chunk_size=STREAM_CHUNK_SIZE,
+               conditions=None, params=None, group_by=None):
+    """Yield keyset pages (lists of rows) so only one chunk is ever held in memory"""
+    key_field = key_column.split('.')[-1]
+    while True:
+        rows = fetch_page(select_from, key_column, after, chunk_size, conditions, params, group_by)
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        after = rows[-1][key_field]
+
+def stream_json_array(pages):
+    """Write pages of rows out as a JSON array incrementally (one response chunk per page)"""
+    yield '['
+    first = True
+    for rows in pages:
+        chunk = ','.join(app.json.dumps(row) for row in rows)
+        if first:
+            first = False
+            yield chunk
+        else:
+            yield ',' + chunk
+    yield ']'
+
+# ===== LIST FILTERS, SORTING & SEARCH =====
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+# Filter operators: (SQL template, value converter)
+FILTER_OPS = {
+    'eq': ('{col} = %s', None),
+    'gte': ('{col} >= %s', None),
+    'lte': ('{col} <= %s', None),
+    # Whole-day upper bound that still works on TIMESTAMP columns: col < day + 1
+    'until': ('{col} < %s', lambda day: day + timedelta(days=1)),
+    # Prefix search can use a B-tree index, unlike '%term%'
+    'prefix': ('{col} LIKE %s', lambda term: term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'),
+}
+
+# entity -> {query arg: (column, operator, type)}; only these args reach the SQL
+LIST_FILTERS = {
+    'citizens': {'area_id': ('c.area_id', 'eq', int), 'q': ('c.name', 'prefix', str)},
+    'areas': {'q': ('area_name', 'prefix', str), 'min_population': ('population', 'gte', int)},
+    'crew': {'area_id': ('cr.area_id', 'eq', int), 'q': ('cr.team_name', 'prefix', str)},
+    'waste': {
+        'status': ('w.status', 'eq', str), 'category': ('w.category', 'eq', str),
+        'waste_type': ('w.waste_type', 'eq', str), 'citizen_id': ('w.citizen_id', 'eq', int),
+        'from': ('w.collection_date', 'gte', parse_date), 'to': ('w.collection_date', 'until', parse_date),
+        'min_weight': ('w.weight', 'gte', float), 'max_weight': ('w.weight', 'lte', float),
+        'q': ('w.name', 'prefix', str),
+    },
+    'bins': {
+        'status': ('b.status', 'eq', str), 'area_id': ('b.area_id', 'eq', int),
+        'min_fill': ('b.fill_level', 'gte', int), 'max_fill': ('b.fill_level', 'lte', int),
+        'q': ('b.bin_number', 'prefix', str),
+    },
+    'bills': {
+        'status': ('b.status', 'eq', str), 'citizen_id': ('b.citizen_id', 'eq', int),
+        'due_from': ('b.due_date', 'gte', parse_date), 'due_to': ('b.due_date', 'lte', parse_date),
+        'min_amount': ('b.amount', 'gte', float), 'max_amount': ('b.amount', 'lte', float),
+        'q': ('b.bill_number', 'prefix', str),
+    },
+    'payments': {
+        'citizen_id': ('p.citizen_id', 'eq', int), 'bill_id': ('p.bill_id', 'eq', int),
+        'method': ('p.method', 'eq', str),
+        'from': ('p.payment_date', 'gte', parse_date), 'to': ('p.payment_date', 'lte', parse_date),
+    },
+    'schedules': {
+        'area_id': ('hs.area_id', 'eq', int), 'crew_id': ('hs.crew_id', 'eq', int),
+        'from': ('hs.schedule_date', 'gte', parse_date), 'to': ('hs.schedule_date', 'lte', parse_date),
+    },
+    'staff': {'status': ('status', 'eq', str), 'position': ('position', 'eq', str), 'q': ('staff_name', 'prefix', str)},
+    'assignments': {
+        'crew_id': ('a.crew_id', 'eq', int), 'staff_id': ('a.staff_id', 'eq', int), 'status': ('a.status', 'eq', str),
+    },
+    'outstanding': {
+        'area_id': ('c.area_id', 'eq', int), 'min_outstanding': ('cb.outstanding', 'gte', float),
+    },
+}
+
+# entity -> {sort arg: column}
+LIST_SORTS = {
+    'citizens': {'name': 'c.name', 'citizen_id': 'c.citizen_id'},
+    'areas': {'area_name': 'area_name', 'population': 'population'},
+    'crew': {'team_name': 'cr.team_name', 'team_size': 'cr.team_size'},
+    'waste': {'collection_date': 'w.collection_date', 'weight': 'w.weight', 'waste_id': 'w.waste_id'},
+    'bins': {'fill_level': 'b.fill_level', 'bin_number': 'b.bin_number', 'bin_id': 'b.bin_id'},
+    'bills': {'due_date': 'b.due_date', 'amount': 'b.amount', 'bill_id': 'b.bill_id'},
+    'payments': {'payment_date': 'p.payment_date', 'amount': 'p.amount', 'payment_id': 'p.payment_id'},
+    'schedules': {'schedule_date': 'hs.schedule_date', 'schedule_id': 'hs.schedule_id'},
+    'staff': {'staff_name': 'staff_name', 'staff_id': 'staff_id'},
+    'assignments': {'assignment_date': 'a.assignment_date', 'team_name': 'c.team_name, s.staff_name'},
+    'outstanding': {'outstanding': 'cb.outstanding', 'billed': 'cb.billed'},
+}
+
+def parse_list_filters(entity):
+    """Translate whitelisted query args into (WHERE conditions, params); ValueError on bad values"""
+    conditions, params = [], []
+    for arg, (column, op, convert) in LIST_FILTERS.get(entity, {}).items():
+        raw = request.args.get(arg)
+        if raw is None or raw == '':
+            continue
+        try:
+            value = convert(raw)
+        except ValueError:
+            raise ValueError(f"Invalid value for '{arg}': {raw}")
+        template, transform = FILTER_OPS[op]
+        conditions.append(template.format(col=column))
+        params.append(transform(value) if transform else value)
+    return conditions, params
+
+def parse_list_sort(entity, key_column):
+    """ORDER BY clause for ?sort=<field>&order=asc|desc, ties broken by the key; None if unsorted"""
+    sort = request.args.get('sort')
+    if not sort:
+        return None
+    column = LIST_SORTS.get(entity, {}).get(sort)
+    if column is None:
+        raise ValueError(f"Unsupported sort field: {sort}")
+    direction = 'DESC' if request.args.get('order', 'asc').lower() == 'desc' else 'ASC'
+    columns = [f"{part.strip()} {direction}" for part in column.split(',')]
+    return ', '.join(columns + [key_column])
+
+def parse_page_args():
+    """(after, limit) from the query string; raises ValueError on values that aren't valid"""
+    after = request.args.get('after')
+    limit = request.args.get('limit')
+    try:
+        after = int(after) if after is not None else None
+    except ValueError:
+        raise ValueError(f"Invalid 'after': {after} (expected an integer id)")
+    try:
+        limit = int(limit) if limit is not None else None
+    except ValueError:
+        limit = 0
+    if limit is not None and limit < 1:
+        raise ValueError(f"Invalid 'limit': {request.args['limit']} (expected an integer from 1 to {MAX_PAGE_LIMIT})")
+    return after, limit
+
+def list_response(select_from, key_column, default_order=None, group_by=None, cache_tables=None, entity=None):
+    """Serve a collection GET.
+
+    No query args   -> full list (unchanged behaviour used by the templates)
+    ?after=&limit=  -> one keyset page: {"data": [...], "next_after": <id or null>}
+    ?stream=1       -> whole collection streamed as a JSON array in keyset chunks
+    ?sort=&order=   -> list ordered by a whitelisted field (top N with ?limit=)
+
+    Filters from LIST_FILTERS[entity] apply in every mode. With cache_tables the
+    unpaginated list is served through the entity cache (reference data).
+    """
+    stream = request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+    try:
+        after, limit = parse_page_args()
+        conditions, params = parse_list_filters(entity)
+        sort_order = parse_list_sort(entity, key_column)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if sort_order and (after is not None or stream):
+        return jsonify({'success': False, 'error': "'sort' can't be combined with 'after' or 'stream'"}), 400
+
+    if stream:
+        pages = iter_pages(select_from, key_column, after, conditions=conditions, params=params, group_by=group_by)
+        return Response(stream_json_array(pages), mimetype='application/json')
+
+    if sort_order or (after is None and limit is None):
+        query = build_select(select_from, conditions, group_by, order_by=sort_order or default_order,
+                             limit=limit is not None)
+        if limit is not None:
+            params.append(min(limit, MAX_PAGE_LIMIT))
+        params = tuple(params) or None
+        if cache_tables:
+            return cached_json_response(query, cache_tables, params)
+        return jsonify(execute_query(query, params))
+
+    limit = min(limit or DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT)
+    rows = fetch_page(select_from, key_column, after, limit, conditions, params, group_by)
+    key_field = key_column.split('.')[-1]
+    next_after = rows[-1][key_field] if len(rows) == limit else None
+    return jsonify({'data': rows, 'next_after': next_after, 'limit': limit})
+
+# ===== DASHBOARD STATS ENGINE =====
+
+# Tables whose writes change the dashboard numbers
+DASHBOARD_TABLES = {'Citizen', 'Area', 'Crew', 'Bins', 'Waste', 'Bill'}
+DASHBOARD_CACHE_TTL = float(os.environ.get('DASHBOARD_CACHE_TTL', 30))
+dashboard_cache = TTLCache(ttl=DASHBOARD_CACHE_TTL)
+_dashboard_versions = None
+
+def sync_dashboard_cache():
+    """Invalidate the dashboard cache if any process wrote to DASHBOARD_TABLES since the last check"""
+    global _dashboard_versions
+    versions = table_versions.snapshot(sorted(DASHBOARD_TABLES))
+    if versions != _dashboard_versions:
+        _dashboard_versions = versions
+        dashboard_cache.invalidate()
+
+# One round-trip: Waste totals come from the trigger-maintained waste_status_totals
+# (one row per status), plus a single scan over Bill and four cheap COUNTs
+DASHBOARD_STATS_QUERY = """SELECT
+        (SELECT COUNT(*) FROM Citizen) as total_citizens,
+        (SELECT COUNT(*) FROM Area) as areas,
+        (SELECT COUNT(*) FROM Crew) as crews,
+        (SELECT COUNT(*) FROM Bins) as bins,
+        w.total_waste, w.total_recycled, w.collected, w.recycled, w.disposed, w.waste_pending,
+        b.total_paid, b.paid, b.bill_pending, b.overdue
+    FROM (SELECT SUM(total_weight_kg) as total_waste,
+                 SUM(CASE WHEN status='Recycled' THEN total_weight_kg ELSE 0 END) as total_recycled,
+                 SUM(CASE WHEN status='Collected' THEN total_items ELSE 0 END) as collected,
+                 SUM(CASE WHEN status='Recycled' THEN total_items ELSE 0 END) as recycled,
+                 SUM(CASE WHEN status='Disposed' THEN total_items ELSE 0 END) as disposed,
+                 SUM(CASE WHEN status IN ('Pending', 'Unknown') THEN total_items ELSE 0 END) as waste_pending
+          FROM waste_status_totals) w
+    CROSS JOIN (SELECT SUM(CASE WHEN status='Paid' THEN amount ELSE 0 END) as total_paid,
+                       SUM(status='Paid') as paid,
+                       SUM(status='Pending' OR status IS NULL) as bill_pending,
+                       SUM(status='Overdue') as overdue
+                FROM Bill) b"""
+
+def empty_dashboard_stats():
+    """Dashboard stats with every value zeroed (used when the database is unavailable)"""
+    return {
+        'total_citizens': 0, 'total_waste_kg': 0.0, 'total_recycled_kg': 0.0, 'total_bills_paid': 0.0,
+        'areas': 0, 'crews': 0, 'bins': 0,
+        'waste_status': {'collected': 0, 'recycled': 0, 'disposed': 0, 'pending': 0},
+        'bill_status': {'paid': 0, 'pending': 0, 'overdue': 0}
+    }
+
+def compute_dashboard_stats():
+    """Run the combined stats query; returns None if the database did not answer"""
+    row = execute_query(DASHBOARD_STATS_QUERY, fetch_all=False)
+    return dashboard_stats_from_row(row) if row else None
+
+def dashboard_stats_from_row(row):
+    """Shape the DASHBOARD_STATS_QUERY row into the dashboard-stats response"""
+    def count(key):
+        return int(row[key]) if row[key] else 0
+    
+    def total(key):
+        return float(row[key]) if row[key] else 0.0
+    
+    return {
+        'total_citizens': count('total_citizens'),
+        'total_waste_kg': total('total_waste'),
+        'total_recycled_kg': total('total_recycled'),
+        'total_bills_paid': total('total_paid'),
+        'areas': count('areas'),
+        'crews': count('crews'),
+        'bins': count('bins'),
+        'waste_status': {'collected': count('collected'), 'recycled': count('recycled'),
+                         'disposed': count('disposed'), 'pending': count('waste_pending')},
+        'bill_status': {'paid': count('paid'), 'pending': count('bill_pending'), 'overdue': count('overdue')}
+    }
+
+def get_dashboard_stats():
+    """Dashboard stats served from the TTL cache; writes to DASHBOARD_TABLES invalidate it"""
+    sync_dashboard_cache()
+    stats = dashboard_cache.get_or_compute('dashboard', compute_dashboard_stats)
+    return stats if stats else empty_dashboard_stats()
+
+# ===== BILL RECONCILIATION ENGINE =====
+
+# Running totals live in bill_balance / citizen_balance (maintained by triggers on Bill and
+# Payment); this only moves Bill.status to match them, a batch of bills at a time.
+RECONCILE_BATCH_SIZE = int(os.environ.get('RECONCILE_BATCH_SIZE', 500))
+RECONCILED_STATUSES = (None, 'Pending', 'Overdue', 'Paid')
+
+BILL_BALANCE_SELECT = """SELECT bb.bill_id, b.status, b.due_date, bb.bill_amount, bb.total_paid
+                         FROM bill_balance bb JOIN Bill b ON bb.bill_id = b.bill_id"""
+
+def reconciled_status(bill, today, demote_paid=True):
+    """Status a bill should have: Paid once its payments cover it, otherwise Overdue/Pending by due date
+
+    With demote_paid=False a bill already marked Paid stays Paid even without matching
+    payments (bills settled before payments were recorded in the system).
+    """
+    if bill['status'] not in RECONCILED_STATUSES:
+        return bill['status']
+    if bill['total_paid'] >= bill['bill_amount']:
+        return 'Paid'
+    if bill['status'] == 'Paid' and not demote_paid:
+        return 'Paid'
+    return 'Overdue' if bill['due_date'] < today else 'Pending'
+
+# reconciled_status() in SQL, over the current bill_balance row; params: (demote_paid, today)
+RECONCILED_STATUS_SQL = """CASE WHEN bb.total_paid >= bb.bill_amount THEN 'Paid'
+                                WHEN b.status = 'Paid' AND %s = 0 THEN 'Paid'
+                                WHEN b.due_date < %s THEN 'Overdue'
+                                ELSE 'Pending' END"""
+
+def apply_bill_statuses(bills, today, demote_paid=True):
+    """Issue one UPDATE per target status for the bills whose status is out of date; returns counts
+
+    The bills were read without locks, so each UPDATE re-checks the status against the
+    current balance and due date: a payment committed since the read is never overwritten
+    (such bills are skipped here and the payment's own reconcile sets them).
+    """
+    changes = {}
+    for bill in bills:
+        status = reconciled_status(bill, today, demote_paid)
+        if status != bill['status']:
+            changes.setdefault(status, []).append(bill['bill_id'])
+    for status, bill_ids in changes.items():
+        placeholders = ', '.join(['%s'] * len(bill_ids))
+        execute_update(f"""UPDATE Bill b JOIN bill_balance bb ON bb.bill_id = b.bill_id SET b.status = %s
+                           WHERE b.bill_id IN ({placeholders})
+                             AND (b.status IS NULL OR b.status IN ('Pending', 'Overdue', 'Paid'))
+                             AND {RECONCILED_STATUS_SQL} = %s""",
+                       (status, *bill_ids, int(demote_paid), today, status))
+    return {status: len(bill_ids) for status, bill_ids in changes.items()}
+
+def reconcile_bills(bill_ids, today=None):
+    """Re-derive Bill.status for specific bills (e.g. after their payments changed)"""
+    bill_ids = [bill_id for bill_id in set(bill_ids) if bill_id is not None]
+    if not bill_ids:
+        return {}
+    placeholders = ', '.join(['%s'] * len(bill_ids))
+    bills = execute_query(f"{BILL_BALANCE_SELECT} WHERE bb.bill_id IN ({placeholders})", tuple(bill_ids))
+    return apply_bill_statuses(bills, today or datetime.now().date())
+
+def reconcile_all_bills(batch_size=RECONCILE_BATCH_SIZE, today=None):
+    """Flip every fully paid bill to Paid and every unpaid past-due bill to Overdue
+
+    Walks bill_balance in keyset batches and commits each batch on its own, so no
+    statement holds locks on more than batch_size bills.
+    """
+    today = today or datetime.now().date()
+    conditions = ["""((bb.total_paid >= bb.bill_amount AND (b.status IS NULL OR b.status IN ('Pending', 'Overdue')))
+                      OR ((b.status IS NULL OR b.status = 'Pending') AND b.due_date < %s
+                          AND bb.total_paid < bb.bill_amount))"""]
+    totals = {'scanned': 0, 'updated': {}}
+    after = None
+    while True:
+        bills = fetch_page(BILL_BALANCE_SELECT, 'bb.bill_id', after, batch_size, conditions, [today])
+        totals['scanned'] += len(bills)
+        for status, count in apply_bill_statuses(bills, today, demote_paid=False).items():
+            totals['updated'][status] = totals['updated'].get(status, 0) + count
+        if len(bills) < batch_size:
+            return totals
+        after = bills[-1]['bill_id']
+
+# ===== BIN FILL HISTORY (partitioned raw readings + rollups) =====
+
+HISTORY_RETENTION_DAYS = {
+    'bin_fill_history': int(os.environ.get('HISTORY_RAW_DAYS', 7)),
+    'bin_fill_rollup_1m': int(os.environ.get('HISTORY_1M_DAYS', 30)),
+    'bin_fill_rollup_1h': int(os.environ.get('HISTORY_1H_DAYS', 400)),
+    'bin_fill_rollup_1d': int(os.environ.get('HISTORY_1D_DAYS', 3650)),
+}
+HISTORY_PARTITIONS_AHEAD = int(os.environ.get('HISTORY_PARTITIONS_AHEAD', 3))
+HISTORY_MAINTENANCE_INTERVAL = float(os.environ.get('HISTORY_MAINTENANCE_INTERVAL', 3600))
+HISTORY_DEFAULT_POINTS = int(os.environ.get('HISTORY_DEFAULT_POINTS', 300))
+HISTORY_MAX_POINTS = int(os.environ.get('HISTORY_MAX_POINTS', 5000))
+
+ROLLUP_COLUMNS = ('bin_id', 'bucket_start', 'samples', 'fill_min', 'fill_max', 'fill_sum', 'fill_last', 'last_at')
+
+def derived_rows(columns, rows):
+    """(SQL, params) for an inline table of rows: SELECT %s AS a, %s AS b UNION ALL SELECT ..."""
+    select = 'SELECT ' + ', '.join(f'%s AS {column}' for column in columns)
+    return ' UNION ALL '.join([select] * len(rows)), tuple(value for row in rows for value in row)
+
+def record_fill_history(readings):
+    """Append (bin_id, fill_level, datetime) readings to the raw history and fold them into the rollups
+
+    Only rows for existing bins are written. Call inside transaction() to keep the
+    history and the rollups consistent with each other. Like the retention side in
+    maintain_fill_history, these writes stay out of the audit log so replaying it does
+    not bring back purged history.
+    """
+    rows, params = derived_rows(('bin_id', 'recorded_at', 'fill_level'),
+                                [(bin_id, moment, fill_level) for bin_id, fill_level, moment in readings])
+    execute_update(f"""INSERT INTO bin_fill_history (bin_id, recorded_at, fill_level)
+                       SELECT r.bin_id, r.recorded_at, r.fill_level FROM ({rows}) r JOIN Bins b ON b.bin_id = r.bin_id
+                       ON DUPLICATE KEY UPDATE fill_level = r.fill_level""", params, audited=False)
+    for seconds, table, _ in ROLLUPS:
+        rows, params = derived_rows(ROLLUP_COLUMNS, rollup_rows(readings, seconds))
+        # fill_last is assigned before last_at so it still compares against the old last_at
+        execute_update(f"""INSERT INTO {table} ({', '.join(ROLLUP_COLUMNS)})
+                           SELECT r.* FROM ({rows}) r JOIN Bins b ON b.bin_id = r.bin_id
+                           ON DUPLICATE KEY UPDATE
+                               samples = {table}.samples + r.samples,
+                               fill_min = LEAST({table}.fill_min, r.fill_min),
+                               fill_max = GREATEST({table}.fill_max, r.fill_max),
+                               fill_sum = {table}.fill_sum + r.fill_sum,
+                               fill_last = IF(r.last_at >= {table}.last_at, r.fill_last, {table}.fill_last),
+                               last_at = GREATEST({table}.last_at, r.last_at)""", params, audited=False)
+
+def execute_maintenance(statement, params=None):
+    """Run DDL, a retention DELETE or a job checkpoint on its own connection; returns the affected row count
+
+    Not audit-logged and no cache invalidation: history tables are derived data and
+    checkpoints are bookkeeping.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise Error("No database connection")
+    try:
+        cursor = conn.cursor()
+        cursor.execute(statement, params)
+        conn.commit()
+        count = cursor.rowcount
+        cursor.close()
+        return max(count, 0)
+    except Error as e:
+        conn.note_error(e)
+        raise
+    finally:
+        conn.close()
+
+def maintain_fill_history(today=None):
+    """Create upcoming daily partitions, drop expired ones and purge expired rollup buckets"""
+    today = today or datetime.now().date()
+    affected = 0
+    partitions = execute_query("""SELECT PARTITION_NAME as name, PARTITION_DESCRIPTION as bound
+                                  FROM information_schema.PARTITIONS
+                                  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'bin_fill_history'
+                                    AND PARTITION_NAME IS NOT NULL""")
+    if partitions:
+        add, drop = partition_plan([(p['name'], p['bound']) for p in partitions], today,
+                                   HISTORY_RETENTION_DAYS['bin_fill_history'], HISTORY_PARTITIONS_AHEAD)
+        if add:
+            parts = ', '.join(f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{upper}'))" for name, upper in add)
+            execute_maintenance(f"ALTER TABLE bin_fill_history REORGANIZE PARTITION pmax INTO "
+                                f"({parts}, PARTITION pmax VALUES LESS THAN MAXVALUE)")
+        if drop:
+            # Dropping a partition discards a day of raw rows without a row-by-row DELETE
+            execute_maintenance(f"ALTER TABLE bin_fill_history DROP PARTITION {', '.join(drop)}")
+        affected += len(add) + len(drop)
+    
+    now = datetime.now()
+    for seconds, table, column in ROLLUPS:
+        cutoff = now - timedelta(days=HISTORY_RETENTION_DAYS[table])
+        row = execute_query(f"SELECT MIN({column}) as oldest FROM {table}", fetch_all=False)
+        start = row['oldest'] if row else None
+        # Delete in spans of 60 buckets so no single statement holds many locks
+        while start is not None and start < cutoff:
+            end = min(start + timedelta(seconds=seconds * 60), cutoff)
+            affected += execute_maintenance(f"DELETE FROM {table} WHERE {column} >= %s AND {column} < %s",
+                                            (start, end))
+            start = end
+    return affected
+
+fill_history_job = PeriodicJob('fill_history', maintain_fill_history)
+
+# ===== FILL FORECASTING (time-to-full per bin, vectorized) =====
+
+FORECAST_WINDOW_HOURS = int(os.environ.get('FORECAST_WINDOW_HOURS', 48))
+FORECAST_CACHE_TTL = float(os.environ.get('FORECAST_CACHE_TTL', 60))
+FORECAST_RESET_DROP = float(os.environ.get('FORECAST_RESET_DROP', 20))
+forecast_cache = TTLCache(ttl=FORECAST_CACHE_TTL)
+
+def compute_bin_forecast():
+    """Fit fill rates for every bin from the hourly rollup; None if the database did not answer"""
+    bins = execute_query("SELECT bin_id, bin_number, area_id, location, fill_level, status FROM Bins ORDER BY bin_id")
+    if not bins:
+        return None
+    since = datetime.now() - timedelta(hours=FORECAST_WINDOW_HOURS)
+    history = execute_query("""SELECT bin_id, TIMESTAMPDIFF(SECOND, %s, bucket_start) / 3600 as hours,
+                                      fill_sum / samples as level
+                               FROM bin_fill_rollup_1h WHERE bucket_start >= %s
+                               ORDER BY bin_id, bucket_start""", (since, since))
+    count = len(history)
+    result = forecast(
+        np.fromiter((b['bin_id'] for b in bins), dtype=np.int64, count=len(bins)),
+        np.fromiter((b['area_id'] for b in bins), dtype=np.int64, count=len(bins)),
+        np.fromiter((b['fill_level'] or 0 for b in bins), dtype=float, count=len(bins)),
+        np.fromiter((h['bin_id'] for h in history), dtype=np.int64, count=count),
+        np.fromiter((h['hours'] for h in history), dtype=float, count=count),
+        np.fromiter((h['level'] for h in history), dtype=float, count=count),
+        full_level=BIN_FULL_MIN, reset_drop=FORECAST_RESET_DROP)
+    result['bins'] = bins
+    result['area_ids'] = np.fromiter((b['area_id'] for b in bins), dtype=np.int64, count=len(bins))
+    result['fill'] = np.fromiter((b['fill_level'] or 0 for b in bins), dtype=float, count=len(bins))
+    result['computed_at'] = datetime.now()
+    return result
+
+def get_bin_forecast():
+    """Forecast arrays shared by all rankings, recomputed at most every FORECAST_CACHE_TTL seconds"""
+    return forecast_cache.get_or_compute('bins', compute_bin_forecast)
+
+def forecast_rows(data, indices):
+    """JSON rows for the bins at the given positions of a forecast"""
+    rows = []
+    for i in indices:
+        hours = data['hours_to_full'][i]
+        row = dict(data['bins'][i])
+        row.update(
+            fill_rate_per_hour=round(float(data['rate'][i]), 3),
+            hours_to_full=None if np.isinf(hours) else round(float(hours), 1),
+            expected_full_at=None if np.isinf(hours) else
+                (data['computed_at'] + timedelta(hours=float(hours))).isoformat(timespec='minutes'),
+            samples=int(data['samples'][i]),
+            estimated=bool(data['estimated'][i]))
+        rows.append(row)
+    return rows
+
+def ranked_bins(data, area_ids=None, within_hours=None):
+    """Forecast positions ranked soonest-to-full first, limited to some areas and a time horizon"""
+    mask = np.ones(len(data['bins']), dtype=bool)
+    if area_ids is not None:
+        mask &= np.isin(data['area_ids'], list(area_ids))
+    if within_hours is not None:
+        mask &= data['hours_to_full'] <= within_hours
+    return rank(data['hours_to_full'], data['fill'], mask)
+
+def collect_next(area_ids=None, within_hours=None, limit=None):
+    """Bins ranked soonest-to-full first as JSON rows"""
+    data = get_bin_forecast()
+    if not data:
+        return []
+    return forecast_rows(data, ranked_bins(data, area_ids, within_hours)[:limit])
+
+def collect_next_by_area(limit, area_ids=None, within_hours=None):
+    """Top `limit` ranked bins of every area: [{"area_id", "bins": [...]}]"""
+    data = get_bin_forecast()
+    if not data:
+        return []
+    order = ranked_bins(data, area_ids, within_hours)
+    # Stable sort by area keeps the ranking inside each area; then cut each group at limit
+    grouped = order[np.argsort(data['area_ids'][order], kind='stable')]
+    areas = data['area_ids'][grouped]
+    starts = np.flatnonzero(np.r_[True, areas[1:] != areas[:-1]])
+    position = np.arange(len(grouped)) - np.repeat(starts, np.diff(np.r_[starts, len(grouped)]))
+    result = {}
+    for row in forecast_rows(data, grouped[position < limit]):
+        result.setdefault(row['area_id'], []).append(row)
+    return [{'area_id': area, 'bins': bins} for area, bins in result.items()]
+
+# ===== SCHEDULE OPTIMIZER (crew-to-area assignment from demand and capacity) =====
+
+SCHEDULE_MAX_DAYS = int(os.environ.get('SCHEDULE_MAX_DAYS', 62))
+# Staff-days of collection an area needs per day for its population, and per bin due
+SCHEDULE_POPULATION_PER_STAFF = float(os.environ.get('SCHEDULE_POPULATION_PER_STAFF', 20000))
+SCHEDULE_BINS_PER_STAFF = float(os.environ.get('SCHEDULE_BINS_PER_STAFF', 25))
+# Outstanding need (staff-days) below which an area is not visited yet
+SCHEDULE_MIN_NEED = float(os.environ.get('SCHEDULE_MIN_NEED', 0.5))
+SCHEDULE_INSERT_CHUNK = 1000
+
+def schedule_demand(area_ids, start, n_days):
+    """Staff-days needed per (area, day): population baseline plus forecast bin collections"""
+    populations = execute_query("SELECT area_id, population FROM Area")
+    population = {row['area_id']: row['population'] or 0 for row in populations}
+    need = np.repeat(np.fromiter((population.get(a, 0) for a in area_ids), dtype=float, count=len(area_ids))[:, None]
+                     / SCHEDULE_POPULATION_PER_STAFF, n_days, axis=1)
+    data = get_bin_forecast()
+    if data:
+        # Forecast hours count from computed_at; shift them to the start of the horizon
+        offset = (data['computed_at'] - datetime.combine(start, datetime.min.time())).total_seconds() / 3600
+        with np.errstate(divide='ignore'):
+            refill = np.where(data['rate'] > 0, BIN_FULL_MIN / data['rate'], np.inf)
+        position = np.searchsorted(area_ids, data['area_ids'])
+        known = position < len(area_ids)
+        known[known] = area_ids[position[known]] == data['area_ids'][known]
+        need += bin_demand(position[known], np.maximum(data['hours_to_full'][known] + offset, 0.0),
+                           refill[known], len(area_ids), n_days) / SCHEDULE_BINS_PER_STAFF
+    return need
+
+def schedule_capacity(start, n_days):
+    """(crews, available staff per (crew, day)); staff count from their assignment_date on"""
+    crews = execute_query("SELECT crew_id, area_id, team_size FROM Crew ORDER BY crew_id")
+    crew_ids = np.fromiter((c['crew_id'] for c in crews), dtype=np.int64, count=len(crews))
+    roster = execute_query("""SELECT a.crew_id, a.assignment_date,
+                                     (a.status = 'Assigned' AND s.status = 'Active') as available
+                              FROM Assigned a JOIN Staff s ON s.staff_id = a.staff_id""")
+    rostered = np.isin(crew_ids, [r['crew_id'] for r in roster])
+    available = [r for r in roster if r['available']]
+    capacity = crew_capacity(
+        [c['team_size'] or 0 for c in crews],
+        np.searchsorted(crew_ids, [r['crew_id'] for r in available]),
+        [(r['assignment_date'] - start).days if r['assignment_date'] else 0 for r in available],
+        rostered, n_days)
+    return crews, capacity
+
+def optimize_schedule(start, end, replace=False, dry_run=False):
+    """Assign crews to areas for every day from start to end (inclusive)
+
+    Existing Has_Schedule rows in the range are kept and their crews treated as busy,
+    unless replace is set, in which case they (and the matching Collection_Schedule rows)
+    are replaced. Writes one Has_Schedule row per assignment and one Collection_Schedule
+    row per visited area and day in a single transaction, skipping slots that already
+    have a row so re-running over the same range does not duplicate them.
+    """
+    n_days = (end - start).days + 1
+    if n_days < 1 or n_days > SCHEDULE_MAX_DAYS:
+        raise ValueError(f"Date range must cover 1 to {SCHEDULE_MAX_DAYS} days")
+    started = time.perf_counter()
+    areas = execute_query("SELECT area_id FROM Area ORDER BY area_id")
+    area_ids = np.fromiter((a['area_id'] for a in areas), dtype=np.int64, count=len(areas))
+    crews, capacity = schedule_capacity(start, n_days)
+    crew_ids = np.fromiter((c['crew_id'] for c in crews), dtype=np.int64, count=len(crews))
+    need = schedule_demand(area_ids, start, n_days)
+    demand = float(need.sum())
+
+    busy = set()
+    if not replace and len(crews) and len(areas):
+        existing = execute_query("""SELECT crew_id, area_id, schedule_date FROM Has_Schedule
+                                    WHERE schedule_date BETWEEN %s AND %s""", (start, end))
+        busy = release_busy(need, capacity, [
+            (int(np.searchsorted(crew_ids, row['crew_id'])), int(np.searchsorted(area_ids, row['area_id'])),
+             (row['schedule_date'] - start).days) for row in existing
+            if row['crew_id'] in crew_ids and row['area_id'] in area_ids])
+    home_area = np.searchsorted(area_ids, [c['area_id'] for c in crews])
+    assignments, unmet = assign(need, capacity, home_area, busy, SCHEDULE_MIN_NEED)
+
+    plan = [{'schedule_date': (start + timedelta(days=day)).isoformat(), 'crew_id': int(crew_ids[crew]),
+             'area_id': int(area_ids[area]), 'staff': int(staff), 'need_covered': round(float(covered), 2)}
+            for day, crew, area, staff, covered in assignments]
+    if plan and not dry_run:
+        visits = sorted({(row['area_id'], row['schedule_date']) for row in plan})
+        with transaction():
+            if replace:
+                execute_update("DELETE FROM Has_Schedule WHERE schedule_date BETWEEN %s AND %s", (start, end))
+                execute_update("DELETE FROM Collection_Schedule WHERE schedule_date BETWEEN %s AND %s", (start, end))
+            # Neither table has a unique key, so slots that already have a row are skipped
+            for i in range(0, len(plan), SCHEDULE_INSERT_CHUNK):
+                rows, params = derived_rows(('area_id', 'crew_id', 'schedule_date'),
+                                            [(row['area_id'], row['crew_id'], row['schedule_date'])
+                                             for row in plan[i:i + SCHEDULE_INSERT_CHUNK]])
+                execute_update(f"""INSERT INTO Has_Schedule (area_id, crew_id, schedule_date)
+                                   SELECT r.area_id, r.crew_id, r.schedule_date FROM ({rows}) r
+                                   WHERE NOT EXISTS (SELECT 1 FROM Has_Schedule hs
+                                                     WHERE hs.area_id = r.area_id AND hs.crew_id = r.crew_id
+                                                       AND hs.schedule_date = r.schedule_date)""", params)
+            for i in range(0, len(visits), SCHEDULE_INSERT_CHUNK):
+                rows, params = derived_rows(('area_id', 'schedule_date'), visits[i:i + SCHEDULE_INSERT_CHUNK])
+                execute_update(f"""INSERT INTO Collection_Schedule (area_id, schedule_date)
+                                   SELECT r.area_id, r.schedule_date FROM ({rows}) r
+                                   WHERE NOT EXISTS (SELECT 1 FROM Collection_Schedule cs
+                                                     WHERE cs.area_id = r.area_id AND cs.schedule_date = r.schedule_date)""",
+                               params)
+
+    return {
+        'from': start.isoformat(), 'to': end.isoformat(), 'days': n_days,
+        'crews': len(crews), 'areas': len(areas), 'schedules': len(plan), 'written': bool(plan) and not dry_run,
+        'demand_staff_days': round(demand, 1),
+        'unmet_staff_days': round(float(unmet.sum()), 1),
+        'seconds': round(time.perf_counter() - started, 3),
+        'plan': plan,
+    }
+
+# ===== BACKGROUND BATCH JOBS =====
+
+# Seconds between overdue sweeps inside the server process (0 disables; run_batch_jobs.py
+# can run the same job as a separate process instead)
+OVERDUE_JOB_INTERVAL = float(os.environ.get('OVERDUE_JOB_INTERVAL', 3600))
+OVERDUE_JOB_BATCH = int(os.environ.get('OVERDUE_JOB_BATCH', 1000))
+OVERDUE_JOB_DAYS = int(os.environ.get('OVERDUE_JOB_DAYS', 7))
+OVERDUE_JOB_PAUSE = float(os.environ.get('OVERDUE_JOB_PAUSE', 0.05))
+# The job walks idx_bill_status_due (status, due_date, bill_id) for these statuses only
+OVERDUE_STATUS_CONDITIONS = ("b.status = 'Pending'", "b.status IS NULL")
+
+def overdue_key_bounds():
+    """(first, last) due dates, as day ordinals, that can hold Pending past-due bills; one index probe per status"""
+    today = datetime.now().date()
+    firsts = [execute_query(f"SELECT MIN(b.due_date) as first FROM Bill b WHERE {condition}", fetch_all=False)
+              for condition in OVERDUE_STATUS_CONDITIONS]
+    first = min((row['first'] for row in firsts if row and row['first']), default=None)
+    if first is None or first >= today:
+        return None
+    return first.toordinal(), today.toordinal() - 1
+
+def mark_overdue_range(lo, hi):
+    """Move unpaid Pending bills due on days lo <= ordinal < hi to Overdue (fully paid ones to Paid)
+
+    Reads idx_bill_status_due in keyset chunks of OVERDUE_JOB_BATCH bills ordered by
+    (due_date, bill_id), so only candidate bills are touched, never the whole Bill table;
+    each chunk's UPDATE commits on its own.
+    """
+    today = datetime.now().date()
+    first, end = date.fromordinal(lo), date.fromordinal(min(hi, today.toordinal()))
+    changed = 0
+    for condition in OVERDUE_STATUS_CONDITIONS:
+        after = (first, 0)
+        while True:
+            bills = execute_query(f"""{BILL_BALANCE_SELECT}
+                                      WHERE {condition} AND b.due_date >= %s AND b.due_date < %s
+                                        AND (b.due_date > %s OR b.bill_id > %s)
+                                      ORDER BY b.due_date, b.bill_id LIMIT %s""",
+                                  (after[0], end, after[0], after[1], OVERDUE_JOB_BATCH))
+            changed += sum(apply_bill_statuses(bills, today, demote_paid=False).values())
+            if len(bills) < OVERDUE_JOB_BATCH:
+                break
+            after = (bills[-1]['due_date'], bills[-1]['bill_id'])
+            time.sleep(OVERDUE_JOB_PAUSE)
+    return changed
+
+def overdue_lag_days():
+    """Days since the oldest still-Pending bill fell due (idx_bill_status_due makes this one index probe)"""
+    today = datetime.now().date()
+    row = execute_query("SELECT MIN(due_date) as oldest FROM Bill WHERE status = 'Pending' AND due_date < %s",
+                        (today,), fetch_all=False)
+    return (today - row['oldest']).days if row and row['oldest'] else 0
+
+# Keys are due dates (day ordinals): each range covers OVERDUE_JOB_DAYS days
+overdue_job = KeyRangeJob('overdue_bills', overdue_key_bounds, mark_overdue_range,
+                          DbCheckpoints(execute_query, execute_maintenance),
+                          batch_size=OVERDUE_JOB_DAYS, pause=OVERDUE_JOB_PAUSE, lag=overdue_lag_days)
+BATCH_JOBS = {'overdue': overdue_job, 'fill_history': fill_history_job}
+
+def start_background_jobs():
+    """Start the in-process job schedulers (called by the server entry points, not on import)"""
+    if OVERDUE_JOB_INTERVAL > 0:
+        overdue_job.start(OVERDUE_JOB_INTERVAL)
+        print(f"✅ Overdue bill job scheduled every {OVERDUE_JOB_INTERVAL:g}s")
+    if HISTORY_MAINTENANCE_INTERVAL > 0:
+        fill_history_job.start(HISTORY_MAINTENANCE_INTERVAL)
+
 # ===== FRONTEND ROUTES =====
 
 @app.route('/')
 def home():
     """Dashboard page"""
-    # Fetch stats from database
     try:
-        stats = {
-            'total_citizens': 0,
-            'total_waste_kg': 0.0,
-            'total_recycled_kg': 0.0,
-            'total_bills_paid': 0.0,
-            'areas': 0,
-            'crews': 0,
-            'bins': 0,
-            'waste_status': {'collected': 0, 'recycled': 0, 'disposed': 0, 'pending': 0},
-            'bill_status': {'paid': 0, 'pending': 0, 'overdue': 0}
-        }
-        
-        # Total citizens
-        result = execute_query("SELECT COUNT(*) as count FROM Citizen", fetch_all=False)
-        stats['total_citizens'] = result['count'] if result else 0
-        
-        # Total waste collected
-        result = execute_query("SELECT SUM(weight) as total FROM Waste", fetch_all=False)
-        stats['total_waste_kg'] = float(result['total']) if result and result['total'] else 0.0
-        
-        # Total waste recycled
-        result = execute_query("SELECT SUM(weight) as total FROM Waste WHERE status='Recycled'", fetch_all=False)
-        stats['total_recycled_kg'] = float(result['total']) if result and result['total'] else 0.0
-        
-        # Bills paid total
-        result = execute_query("SELECT SUM(amount) as total FROM Bill WHERE status='Paid'", fetch_all=False)
-        stats['total_bills_paid'] = float(result['total']) if result and result['total'] else 0.0
-        
-        # Count by entity
-        result = execute_query("SELECT COUNT(*) as count FROM Area", fetch_all=False)
-        stats['areas'] = result['count'] if result else 0
-        
-        result = execute_query("SELECT COUNT(*) as count FROM Crew", fetch_all=False)
-        stats['crews'] = result['count'] if result else 0
-        
-        result = execute_query("SELECT COUNT(*) as count FROM Bins", fetch_all=False)
-        stats['bins'] = result['count'] if result else 0
-        
-        # Waste by status
-        results = execute_query("SELECT status, COUNT(*) as count FROM Waste GROUP BY status")
-        for row in results:
-            status_key = row['status'].lower() if row['status'] else 'pending'
-            if status_key in stats['waste_status']:
-                stats['waste_status'][status_key] = row['count']
-        
-        # Bills by status
-        results = execute_query("SELECT status, COUNT(*) as count FROM Bill GROUP BY status")
-        for row in results:
-            status_key = row['status'].lower() if row['status'] else 'pending'
-            if status_key in stats['bill_status']:
-                stats['bill_status'][status_key] = row['count']
-    except:
-        stats = {
-            'total_citizens': 0, 'total_waste_kg': 0.0, 'total_recycled_kg': 0.0, 'total_bills_paid': 0.0,
-            'areas': 0, 'crews': 0, 'bins': 0,
-            'waste_status': {'collected': 0, 'recycled': 0, 'disposed': 0, 'pending': 0},
-            'bill_status': {'paid': 0, 'pending': 0, 'overdue': 0}
-        }
+        stats = get_dashboard_stats()
+    except Exception as e:
+        print(f"Dashboard Stats Error: {e}")
+        stats = empty_dashboard_stats()
     
     return render_template('dashboard.html', stats=stats)
 
@@ -366,60 +1349,7 @@ def centers_page():
 def dashboard_stats():
     """Get dashboard statistics"""
     try:
-        # Initialize stats with proper default values (using lowercase status names)
-        stats = {
-            'total_citizens': 0,
-            'total_waste_kg': 0.0,
-            'total_recycled_kg': 0.0,
-            'total_bills_paid': 0.0,
-            'areas': 0,
-            'crews': 0,
-            'bins': 0,
-            'waste_status': {'collected': 0, 'recycled': 0, 'disposed': 0, 'pending': 0},
-            'bill_status': {'paid': 0, 'pending': 0, 'overdue': 0}
-        }
-        
-        # Total citizens
-        result = execute_query("SELECT COUNT(*) as count FROM Citizen", fetch_all=False)
-        stats['total_citizens'] = result['count'] if result else 0
-        
-        # Total waste collected
-        result = execute_query("SELECT SUM(weight) as total FROM Waste", fetch_all=False)
-        stats['total_waste_kg'] = float(result['total']) if result and result['total'] else 0.0
-        
-        # Total waste recycled
-        result = execute_query("SELECT SUM(weight) as total FROM Waste WHERE status='Recycled'", fetch_all=False)
-        stats['total_recycled_kg'] = float(result['total']) if result and result['total'] else 0.0
-        
-        # Bills paid total
-        result = execute_query("SELECT SUM(amount) as total FROM Bill WHERE status='Paid'", fetch_all=False)
-        stats['total_bills_paid'] = float(result['total']) if result and result['total'] else 0.0
-        
-        # Count by entity
-        result = execute_query("SELECT COUNT(*) as count FROM Area", fetch_all=False)
-        stats['areas'] = result['count'] if result else 0
-        
-        result = execute_query("SELECT COUNT(*) as count FROM Crew", fetch_all=False)
-        stats['crews'] = result['count'] if result else 0
-        
-        result = execute_query("SELECT COUNT(*) as count FROM Bins", fetch_all=False)
-        stats['bins'] = result['count'] if result else 0
-        
-        # Waste by status - map to lowercase keys
-        results = execute_query("SELECT status, COUNT(*) as count FROM Waste GROUP BY status")
-        for row in results:
-            status_key = row['status'].lower() if row['status'] else 'pending'
-            if status_key in stats['waste_status']:
-                stats['waste_status'][status_key] = row['count']
-        
-        # Bills by status - map to lowercase keys
-        results = execute_query("SELECT status, COUNT(*) as count FROM Bill GROUP BY status")
-        for row in results:
-            status_key = row['status'].lower() if row['status'] else 'pending'
-            if status_key in stats['bill_status']:
-                stats['bill_status'][status_key] = row['count']
-        
-        return jsonify(stats)
+        return jsonify(get_dashboard_stats())
     except Exception as e:
         print(f"Dashboard Stats Error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -433,8 +1363,7 @@ def api_citizens():
                           a.area_id, a.area_name
                    FROM Citizen c 
                    JOIN Area a ON c.area_id = a.area_id"""
-        results = execute_query(query)
-        return jsonify(results)
+        return list_response(query, 'c.citizen_id', entity='citizens')
     
     elif request.method == 'POST':
         data = request.json
@@ -488,8 +1417,7 @@ def api_citizen_detail(citizen_id):
 def api_areas():
     if request.method == 'GET':
         query = "SELECT area_id, area_name, location, population FROM Area"
-        results = execute_query(query)
-        return jsonify(results)
+        return list_response(query, 'area_id', cache_tables=('Area',), entity='areas')
     
     elif request.method == 'POST':
         data = request.json
@@ -540,8 +1468,7 @@ def api_crew():
                           a.area_id, a.area_name
                    FROM Crew cr 
                    JOIN Area a ON cr.area_id = a.area_id"""
-        results = execute_query(query)
-        return jsonify(results)
+        return list_response(query, 'cr.crew_id', cache_tables=('Crew', 'Area'), entity='crew')
     
     elif request.method == 'POST':
         data = request.json
@@ -593,12 +1520,11 @@ def api_crew_detail(crew_id):
 def api_waste():
     if request.method == 'GET':
         query = """SELECT w.waste_id, w.name, w.waste_type, w.category, w.weight, w.status, w.center_id,
-                          c.citizen_id, c.name as citizen_name, rc.location as center_location
+                          w.collection_date, c.citizen_id, c.name as citizen_name, rc.location as center_location
                    FROM Waste w 
                    JOIN Citizen c ON w.citizen_id = c.citizen_id
                    LEFT JOIN Recycling_Center rc ON w.center_id = rc.center_id"""
-        results = execute_query(query)
-        return jsonify(results)
+        return list_response(query, 'w.waste_id', entity='waste')
     
     elif request.method == 'POST':
         data = request.json
@@ -656,8 +1582,7 @@ def api_bins():
                           a.area_id, a.area_name
                    FROM Bins b 
                    JOIN Area a ON b.area_id = a.area_id"""
-        results = execute_query(query)
-        return jsonify(results)
+        return list_response(query, 'b.bin_id', entity='bins')
     
     elif request.method == 'POST':
         data = request.json
@@ -690,9 +1615,10 @@ def api_bins_detail(bin_id):
                       WHERE bin_id=%s"""
             params = (data['bin_number'], data['status'], data['fill_level'], data['location'], data['area_id'], data.get('sensor', ''), bin_id)
             
-            if execute_update(query, params):
-                return jsonify({'success': True, 'message': 'Bin updated successfully'})
-            return jsonify({'success': False, 'message': 'Failed to update bin'}), 400
+            with transaction():
+                execute_update(query, params)
+                record_fill_history([(bin_id, int(data['fill_level']), datetime.now().replace(microsecond=0))])
+            return jsonify({'success': True, 'message': 'Bin updated successfully'})
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 400
     
@@ -714,8 +1640,7 @@ def api_bills():
                           c.citizen_id, c.name as citizen_name
                    FROM Bill b 
                    JOIN Citizen c ON b.citizen_id = c.citizen_id"""
-        results = execute_query(query)
-        return jsonify(results)
+        return list_response(query, 'b.bill_id', entity='bills')
     
     elif request.method == 'POST':
         data = request.json
@@ -774,8 +1699,7 @@ def api_payments():
                    FROM Payment p 
                    JOIN Citizen c ON p.citizen_id = c.citizen_id 
                    LEFT JOIN Bill b ON p.bill_id = b.bill_id"""
-        results = execute_query(query)
-        return jsonify(results)
+        return list_response(query, 'p.payment_id', entity='payments')
     
     elif request.method == 'POST':
         data = request.json
@@ -784,9 +1708,11 @@ def api_payments():
                       VALUES (%s, %s, %s, %s, %s)"""
             params = (data['payment_date'], data['amount'], data.get('method', 'Cash'), data['citizen_id'], data.get('bill_id'))
             
-            if execute_update(query, params):
-                return jsonify({'success': True, 'message': 'Payment added successfully'})
-            return jsonify({'success': False, 'message': 'Failed to add payment'}), 400
+            # The payment and the bill status it implies are committed together
+            with transaction():
+                execute_update(query, params)
+                reconcile_bills([data.get('bill_id')])
+            return jsonify({'success': True, 'message': 'Payment added successfully'})
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 400
 
@@ -810,21 +1736,68 @@ def api_payments_detail(payment_id):
                       WHERE payment_id=%s"""
             params = (data['payment_date'], data['amount'], data['method'], data['citizen_id'], data.get('bill_id'), payment_id)
             
-            if execute_update(query, params):
-                return jsonify({'success': True, 'message': 'Payment updated successfully'})
-            return jsonify({'success': False, 'message': 'Failed to update payment'}), 400
+            with transaction():
+                old = execute_query("SELECT bill_id FROM Payment WHERE payment_id=%s FOR UPDATE", (payment_id,), fetch_all=False)
+                execute_update(query, params)
+                reconcile_bills([data.get('bill_id'), old['bill_id'] if old else None])
+            return jsonify({'success': True, 'message': 'Payment updated successfully'})
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 400
     
     elif request.method == 'DELETE':
         try:
             query = "DELETE FROM Payment WHERE payment_id=%s"
-            if execute_update(query, (payment_id,)):
-                return jsonify({'success': True, 'message': 'Payment deleted successfully'})
-            return jsonify({'success': False, 'message': 'Failed to delete payment'}), 400
+            with transaction():
+                old = execute_query("SELECT bill_id FROM Payment WHERE payment_id=%s FOR UPDATE", (payment_id,), fetch_all=False)
+                execute_update(query, (payment_id,))
+                reconcile_bills([old['bill_id'] if old else None])
+            return jsonify({'success': True, 'message': 'Payment deleted successfully'})
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 400
 
+# ===== BILL BALANCES API =====
+
+# Shared with the async handlers in asgi.py
+BILL_BALANCE_QUERY = """SELECT bb.bill_id, b.bill_number, b.status, b.due_date, bb.citizen_id,
+                               bb.bill_amount, bb.total_paid, (bb.bill_amount - bb.total_paid) as balance_due
+                        FROM bill_balance bb JOIN Bill b ON bb.bill_id = b.bill_id
+                        WHERE bb.bill_id = %s"""
+CITIZEN_BALANCE_QUERY = """SELECT c.citizen_id, c.name as citizen_name, IFNULL(cb.bills, 0) as bills,
+                                  IFNULL(cb.billed, 0) as billed, IFNULL(cb.paid, 0) as paid,
+                                  IFNULL(cb.outstanding, 0) as outstanding
+                           FROM Citizen c LEFT JOIN citizen_balance cb ON c.citizen_id = cb.citizen_id
+                           WHERE c.citizen_id = %s"""
+
+@app.route('/api/bills/<int:bill_id>/balance')
+def api_bill_balance(bill_id):
+    """Running paid/balance for one bill (single primary-key lookup)"""
+    result = execute_query(BILL_BALANCE_QUERY, (bill_id,), fetch_all=False)
+    return jsonify(result) if result else jsonify({}), 404 if not result else 200
+
+@app.route('/api/citizens/<int:citizen_id>/balance')
+def api_citizen_balance(citizen_id):
+    """Billed, paid and outstanding totals for one citizen (single primary-key lookup)"""
+    result = execute_query(CITIZEN_BALANCE_QUERY, (citizen_id,), fetch_all=False)
+    return jsonify(result) if result else jsonify({}), 404 if not result else 200
+
+@app.route('/api/billing/outstanding')
+def api_billing_outstanding():
+    query = """SELECT cb.citizen_id, c.name as citizen_name, c.area_id, cb.bills, cb.billed, cb.paid, cb.outstanding
+               FROM citizen_balance cb JOIN Citizen c ON cb.citizen_id = c.citizen_id"""
+    return list_response(query, 'cb.citizen_id', entity='outstanding')
+
+@app.route('/api/bills/reconcile', methods=['POST'])
+def api_bills_reconcile():
+    """Batch-flip bill statuses to match their running balances"""
+    try:
+        batch_size = max(1, min(request.args.get('batch', RECONCILE_BATCH_SIZE, type=int), MAX_PAGE_LIMIT))
+        started = time.perf_counter()
+        result = reconcile_all_bills(batch_size)
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return jsonify(dict(result, success=True))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
 # ===== SCHEDULES API =====
 
 @app.route('/api/schedules', methods=['GET', 'POST'])
@@ -836,8 +1809,7 @@ def api_schedules():
                    FROM Has_Schedule hs 
                    JOIN Area a ON hs.area_id = a.area_id 
                    JOIN Crew cr ON hs.crew_id = cr.crew_id"""
-        results = execute_query(query)
-        return jsonify(results)
+        return list_response(query, 'hs.schedule_id', entity='schedules')
     
     elif request.method == 'POST':
         data = request.json
@@ -852,6 +1824,22 @@ def api_schedules():
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 400
 
+@app.route('/api/schedules/optimize', methods=['POST'])
+def api_schedules_optimize():
+    """Generate crew-to-area schedules for a date range
+
+    Body (all optional): {"from": "2025-01-01", "to": "2025-01-30", "replace": false, "dry_run": false}.
+    Defaults to the 30 days starting today.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        start = parse_date(data['from']) if data.get('from') else datetime.now().date()
+        end = parse_date(data['to']) if data.get('to') else start + timedelta(days=29)
+        result = optimize_schedule(start, end, replace=bool(data.get('replace')), dry_run=bool(data.get('dry_run')))
+        return jsonify(dict(result, success=True))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
 @app.route('/api/schedules/<int:schedule_id>', methods=['GET', 'PUT', 'DELETE'])
 def api_schedule_detail(schedule_id):
     if request.method == 'GET':
@@ -900,11 +1888,10 @@ def api_centers():
                     c.operational_hours,
                     COALESCE(SUM(CASE WHEN w.status='Recycled' THEN w.weight ELSE 0 END), 0) as recycled_waste_kg
                    FROM Recycling_Center c
-                   LEFT JOIN Waste w ON c.center_id = w.center_id
-                   GROUP BY c.center_id, c.location, c.capacity, c.operational_hours
-                   ORDER BY c.center_id"""
-        results = execute_query(query)
-        return jsonify(results)
+                   LEFT JOIN Waste w ON c.center_id = w.center_id"""
+        return list_response(query, 'c.center_id', default_order='c.center_id',
+                             group_by='c.center_id, c.location, c.capacity, c.operational_hours',
+                             cache_tables=('Recycling_Center', 'Waste'))
     
     elif request.method == 'POST':
         data = request.json
@@ -966,27 +1953,23 @@ def api_center_detail(center_id):
 
 @app.route('/api/areas-list')
 def areas_list():
-    results = execute_query("SELECT area_id, area_name FROM Area")
-    return jsonify(results)
+    return cached_json_response("SELECT area_id, area_name FROM Area", ('Area',))
 
 @app.route('/api/citizens-list')
 def citizens_list():
-    results = execute_query("SELECT citizen_id, name FROM Citizen")
-    return jsonify(results)
+    return cached_json_response("SELECT citizen_id, name FROM Citizen", ('Citizen',))
 
 @app.route('/api/crews-list')
 def crews_list():
-    results = execute_query("SELECT crew_id, team_name as crew_name FROM Crew")
-    return jsonify(results)
+    return cached_json_response("SELECT crew_id, team_name as crew_name FROM Crew", ('Crew',))
 
 # ===== STAFF API (Individual Team Members) =====
 
 @app.route('/api/staff', methods=['GET', 'POST'])
 def api_staff():
     if request.method == 'GET':
-        query = "SELECT staff_id, staff_name, position, contact, email, status FROM Staff ORDER BY staff_name"
-        results = execute_query(query)
-        return jsonify(results)
+        query = "SELECT staff_id, staff_name, position, contact, email, status FROM Staff"
+        return list_response(query, 'staff_id', default_order='staff_name', cache_tables=('Staff',), entity='staff')
     
     elif request.method == 'POST':
         data = request.json
@@ -1043,10 +2026,8 @@ def api_assignments():
                     s.position, a.role, a.status, a.assignment_date
                    FROM Assigned a
                    JOIN Crew c ON a.crew_id = c.crew_id
-                   JOIN Staff s ON a.staff_id = s.staff_id
-                   ORDER BY c.team_name, s.staff_name"""
-        results = execute_query(query)
-        return jsonify(results)
+                   JOIN Staff s ON a.staff_id = s.staff_id"""
+        return list_response(query, 'a.assigned_id', default_order='c.team_name, s.staff_name', entity='assignments')
     
     elif request.method == 'POST':
         data = request.json
@@ -1128,8 +2109,519 @@ def api_staff_teams(staff_id):
 
 @app.route('/api/bills-list')
 def bills_list():
-    results = execute_query("SELECT bill_id, bill_number FROM Bill")
-    return jsonify(results)
+    return cached_json_response("SELECT bill_id, bill_number FROM Bill", ('Bill',))
+
+# ===== BULK API (arrays or NDJSON, executemany in chunked transactions) =====
+
+BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 1000))
+BULK_MAX_ROWS = int(os.environ.get('BULK_MAX_ROWS', 200000))
+REQUIRED = object()
+
+# entity -> (table, primary key, [(column, default or REQUIRED)]) mirroring the POST handlers
+BULK_ENTITIES = {
+    'citizens': ('Citizen', 'citizen_id',
+                 [('name', REQUIRED), ('address', REQUIRED), ('contact', REQUIRED), ('area_id', REQUIRED), ('email', '')]),
+    'areas': ('Area', 'area_id',
+              [('area_name', REQUIRED), ('location', REQUIRED), ('population', 0)]),
+    'crew': ('Crew', 'crew_id',
+             [('team_name', REQUIRED), ('contact', REQUIRED), ('area_id', REQUIRED), ('team_size', REQUIRED)]),
+    'waste': ('Waste', 'waste_id',
+              [('waste_type', REQUIRED), ('name', REQUIRED), ('category', REQUIRED), ('weight', REQUIRED),
+               ('citizen_id', REQUIRED), ('status', 'Collected'), ('center_id', 1)]),
+    'bins': ('Bins', 'bin_id',
+             [('bin_number', REQUIRED), ('status', 'Empty'), ('fill_level', 0), ('location', REQUIRED),
+              ('area_id', REQUIRED), ('sensor', '')]),
+    'bills': ('Bill', 'bill_id',
+              [('bill_number', REQUIRED), ('status', 'Pending'), ('amount', REQUIRED), ('due_date', REQUIRED),
+               ('citizen_id', REQUIRED)]),
+    'payments': ('Payment', 'payment_id',
+                 [('payment_date', REQUIRED), ('amount', REQUIRED), ('method', 'Cash'), ('citizen_id', REQUIRED),
+                  ('bill_id', None)]),
+    'schedules': ('Has_Schedule', 'schedule_id',
+                  [('area_id', REQUIRED), ('crew_id', REQUIRED), ('schedule_date', REQUIRED)]),
+    'staff': ('Staff', 'staff_id',
+              [('staff_name', REQUIRED), ('position', ''), ('contact', REQUIRED), ('email', ''), ('status', 'Active')]),
+    'assignments': ('Assigned', 'assigned_id',
+                    [('crew_id', REQUIRED), ('staff_id', REQUIRED), ('assignment_date', None),
+                     ('role', 'Staff Member'), ('status', 'Assigned')]),
+}
+
+def parse_bulk_rows():
+    """Read the request body as a JSON array or as NDJSON (one object per line)"""
+    body = request.get_data(as_text=True).strip()
+    if body.startswith('['):
+        return json.loads(body)
+    return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+@app.route('/api/<entity>/bulk', methods=['POST'])
+def api_bulk(entity):
+    """Insert (rows without a primary key) or update (rows with one) many records at once"""
+    if entity not in BULK_ENTITIES:
+        return jsonify({'success': False, 'error': f'Unknown entity: {entity}'}), 404
+    table, pk, columns = BULK_ENTITIES[entity]
+    
+    try:
+        rows = parse_bulk_rows()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid JSON: {e}'}), 400
+    if not isinstance(rows, list):
+        return jsonify({'success': False, 'error': 'Expected a JSON array or NDJSON'}), 400
+    if len(rows) > BULK_MAX_ROWS:
+        return jsonify({'success': False, 'error': f'Too many rows (max {BULK_MAX_ROWS})'}), 400
+    
+    column_names = [name for name, _ in columns]
+    insert_query = f"INSERT INTO {table} ({', '.join(column_names)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    update_query = f"UPDATE {table} SET {', '.join(f'{name}=%s' for name in column_names)} WHERE {pk}=%s"
+    
+    results = [None] * len(rows)
+    inserts, updates = [], []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            results[i] = {'row': i, 'success': False, 'error': 'Row is not an object'}
+            continue
+        missing = [name for name, default in columns if default is REQUIRED and name not in row]
+        if missing:
+            results[i] = {'row': i, 'success': False, 'error': f"Missing fields: {', '.join(missing)}"}
+            continue
+        params = tuple(row.get(name, None if default is REQUIRED else default) for name, default in columns)
+        if row.get(pk) is not None:
+            updates.append((i, params + (row[pk],)))
+        else:
+            inserts.append((i, params))
+    
+    for action, query, batch in (('insert', insert_query, inserts), ('update', update_query, updates)):
+        if not batch:
+            continue
+        outcomes = execute_bulk(query, [params for _, params in batch], BULK_CHUNK_SIZE)
+        for (i, _), (ok, error) in zip(batch, outcomes):
+            results[i] = {'row': i, 'success': ok, 'action': action}
+            if error:
+                results[i]['error'] = error
+    
+    failed = sum(1 for r in results if not r['success'])
+    return jsonify({
+        'success': failed == 0,
+        'inserted': sum(1 for r in results if r['success'] and r['action'] == 'insert'),
+        'updated': sum(1 for r in results if r['success'] and r['action'] == 'update'),
+        'failed': failed,
+        'results': results
+    }), 200 if failed == 0 else 207
+
+# ===== ANALYTICS API (trigger-maintained summary tables) =====
+
+# Summary tables are only written by triggers on these base tables, so their
+# versions are what the cached responses are validated against
+AREA_SUMMARY_TABLES = ('Area', 'Citizen', 'Bins', 'Crew', 'Waste')
+BILL_BALANCE_TABLES = ('Bill', 'Payment', 'Citizen', 'Area')
+
+@app.route('/api/analytics/area-utilization')
+def analytics_area_utilization():
+    query = """SELECT a.area_id, a.area_name, s.citizens, s.bins, s.crews, s.waste_kg
+               FROM area_summary s JOIN Area a ON s.area_id = a.area_id ORDER BY a.area_id"""
+    return cached_json_response(query, AREA_SUMMARY_TABLES)
+
+@app.route('/api/analytics/waste-by-area')
+def analytics_waste_by_area():
+    query = """SELECT a.area_id, a.area_name, s.waste_items as total_waste, s.waste_kg as total_weight,
+                      ROUND(s.waste_kg / NULLIF(s.waste_items, 0), 2) as avg_weight
+               FROM area_summary s JOIN Area a ON s.area_id = a.area_id
+               WHERE s.waste_items > 0 ORDER BY s.waste_kg DESC"""
+    return cached_json_response(query, AREA_SUMMARY_TABLES)
+
+@app.route('/api/analytics/bins-by-area')
+def analytics_bins_by_area():
+    query = """SELECT a.area_id, a.area_name, s.bins as total_bins, s.full_bins, s.partial_bins, s.empty_bins,
+                      ROUND(s.fill_level_sum / s.bins, 2) as avg_fill_level
+               FROM area_summary s JOIN Area a ON s.area_id = a.area_id
+               WHERE s.bins > 0 ORDER BY a.area_id"""
+    return cached_json_response(query, AREA_SUMMARY_TABLES)
+
+@app.route('/api/analytics/waste-status')
+def analytics_waste_status():
+    query = """SELECT status, total_items, total_weight_kg,
+                      ROUND(total_weight_kg / total_items, 2) as avg_weight_kg, citizens
+               FROM waste_status_totals WHERE total_items > 0 ORDER BY status"""
+    return cached_json_response(query, ('Waste', 'Citizen', 'Area'))
+
+@app.route('/api/analytics/bill-reconciliation')
+def analytics_bill_reconciliation():
+    query = """SELECT bb.bill_id, b.bill_number, b.status, bb.bill_amount, bb.total_paid,
+                      (bb.bill_amount - bb.total_paid) as balance_due, c.name as citizen_name, a.area_name
+               FROM bill_balance bb
+               JOIN Bill b ON bb.bill_id = b.bill_id
+               JOIN Citizen c ON bb.citizen_id = c.citizen_id
+               JOIN Area a ON c.area_id = a.area_id"""
+    return list_response(query, 'bb.bill_id', cache_tables=BILL_BALANCE_TABLES)
+
+# ===== BIN TELEMETRY & HISTORY API (sensor ingest with coalesced writes) =====
+
+TELEMETRY_FLUSH_INTERVAL = float(os.environ.get('TELEMETRY_FLUSH_INTERVAL', 5))
+TELEMETRY_MAX_BATCH = int(os.environ.get('TELEMETRY_MAX_BATCH', 1000))
+TELEMETRY_MAX_PENDING = int(os.environ.get('TELEMETRY_MAX_PENDING', 100000))
+BIN_EMPTY_MAX = int(os.environ.get('BIN_EMPTY_MAX', 10))
+BIN_FULL_MIN = int(os.environ.get('BIN_FULL_MIN', 80))
+
+def write_bin_readings(readings):
+    """Apply the latest reading of many bins with one UPDATE ... JOIN over a derived table and record their history
+
+    A reading older than the bin's last_reading_at is not applied: another worker (each
+    has its own coalescer) may already have written a newer one.
+    """
+    rows, params = derived_rows(('bin_id', 'fill_level', 'status', 'read_at'),
+                                [(bin_id, fill_level, bin_status(fill_level, BIN_EMPTY_MAX, BIN_FULL_MIN),
+                                  datetime.fromtimestamp(ts))
+                                 for bin_id, fill_level, ts in readings])
+    query = f"""UPDATE Bins b JOIN ({rows}) r ON b.bin_id = r.bin_id
+                SET b.fill_level = r.fill_level, b.status = r.status, b.last_reading_at = r.read_at
+                WHERE b.last_reading_at IS NULL OR r.read_at >= b.last_reading_at"""
+    with transaction():
+        execute_update(query, params)
+        record_fill_history([(bin_id, fill_level, datetime.fromtimestamp(int(ts)))
+                             for bin_id, fill_level, ts in readings])
+
+sensor_readings = ReadingCoalescer(write_bin_readings, flush_interval=TELEMETRY_FLUSH_INTERVAL,
+                                   max_batch=TELEMETRY_MAX_BATCH, max_pending=TELEMETRY_MAX_PENDING)
+
+def parse_reading(item):
+    """(bin_id, fill_level, timestamp) from {"bin_id", "fill_level", "timestamp"}; ValueError if invalid
+
+    timestamp may be epoch seconds or ISO 8601 and defaults to the time of receipt.
+    """
+    bin_id = int(item['bin_id'])
+    fill_level = int(round(float(item['fill_level'])))
+    if not 0 <= fill_level <= 100:
+        raise ValueError(f"fill_level out of range: {fill_level}")
+    timestamp = item.get('timestamp')
+    if timestamp is None:
+        timestamp = time.time()
+    elif isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp).timestamp()
+    return bin_id, fill_level, float(timestamp)
+
+@app.route('/api/bins/readings', methods=['POST'])
+def api_bin_readings():
+    """Accept a batch of sensor readings (JSON array or NDJSON); they reach MySQL on the next flush"""
+    try:
+        items = parse_bulk_rows()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid JSON: {e}'}), 400
+    if not isinstance(items, list):
+        return jsonify({'success': False, 'error': 'Expected a JSON array or NDJSON'}), 400
+    
+    readings, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            readings.append(parse_reading(item))
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append({'row': index, 'error': f"Missing field: {e}" if isinstance(e, KeyError) else str(e)})
+    accepted, stale, rejected = sensor_readings.add(readings)
+    status = 503 if rejected else (207 if errors else 202)
+    return jsonify({'success': not errors and rejected == 0, 'accepted': accepted, 'stale': stale,
+                    'rejected': rejected, 'invalid': errors}), status
+
+def parse_history_time(value, end_of_day=False):
+    """ISO date or datetime; a bare date used as an upper bound covers that whole day"""
+    moment = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        moment += timedelta(days=1)
+    return moment
+
+@app.route('/api/bins/<int:bin_id>/history')
+def api_bin_history(bin_id):
+    """Fill-level series for one bin, served from the coarsest rollup that meets ?step="""
+    try:
+        end = parse_history_time(request.args['to'], end_of_day=True) if request.args.get('to') else datetime.now()
+        start = parse_history_time(request.args['from']) if request.args.get('from') else end - timedelta(days=1)
+        span = (end - start).total_seconds()
+        if span <= 0:
+            raise ValueError("'from' must be before 'to'")
+        step = parse_step(request.args['step']) if request.args.get('step') else max(1, int(span // HISTORY_DEFAULT_POINTS))
+        if span / step > HISTORY_MAX_POINTS:
+            raise ValueError(f"Too many points; use a step of at least {int(span // HISTORY_MAX_POINTS) + 1}s")
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    seconds, table, column = choose_resolution(step, start, HISTORY_RETENTION_DAYS)
+    if table == 'bin_fill_history':
+        samples, low, high, total = 'COUNT(*)', 'MIN(fill_level)', 'MAX(fill_level)', 'SUM(fill_level)'
+    else:
+        samples, low, high, total = 'SUM(samples)', 'MIN(fill_min)', 'MAX(fill_max)', 'SUM(fill_sum)'
+    # Buckets of `step` seconds aligned to `from`
+    query = f"""SELECT FROM_UNIXTIME(UNIX_TIMESTAMP(%s) + FLOOR((UNIX_TIMESTAMP({column}) - UNIX_TIMESTAMP(%s)) / %s) * %s) as t,
+                       {samples} as samples, {low} as min, {high} as max, ROUND({total} / {samples}, 1) as avg
+                FROM {table}
+                WHERE bin_id = %s AND {column} >= %s AND {column} < %s
+                GROUP BY t ORDER BY t"""
+    rows = execute_query(query, (start, start, step, step, bin_id, start, end))
+    for row in rows:
+        row['t'] = row['t'].isoformat() if hasattr(row['t'], 'isoformat') else row['t']
+    return jsonify({'bin_id': bin_id, 'from': start.isoformat(), 'to': end.isoformat(), 'step': step,
+                    'source': table, 'points': rows})
+
+@app.route('/api/bins/collect-next')
+def api_bins_collect_next():
+    """City-wide (or ?area_id=) list of bins ranked by forecast time-to-full
+
+    ?group=area returns the top ?limit= bins of every area instead of one list.
+    """
+    try:
+        area_id = request.args.get('area_id', type=int)
+        within_hours = request.args.get('within_hours', type=float)
+        limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_LIMIT, type=int), MAX_PAGE_LIMIT))
+        area_ids = None if area_id is None else [area_id]
+        if request.args.get('group') == 'area':
+            return jsonify(collect_next_by_area(limit, area_ids, within_hours))
+        return jsonify(collect_next(area_ids, within_hours, limit))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.route('/api/crew/<int:crew_id>/collect-next')
+def api_crew_collect_next(crew_id):
+    """Ranked bins in the areas the crew is scheduled for on ?date= (default today)"""
+    try:
+        day = parse_date(request.args['date']) if request.args.get('date') else datetime.now().date()
+        limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_LIMIT, type=int), MAX_PAGE_LIMIT))
+        areas = execute_query("SELECT DISTINCT area_id FROM Has_Schedule WHERE crew_id = %s AND schedule_date = %s",
+                              (crew_id, day))
+        area_ids = [row['area_id'] for row in areas]
+        bins = collect_next(area_ids, request.args.get('within_hours', type=float), limit) if area_ids else []
+        return jsonify({'crew_id': crew_id, 'date': day.isoformat(), 'area_ids': area_ids, 'bins': bins})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+# ===== BATCH JOBS API =====
+
+@app.route('/api/jobs')
+def api_jobs():
+    """Progress, throughput (rows/s) and lag of the background batch jobs"""
+    return jsonify({name: job.metrics() for name, job in BATCH_JOBS.items()})
+
+@app.route('/api/jobs/<name>/run', methods=['POST'])
+def api_jobs_run(name):
+    job = BATCH_JOBS.get(name)
+    if job is None:
+        return jsonify({'success': False, 'error': f"Unknown job: {name}"}), 404
+    if not job.run_in_background():
+        return jsonify({'success': False, 'error': f"Job '{name}' is already running"}), 409
+    return jsonify({'success': True, 'message': f"Job '{name}' started"}), 202
+
+# ===== HEALTH CHECKS (liveness / readiness probes) =====
+
+READINESS_CACHE_TTL = float(os.environ.get('READINESS_CACHE_TTL', 2))
+READINESS_CHECKOUT_TIMEOUT = float(os.environ.get('READINESS_CHECKOUT_TIMEOUT', 1))
+readiness_cache = TTLCache(ttl=READINESS_CACHE_TTL)
+PROCESS_STARTED = time.time()
+
+def check_readiness():
+    """Check out a pooled connection and ping it (COM_PING, no SQL); failures are cached too"""
+    started = time.perf_counter()
+    result = {'ready': False, 'checked_at': datetime.now().isoformat(timespec='seconds')}
+    try:
+        conn = db_pool.get_connection(timeout=READINESS_CHECKOUT_TIMEOUT)
+        try:
+            conn.ping(reconnect=False)
+            result['ready'] = True
+        finally:
+            conn.close()
+    except Error as e:
+        result['error'] = str(e)
+    result['db_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving requests (never touches the database)"""
+    return jsonify({'status': 'ok', 'pid': os.getpid(), 'uptime_s': round(time.time() - PROCESS_STARTED, 1)})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: a database connection can be checked out and answers a ping (cached for READINESS_CACHE_TTL)"""
+    result = dict(readiness_cache.get_or_compute('db', check_readiness))
+    pool = db_pool.metrics()
+    result['pool'] = {key: pool[key] for key in ('size', 'in_use', 'idle', 'waiting', 'max_size')}
+    return jsonify(result), 200 if result['ready'] else 503
+
+# ===== METRICS API (Prometheus text format) =====
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and its latency / size under the matched route rule (not the raw path)"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        http_requests.inc(request.method, route, str(response.status_code))
+        http_duration.observe(time.perf_counter() - started, request.method, route)
+        # calculate_content_length() would buffer a streamed body to measure it
+        size = None if response.is_streamed else response.calculate_content_length()
+        if size is not None:
+            http_response_size.observe(size, request.method, route)
+    return response
+
+@metrics_registry.collector
+def pool_and_queue_metrics():
+    """Connection pool and audit log writer state, read at scrape time"""
+    pool = db_pool.metrics()
+    writer = audit_log.metrics()
+    gauge = lambda name, help_text, value: (name, 'gauge', help_text, [({}, value)])
+    counter = lambda name, help_text, value: (name, 'counter', help_text, [({}, value)])
+    return [
+        gauge('db_pool_connections', 'Open connections (idle + in use)', pool['size']),
+        gauge('db_pool_in_use', 'Connections checked out', pool['in_use']),
+        gauge('db_pool_idle', 'Connections idle in the pool', pool['idle']),
+        gauge('db_pool_waiting', 'Threads waiting for a connection', pool['waiting']),
+        gauge('db_pool_max_size', 'Pool size limit', pool['max_size']),
+        counter('db_pool_checkouts_total', 'Successful checkouts', pool['checkouts']),
+        counter('db_pool_timeouts_total', 'Checkouts that timed out waiting', pool['timeouts']),
+        counter('db_pool_errors_total', 'Checkouts that failed to connect or ping', pool['errors']),
+        counter('db_pool_created_total', 'Connections opened', pool['created']),
+        counter('db_pool_discarded_total', 'Broken connections closed', pool['discarded']),
+        gauge('audit_log_queue_depth', 'Entries waiting for the audit log writer', writer['queue_depth']),
+        gauge('audit_log_queue_capacity', 'Audit log queue size limit', writer['queue_capacity']),
+        counter('audit_log_enqueued_total', 'Audit entries queued', writer['enqueued']),
+        counter('audit_log_written_total', 'Audit entries written', writer['written']),
+        counter('audit_log_dropped_total', 'Audit entries dropped because the queue was full', writer['dropped']),
+        counter('audit_log_errors_total', 'Audit log write errors', writer['errors']),
+        counter('slow_queries_total', 'Statements over SLOW_QUERY_MS', slow_query_log.metrics()['recorded']),
+        ('sql_statement_info', 'gauge', 'Normalized text of each statement fingerprint',
+         [({'statement': key, 'text': text[:500]}, 1) for key, text in list(sql_statements.items())]),
+    ]
+
+@app.route('/metrics')
+def metrics():
+    """Counters and histograms of this process (under serve.py each worker answers for itself)"""
+    return Response(metrics_registry.expose(), mimetype='text/plain; version=0.0.4')
+
+# ===== REQUEST PROFILER (opt-in wall-clock sampling, /debug/profiles) =====
+
+PROFILING = os.environ.get('PROFILING', 'False').lower() in ('1', 'true', 'yes')
+PROFILE_HEADER = os.environ.get('PROFILE_HEADER', 'X-Profile')
+# If set, the header must carry this value instead of any non-empty one
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+request_profiler = SamplingProfiler(
+    interval=float(os.environ.get('PROFILE_INTERVAL_MS', 5)) / 1000,
+    capacity=int(os.environ.get('PROFILE_BUFFER', 50)),
+    max_samples=int(os.environ.get('PROFILE_MAX_SAMPLES', 20000))
+)
+
+def wants_profile():
+    """Profile this request? (PROFILE_HEADER on the request, or PROFILE_SAMPLE_RATE of all requests)"""
+    if not PROFILING or request.path.startswith('/debug/'):
+        return False
+    requested = request.headers.get(PROFILE_HEADER)
+    if requested:
+        return not PROFILE_TOKEN or requested == PROFILE_TOKEN
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+@app.before_request
+def start_request_profile():
+    if wants_profile():
+        g.profile = request_profiler.start(f"{request.method} {request.path}")
+
+@app.after_request
+def tag_profiled_response(response):
+    profile = g.get('profile')
+    if profile is not None:
+        profile.info['status'] = response.status_code
+        response.headers['X-Profile-Id'] = profile.id
+    return response
+
+@app.teardown_request
+def stop_request_profile(exc):
+    # Runs after every after_request hook, so header/caching hooks show up in the profile
+    profile = g.pop('profile', None)
+    if profile is not None:
+        request_profiler.stop(profile, route=request.url_rule.rule if request.url_rule else None)
+
+def profile_download(profiles, name):
+    """Collapsed stacks (?format=collapsed, default) or a speedscope file (?format=speedscope)"""
+    fmt = request.args.get('format', 'collapsed')
+    if fmt == 'speedscope':
+        body, mimetype, extension = json.dumps(speedscope(profiles, name)), 'application/json', 'speedscope.json'
+    elif fmt == 'collapsed':
+        body, mimetype, extension = collapsed(profiles), 'text/plain', 'collapsed.txt'
+    else:
+        return jsonify({'success': False, 'error': f"Unknown format '{fmt}' (collapsed or speedscope)"}), 400
+    return Response(body, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{name}.{extension}"'})
+
+@app.route('/debug/profiles', methods=['GET'])
+def list_profiles():
+    """Finished request profiles, newest first (?label=/api/bills filters on method + path)"""
+    return jsonify({
+        'enabled': PROFILING,
+        'sample_rate': PROFILE_SAMPLE_RATE,
+        'header': PROFILE_HEADER,
+        'profiles': [p.summary() for p in request_profiler.profiles(request.args.get('label'))]
+    })
+
+@app.route('/debug/profiles/merged')
+def download_merged_profiles():
+    """All buffered profiles (or those matching ?label=) in one download"""
+    profiles = request_profiler.profiles(request.args.get('label'))
+    if not profiles:
+        return jsonify({'success': False, 'error': 'No profiles recorded'}), 404
+    return profile_download(profiles, 'profiles-merged')
+
+@app.route('/debug/profiles/<profile_id>')
+def download_profile(profile_id):
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    return profile_download([profile], f"profile-{profile_id}")
+
+@app.route('/debug/profiles', methods=['DELETE'])
+def clear_profiles():
+    request_profiler.clear()
+    return jsonify({'success': True})
+
+# ===== SLOW QUERY LOG API =====
+
+@app.route('/debug/slow-queries', methods=['GET'])
+def get_slow_queries():
+    """Recent slow statements (newest first) with sampled EXPLAIN plans, plus a per-statement summary
+
+    ?limit=50&min_ms=500&statement=<fingerprint>
+    """
+    try:
+        limit = int(request.args.get('limit', 50))
+        min_ms = float(request.args.get('min_ms', 0))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({
+        'threshold_ms': slow_query_log.threshold * 1000 if SLOW_QUERY_LOG else None,
+        'file': slow_query_log.path,
+        'stats': slow_query_log.metrics(),
+        'statements': slow_query_log.summary(),
+        'entries': slow_query_log.entries(limit, min_ms, request.args.get('statement'))
+    })
+
+@app.route('/debug/slow-queries', methods=['DELETE'])
+def clear_slow_queries():
+    """Empty the ring buffer (the file is kept) and allow new EXPLAINs right away"""
+    slow_query_log.clear()
+    return jsonify({'success': True})
+
+# ===== SYSTEM STATS API =====
+
+@app.route('/api/system/stats')
+def system_stats():
+    """Internal counters: connection pool, audit log writer, caches, batch jobs and telemetry"""
+    return jsonify({
+        'db_pool': db_pool.metrics(),
+        'audit_log': audit_log.metrics(),
+        'entity_cache': entity_cache.stats(),
+        'dashboard_cache': {'hits': dashboard_cache.hits, 'misses': dashboard_cache.misses},
+        'jobs': {name: job.metrics() for name, job in BATCH_JOBS.items()},
+        'telemetry': sensor_readings.metrics(),
+        'forecast_cache': {'hits': forecast_cache.hits, 'misses': forecast_cache.misses},
+        'routes': {' '.join(labels): summary for labels, summary in http_duration.summary().items()},
+        'slow_queries': slow_query_log.metrics()
+    })
 
 # ===== ERROR HANDLERS =====
 
@@ -1169,28 +2661,18 @@ def serve_static(filename):
 
 # ===== MAIN =====
 
-def find_available_port(preferred_port=8000, max_attempts=5):
-    """Find an available port starting from preferred_port"""
-    import socket
-    port = preferred_port
-    for i in range(max_attempts):
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.bind(('127.0.0.1', port))
-            sock.close()
-            return port
-        except OSError:
-            port += 1
-    return preferred_port  # Fallback
+def bind_address():
+    """(host, port) from BIND (host:port, default 127.0.0.1:8000); fails instead of guessing a free port"""
+    _, address = parse_bind(os.environ.get('BIND', DEFAULT_BIND))
+    if isinstance(address, str):
+        raise ValueError("unix: sockets need serve.py; the development server binds host:port only")
+    return address
 
 if __name__ == '__main__':
-    port = find_available_port(8000)
-    print(f"\n✅ Starting Waste Management System on port {port}")
+    host, port = bind_address()
+    print(f"\n✅ Starting Waste Management System on {host}:{port}")
     print(f"📍 Access at: http://localhost:{port}")
     print(f"🌐 API at: http://localhost:{port}/api\n")
     
-    # Only warn if port changed
-    if port != 8000:
-        print(f"⚠️  Port 8000 was in use, using port {port} instead\n")
-    
-    app.run(debug=False, host='127.0.0.1', port=port, threaded=True)
+    start_background_jobs()
+    app.run(debug=False, host=host, port=port, threaded=True)
@@ -0,0 +1,231 @@
+"""
+Waste Management System - ASGI entry point
+Serves the same application under an ASGI server (uvicorn). The polled read endpoints
+(dashboard stats, bill and citizen balances) are handled natively with async handlers on
+an aiomysql pool, so thousands of idle or slow connections cost a coroutine each instead
+of an OS thread. Every other route is passed through to the Flask app on a bounded
+thread pool, so behaviour (writes, transactions, audit log, caches) is unchanged.
+
+    uvicorn asgi:application --app-dir backend --port 8000
+"""
+import asyncio
+import io
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiomysql
+from pymysql import MySQLError
+
+import app as flask_app
+
+ASYNC_POOL_SIZE = int(os.environ.get('ASYNC_POOL_SIZE', 50))
+# Threads running the Flask (WSGI) routes; requests beyond this queue instead of spawning threads
+ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 32))
+
+wsgi_executor = ThreadPoolExecutor(max_workers=ASGI_WSGI_THREADS, thread_name_prefix='wsgi')
+
+# ===== ASYNC DATABASE POOL =====
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+async def get_pool():
+    """aiomysql pool, created on first use so a database that is down at startup doesn't break the app"""
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                config = flask_app.DB_CONFIG
+                _pool = await aiomysql.create_pool(
+                    host=config['host'], user=config['user'], password=config['password'],
+                    db=config['database'], minsize=0, maxsize=ASYNC_POOL_SIZE, autocommit=True,
+                    connect_timeout=int(os.environ.get('CONNECTION_TIMEOUT', 10)),
+                    pool_recycle=float(os.environ.get('POOL_IDLE_TIMEOUT', 300)))
+    return _pool
+
+async def fetch_one(query, params=None):
+    """First row of a SELECT as a dict; None if there is none or the database did not answer"""
+    try:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                started = time.perf_counter()
+                await cursor.execute(query, params)
+                row = await cursor.fetchone()
+                flask_app.record_sql(query, started, params=params, rows=int(row is not None))
+                return row
+    except (MySQLError, OSError) as e:
+        print(f"⚠️ Async Query Execution Error: {e}")
+        return None
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+# ===== ASYNC ROUTES =====
+
+_dashboard_lock = asyncio.Lock()
+
+def json_response(body, status=200):
+    return status, flask_app.app.json.dumps(body).encode(), [(b'content-type', b'application/json')]
+
+async def dashboard_stats(scope):
+    """Same response and cache as the Flask route; concurrent misses wait for one query"""
+    cache = flask_app.dashboard_cache
+    flask_app.sync_dashboard_cache()
+    stats = cache.get('dashboard')
+    if stats is None:
+        async with _dashboard_lock:
+            stats = cache.get('dashboard')
+            if stats is None:
+                generation = cache.generation
+                row = await fetch_one(flask_app.DASHBOARD_STATS_QUERY)
+                stats = flask_app.dashboard_stats_from_row(row) if row else None
+                if stats:
+                    cache.set('dashboard', stats, generation)
+    return json_response(stats or flask_app.empty_dashboard_stats())
+
+async def bill_balance(scope, bill_id):
+    result = await fetch_one(flask_app.BILL_BALANCE_QUERY, (int(bill_id),))
+    return json_response(result or {}, 200 if result else 404)
+
+async def citizen_balance(scope, citizen_id):
+    result = await fetch_one(flask_app.CITIZEN_BALANCE_QUERY, (int(citizen_id),))
+    return json_response(result or {}, 200 if result else 404)
+
+async def healthz(scope):
+    """Liveness answered on the event loop, so a saturated WSGI thread pool doesn't fail it"""
+    return json_response({'status': 'ok', 'pid': os.getpid(),
+                          'uptime_s': round(time.time() - flask_app.PROCESS_STARTED, 1)})
+
+# (method, path pattern, handler, Flask rule used as the metrics label); anything not
+# listed goes to the Flask app
+ASYNC_ROUTES = [
+    ('GET', re.compile(r'^/healthz$'), healthz, '/healthz'),
+    ('GET', re.compile(r'^/api/dashboard-stats$'), dashboard_stats, '/api/dashboard-stats'),
+    ('GET', re.compile(r'^/api/bills/(?P<bill_id>\d+)/balance$'), bill_balance, '/api/bills/<int:bill_id>/balance'),
+    ('GET', re.compile(r'^/api/citizens/(?P<citizen_id>\d+)/balance$'), citizen_balance,
+     '/api/citizens/<int:citizen_id>/balance'),
+]
+
+def match_route(method, path):
+    for route_method, pattern, handler, rule in ASYNC_ROUTES:
+        if route_method == method:
+            match = pattern.match(path)
+            if match:
+                return handler, match.groupdict(), rule
+    return None, None, None
+
+# ===== WSGI BRIDGE =====
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+def build_environ(scope, body):
+    """PEP 3333 environ for an ASGI HTTP scope"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        # WSGI strings are latin-1 decoded bytes
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'CONTENT_LENGTH':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+async def call_wsgi(scope, receive, send):
+    """Run the Flask app for one request on the WSGI thread pool, streaming its body chunk by chunk"""
+    loop = asyncio.get_running_loop()
+    environ = build_environ(scope, await read_body(receive))
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+    def begin():
+        result = flask_app.app(environ, start_response)
+        chunks = iter(result)
+        return result, chunks, next(chunks, None)
+
+    result, chunks, chunk = await loop.run_in_executor(wsgi_executor, begin)
+    try:
+        await send({'type': 'http.response.start', 'status': started['status'], 'headers': started['headers']})
+        if chunk is None:
+            await send({'type': 'http.response.body', 'body': b''})
+        while chunk is not None:
+            following = await loop.run_in_executor(wsgi_executor, next, chunks, None)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': following is not None})
+            chunk = following
+    finally:
+        if hasattr(result, 'close'):
+            await loop.run_in_executor(wsgi_executor, result.close)
+
+# ===== APPLICATION =====
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            flask_app.start_background_jobs()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await close_pool()
+            wsgi_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    handler, kwargs, rule = match_route(scope['method'], scope['path'])
+    if handler is None:
+        return await call_wsgi(scope, receive, send)
+    started = time.perf_counter()
+    try:
+        status, body, headers = await handler(scope, **kwargs)
+    except Exception as e:
+        print(f"⚠️ Async handler error on {scope['path']}: {e}")
+        status, body, headers = json_response({'error': str(e)}, 500)
+    # Same series as the Flask after_request hook records for these routes
+    flask_app.http_requests.inc(scope['method'], rule, str(status))
+    flask_app.http_duration.observe(time.perf_counter() - started, scope['method'], rule)
+    flask_app.http_response_size.observe(len(body), scope['method'], rule)
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,304 @@
+"""
+Waste Management System - Audit log
+One long-lived thread drains a bounded queue of committed writes and appends them in
+batches to a segmented NDJSON log (database/audit_log/) that rotates by size and age.
+Closed segments are optionally gzip-compressed and listed in index.ndjson with their
+time range and per-table row counts, so readers can skip segments without opening them.
+"""
+import atexit
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+
+INDEX_FILE = 'index.ndjson'
+SEGMENT_PREFIX = 'segment-'
+
+
+def format_sql_value(param):
+    """Render one query parameter as an SQL literal"""
+    if param is None:
+        return 'NULL'
+    if isinstance(param, str):
+        # Escape single quotes in strings
+        return "'" + param.replace("'", "\\'") + "'"
+    return str(param)
+
+
+def format_query_log_entry(query_text, params, operation_type, table_name, timestamp=None):
+    """Render a parameterized write as a commented SQL entry with its actual values"""
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Substitute %s placeholders in one pass instead of one str.replace per parameter
+    formatted_query = query_text.strip()
+    if params:
+        pieces = formatted_query.split('%s')
+        values = [format_sql_value(p) for p in params]
+        if len(values) >= len(pieces) - 1:
+            formatted_query = pieces[0] + ''.join(v + piece for v, piece in zip(values, pieces[1:]))
+
+    if not formatted_query.endswith(';'):
+        formatted_query += ';'
+
+    return (
+        "\n-- ========================================\n"
+        f"-- FRONTEND AUTO-SAVE: {operation_type} Operation\n"
+        f"-- Table: {table_name}\n"
+        f"-- Timestamp: {timestamp}\n"
+        "-- Status: Successfully executed and logged\n"
+        "-- ========================================\n"
+        f"{formatted_query}\n"
+    )
+
+
+class SegmentedLog:
+    """Append-only NDJSON segments with size/age rotation, gzip of closed segments and an index
+
+    Each record is {"ts", "op", "table", "sql", "params"}; appends only touch the active
+    segment, and startup opens a fresh segment instead of reading any history.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, max_age=3600, compress=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self._file = None
+        self._path = None
+        self._opened_at = 0.0
+        self._size = 0
+        self._summary = None
+        os.makedirs(directory, exist_ok=True)
+
+    def write_batch(self, entries):
+        """Append (query, params_list, op, table, ts) entries; returns the number of records"""
+        if self._file is None or self._should_rotate():
+            self._rotate()
+        lines = []
+        tables = self._summary['tables']
+        for query_text, params_list, operation_type, table_name, timestamp in entries:
+            sql = query_text.strip()
+            for params in params_list:
+                lines.append(json.dumps({'ts': timestamp, 'op': operation_type, 'table': table_name,
+                                         'sql': sql, 'params': list(params) if params else []},
+                                        default=str, ensure_ascii=False))
+            tables[table_name] = tables.get(table_name, 0) + len(params_list)
+            self._summary['first_ts'] = self._summary['first_ts'] or timestamp
+            self._summary['last_ts'] = timestamp
+        data = ('\n'.join(lines) + '\n').encode('utf-8') if lines else b''
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        self._summary['records'] += len(lines)
+        return len(lines)
+
+    def close(self):
+        if self._file is not None:
+            self._close_segment(background=False)
+
+    def _should_rotate(self):
+        return self._size >= self.max_bytes or (time.monotonic() - self._opened_at) >= self.max_age
+
+    def _rotate(self):
+        if self._file is not None:
+            self._close_segment(background=True)
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        # pid keeps segments from several worker processes apart
+        self._path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{stamp}-{os.getpid()}.ndjson")
+        self._file = open(self._path, 'ab', buffering=1 << 16)
+        self._opened_at = time.monotonic()
+        self._size = 0
+        self._summary = {'records': 0, 'first_ts': None, 'last_ts': None, 'tables': {}}
+
+    def _close_segment(self, background):
+        path, summary = self._path, self._summary
+        self._file.close()
+        self._file = None
+        if summary['records'] == 0:
+            os.remove(path)
+            return
+        if self.compress and background:
+            threading.Thread(target=self._finish_segment, args=(path, summary), daemon=True).start()
+        else:
+            self._finish_segment(path, summary, compress=self.compress and background)
+
+    def _finish_segment(self, path, summary, compress=True):
+        """Compress a closed segment (optional) and record it in the index"""
+        segment = path
+        if compress:
+            segment = path + '.gz'
+            with open(path, 'rb') as src, gzip.open(segment + '.tmp', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(segment + '.tmp', segment)
+            os.remove(path)
+        entry = dict(summary, segment=os.path.basename(segment))
+        with open(os.path.join(self.directory, INDEX_FILE), 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+def read_index(directory):
+    """Index entries of closed segments, oldest first"""
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def list_segments(directory, since=None, table=None):
+    """Segment paths that may hold records newer than since (ISO timestamp) for table
+
+    Indexed segments are filtered by their recorded time range and tables; segments not
+    yet in the index (still active, or being compressed) are always included.
+    """
+    indexed = set()
+    selected = []
+    for entry in read_index(directory):
+        name = entry['segment']
+        indexed.add(name)
+        indexed.add(name[:-3] if name.endswith('.gz') else name)
+        if since and entry['last_ts'] and entry['last_ts'] <= since:
+            continue
+        if table and table not in entry['tables']:
+            continue
+        selected.append(os.path.join(directory, name))
+    for path in sorted(glob.glob(os.path.join(directory, SEGMENT_PREFIX + '*.ndjson*'))):
+        name = os.path.basename(path)
+        if name.endswith('.tmp') or name in indexed:
+            continue
+        if name.endswith('.gz') and os.path.exists(path[:-3]):
+            continue
+        selected.append(path)
+    return sorted(selected, key=os.path.basename)
+
+
+def iter_records(path):
+    """Yield the records of one (optionally gzip-compressed) segment"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class AuditLogWriter:
+    """Bounded-queue, group-committing appender feeding a SegmentedLog
+
+    submit() blocks for at most block_timeout seconds when the queue is full (backpressure)
+    and then drops the entry, counting it in the 'dropped' metric.
+    """
+
+    _STOP = object()
+
+    def __init__(self, sink, max_queue=10000, batch_size=500, flush_interval=0.2, block_timeout=0.05):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            'enqueued': 0, 'written': 0, 'dropped': 0, 'errors': 0, 'batches': 0,
+            'last_flush_ms': 0.0, 'max_flush_ms': 0.0, 'total_flush_ms': 0.0,
+        }
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+        return self
+
+    def submit(self, query_text, params_list, operation_type, table_name):
+        """Queue one statement executed with each params tuple in params_list; False if dropped"""
+        if self._thread is None:
+            self.start()
+        timestamp = datetime.now().isoformat(timespec='microseconds')
+        entry = (query_text, params_list, operation_type, table_name, timestamp)
+        try:
+            self._queue.put(entry, timeout=self.block_timeout)
+        except queue.Full:
+            with self._lock:
+                self._metrics['dropped'] += len(params_list)
+                dropped = self._metrics['dropped']
+            if dropped % 1000 < len(params_list):
+                print(f"⚠️ Audit log queue full, dropped {dropped} entries so far")
+            return False
+        with self._lock:
+            self._metrics['enqueued'] += len(params_list)
+        return True
+
+    def stop(self, timeout=5):
+        """Flush everything queued so far and stop the writer thread"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(self._STOP)
+        thread.join(timeout)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._metrics)
+        batches = stats['batches']
+        stats['queue_depth'] = self._queue.qsize()
+        stats['queue_capacity'] = self._queue.maxsize
+        stats['avg_flush_ms'] = round(stats.pop('total_flush_ms') / batches, 3) if batches else 0.0
+        return stats
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Group commit: keep collecting until the batch is full or the interval elapses
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if self._STOP in batch:
+                stopping = True
+                batch = [entry for entry in batch if entry is not self._STOP]
+                # Drain whatever was queued before the stop request
+                while True:
+                    try:
+                        entry = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if entry is not self._STOP:
+                        batch.append(entry)
+            if batch:
+                self._flush(batch)
+        try:
+            self.sink.close()
+        except Exception as e:
+            print(f"⚠️ Audit log close error: {e}")
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        rows = sum(len(entry[1]) for entry in batch)
+        try:
+            self.sink.write_batch(batch)
+            with self._lock:
+                self._metrics['written'] += rows
+        except Exception as e:
+            with self._lock:
+                self._metrics['errors'] += rows
+            print(f"⚠️ Query auto-save error: {e}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._metrics['batches'] += 1
+            self._metrics['last_flush_ms'] = round(elapsed_ms, 3)
+            self._metrics['max_flush_ms'] = max(self._metrics['max_flush_ms'], round(elapsed_ms, 3))
+            self._metrics['total_flush_ms'] += elapsed_ms
@@ -0,0 +1,202 @@
+"""
+Waste Management System - Background batch jobs
+KeyRangeJob walks a table's primary key in fixed-size ranges and processes each range in
+its own short, committed statement, pausing between ranges so foreground requests keep
+their locks and connections. Progress is checkpointed after every range so an interrupted
+run resumes where it stopped instead of starting over. PeriodicJob runs a plain
+maintenance task on a schedule with the same metrics.
+"""
+import threading
+import time
+from datetime import datetime
+
+
+class DbCheckpoints:
+    """Job checkpoints in the batch_checkpoint table (see database/schema.sql)
+
+    execute_write should bypass the audit log and cache invalidation: checkpoints are the
+    job's own bookkeeping, not data a replay or a cached read should see.
+    """
+
+    def __init__(self, execute_query, execute_write):
+        self.execute_query = execute_query
+        self.execute_write = execute_write
+
+    def load(self, job_name):
+        row = self.execute_query("SELECT last_key FROM batch_checkpoint WHERE job_name = %s",
+                                 (job_name,), fetch_all=False)
+        return row['last_key'] if row else None
+
+    def save(self, job_name, last_key, rows_done):
+        self.execute_write(
+            """INSERT INTO batch_checkpoint (job_name, last_key, rows_done) VALUES (%s, %s, %s)
+               ON DUPLICATE KEY UPDATE last_key = VALUES(last_key), rows_done = VALUES(rows_done)""",
+            (job_name, last_key, rows_done))
+
+
+class ScheduledJob:
+    """Run-once / run-on-a-schedule plumbing shared by the jobs; subclasses implement run_once()"""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._running = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_in_background(self):
+        """Start one run on a daemon thread; False if a run is already active"""
+        with self._lock:
+            if self._running:
+                return False
+        threading.Thread(target=self.run_once, name=f"job-{self.name}", daemon=True).start()
+        return True
+
+    def start(self, interval):
+        """Run every interval seconds on a daemon thread until stop()"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+
+        def loop():
+            while not self._stop.is_set():
+                self.run_once()
+                self._stop.wait(interval)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name=f"job-{self.name}-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+class KeyRangeJob(ScheduledJob):
+    """Throttled primary-key range walker with checkpoints and throughput/lag metrics
+
+    key_bounds() returns (min_key, max_key) or None for an empty table.
+    process_range(lo, hi) handles keys in [lo, hi) and returns the number of rows changed.
+    lag() (optional) returns how far behind the job is, in whatever unit it chooses.
+    """
+
+    def __init__(self, name, key_bounds, process_range, checkpoints, batch_size=1000, pause=0.05, lag=None):
+        super().__init__(name)
+        self.key_bounds = key_bounds
+        self.process_range = process_range
+        self.checkpoints = checkpoints
+        self.batch_size = batch_size
+        self.pause = pause
+        self.lag = lag
+        self._metrics = {
+            'runs': 0, 'ranges': 0, 'keys_scanned': 0, 'rows_updated': 0, 'errors': 0,
+            'last_started': None, 'last_finished': None, 'last_error': None,
+            'last_run_rows': 0, 'last_run_seconds': 0.0, 'rows_per_sec': 0.0, 'keys_per_sec': 0.0,
+            'checkpoint': None,
+        }
+
+    def run_once(self):
+        """Walk from the checkpoint to the end of the table; returns False if a run is already active"""
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+            self._metrics['last_started'] = datetime.now().isoformat(timespec='seconds')
+        started = time.perf_counter()
+        rows = keys = 0
+        try:
+            bounds = self.key_bounds()
+            if bounds and bounds[0] is not None:
+                low, high = bounds
+                checkpoint = self.checkpoints.load(self.name)
+                # A checkpoint below the current bounds (rows since removed) resumes at low
+                lo = max(checkpoint + 1, low) if checkpoint is not None and checkpoint < high else low
+                while lo <= high and not self._stop.is_set():
+                    hi = lo + self.batch_size
+                    changed = self.process_range(lo, hi)
+                    rows += changed
+                    keys += hi - lo
+                    self.checkpoints.save(self.name, hi - 1, rows)
+                    with self._lock:
+                        self._metrics['ranges'] += 1
+                        self._metrics['keys_scanned'] += hi - lo
+                        self._metrics['rows_updated'] += changed
+                        self._metrics['checkpoint'] = hi - 1
+                    lo = hi
+                    if self.pause:
+                        self._stop.wait(self.pause)
+                if lo > high:
+                    # Completed a full pass - the next run starts from the beginning again
+                    self.checkpoints.save(self.name, None, rows)
+                    with self._lock:
+                        self._metrics['checkpoint'] = None
+        except Exception as e:
+            with self._lock:
+                self._metrics['errors'] += 1
+                self._metrics['last_error'] = str(e)
+            print(f"⚠️ Batch job '{self.name}' failed: {e}")
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running = False
+                self._metrics['runs'] += 1
+                self._metrics['last_finished'] = datetime.now().isoformat(timespec='seconds')
+                self._metrics['last_run_rows'] = rows
+                self._metrics['last_run_seconds'] = round(elapsed, 3)
+                self._metrics['rows_per_sec'] = round(rows / elapsed, 1) if elapsed else 0.0
+                self._metrics['keys_per_sec'] = round(keys / elapsed, 1) if elapsed else 0.0
+        return True
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._metrics, running=self._running, batch_size=self.batch_size, pause=self.pause)
+        if self.lag is not None:
+            try:
+                stats['lag'] = self.lag()
+            except Exception as e:
+                stats['lag'] = None
+                stats['lag_error'] = str(e)
+        return stats
+
+
+class PeriodicJob(ScheduledJob):
+    """Runs task() (returning the number of rows it touched) on a schedule, with the same metrics shape"""
+
+    def __init__(self, name, task):
+        super().__init__(name)
+        self.task = task
+        self._metrics = {
+            'runs': 0, 'rows_updated': 0, 'errors': 0, 'last_started': None, 'last_finished': None,
+            'last_error': None, 'last_run_rows': 0, 'last_run_seconds': 0.0, 'rows_per_sec': 0.0,
+        }
+
+    def run_once(self):
+        """Run the task once; returns False if a run is already active"""
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+            self._metrics['last_started'] = datetime.now().isoformat(timespec='seconds')
+        started = time.perf_counter()
+        rows = 0
+        try:
+            rows = self.task() or 0
+        except Exception as e:
+            with self._lock:
+                self._metrics['errors'] += 1
+                self._metrics['last_error'] = str(e)
+            print(f"⚠️ Batch job '{self.name}' failed: {e}")
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running = False
+                self._metrics['runs'] += 1
+                self._metrics['rows_updated'] += rows
+                self._metrics['last_finished'] = datetime.now().isoformat(timespec='seconds')
+                self._metrics['last_run_rows'] = rows
+                self._metrics['last_run_seconds'] = round(elapsed, 3)
+                self._metrics['rows_per_sec'] = round(rows / elapsed, 1) if elapsed else 0.0
+        return True
+
+    def metrics(self):
+        with self._lock:
+            return dict(self._metrics, running=self._running)
@@ -0,0 +1,179 @@
+"""
+Waste Management System - In-process caches
+TTLCache: short-lived computed results (dashboard aggregates), dropped on expiry or on writes
+EntityCache: size-bounded LRU of read results, validated against per-table version counters
+SharedTableVersions: the version counters in a memory-mapped file, shared by every process
+"""
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe TTL cache; invalidate() drops entries and discards results computed before it"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+        self._compute_lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, generation=None):
+        with self._lock:
+            # A write landed while we were computing - the value may already be stale
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    @property
+    def generation(self):
+        """Bumped by invalidate(); pass it to set() so a result computed across a write is dropped"""
+        with self._lock:
+            return self._generation
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value or compute it once (concurrent misses wait for the first)"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._compute_lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+            generation = self._generation
+            value = compute()
+            if value is not None:
+                self.set(key, value, generation)
+            return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+
+class TableVersions:
+    """Per-table write counters; execute_update bumps them so cached reads can tell they are stale"""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, table_name):
+        with self._lock:
+            self._versions[table_name] = self._versions.get(table_name, 0) + 1
+
+    def snapshot(self, tables):
+        with self._lock:
+            return tuple(self._versions.get(t, 0) for t in tables)
+
+
+class SharedTableVersions:
+    """TableVersions kept in a memory-mapped file, so a write in one process makes the cached
+    reads of every other process that maps the same file stale (prefork workers, supervisor
+    instances, run_batch_jobs.py)
+
+    Table names hash into a fixed set of 8-byte slots; a collision only makes a cached read
+    look stale early. Bumps are serialized with flock; snapshots read the slots unlocked.
+    The file must be opened after fork (each process needs its own descriptor for flock).
+    """
+
+    SLOTS = 1024
+    _SLOT = struct.Struct('Q')
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = self.SLOTS * self._SLOT.size
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()   # flock doesn't exclude threads sharing the descriptor
+
+    def _offset(self, table_name):
+        return zlib.crc32(table_name.encode()) % self.SLOTS * self._SLOT.size
+
+    def bump(self, table_name):
+        offset = self._offset(table_name)
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._SLOT.pack_into(self._map, offset, self._SLOT.unpack_from(self._map, offset)[0] + 1)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def snapshot(self, tables):
+        return tuple(self._SLOT.unpack_from(self._map, self._offset(t))[0] for t in tables)
+
+
+class EntityCache:
+    """LRU cache whose entries are only valid while the versions of their source tables are unchanged"""
+
+    def __init__(self, versions, max_entries=256, ttl=300):
+        self.versions = versions
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, tables):
+        current = self.versions.snapshot(tables)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[0] == current and entry[1] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, tables, value, versions=None):
+        """Store value tagged with the table versions it was read under (defaults to current)"""
+        if versions is None:
+            versions = self.versions.snapshot(tables)
+        with self._lock:
+            self._data[key] = (versions, time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._data)
+        return {'entries': size, 'max_entries': self.max_entries, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
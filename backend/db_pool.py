@@ -0,0 +1,204 @@
+"""
+Waste Management System - Connection manager
+A MySQL connection pool that queues waiters with a deadline instead of failing when
+exhausted, grows on demand between a minimum and maximum size, skips the liveness ping
+for recently used connections, and keeps checkout/usage metrics.
+"""
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector.errors import InterfaceError, OperationalError, PoolError
+
+
+def is_disconnect(error):
+    """True for errors that leave the connection unusable (lost connection, client-side
+    failures) rather than a statement the server rejected"""
+    errno = getattr(error, 'errno', None)
+    return isinstance(error, (InterfaceError, OperationalError)) or (errno is not None and 2000 <= errno < 3000)
+
+
+class PooledConnection:
+    """Proxy around a raw connection; close() hands it back to the manager instead of closing it
+
+    After close() the proxy no longer holds the connection, so a late cursor() or commit()
+    raises instead of running on a connection another caller has checked out. Callers
+    report errors with note_error(); a connection that lost its link is discarded on close.
+    """
+
+    def __init__(self, manager, raw):
+        self._manager = manager
+        self._raw = raw
+        self._broken = False
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get('_raw')
+        if raw is None:
+            raise OperationalError("Connection was already returned to the pool")
+        return getattr(raw, name)
+
+    def note_error(self, error):
+        if is_disconnect(error):
+            self._broken = True
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._manager.release(raw, discard=self._broken)
+
+    def is_connected(self):
+        return self._raw is not None and self._raw.is_connected()
+
+
+class ConnectionManager:
+    """Bounded connection pool with deadline-based waiting and health metrics"""
+
+    def __init__(self, db_config, min_size=2, max_size=10, checkout_timeout=5.0,
+                 validate_after=5.0, idle_timeout=300.0, connect_kwargs=None, on_checkout=None):
+        self.db_config = db_config
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.checkout_timeout = checkout_timeout
+        self.validate_after = validate_after
+        self.idle_timeout = idle_timeout
+        self.connect_kwargs = connect_kwargs or {}
+        self.on_checkout = on_checkout  # called with the wait in seconds after each successful checkout
+        self._idle = deque()  # (raw connection, last released monotonic time)
+        self._size = 0        # open connections, idle + in use
+        self._in_use = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._metrics = {
+            'checkouts': 0, 'timeouts': 0, 'errors': 0, 'created': 0, 'discarded': 0,
+            'pings': 0, 'pings_skipped': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0, 'peak_in_use': 0,
+        }
+
+    def _connect(self):
+        return mysql.connector.connect(autocommit=False, **self.connect_kwargs, **self.db_config)
+
+    def get_connection(self, timeout=None):
+        """Check out a connection, waiting up to timeout seconds for one to become free
+
+        Raises PoolError on timeout and mysql.connector.Error if a new connection can't be opened.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        started = time.perf_counter()
+        raw = None
+        expired = []
+        try:
+            with self._cond:
+                while True:
+                    expired.extend(self._trim_idle())
+                    if self._idle:
+                        raw, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # Reserve a slot, then connect outside the lock
+                        self._size += 1
+                        last_used = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise PoolError(f"Timed out after {timeout}s waiting for a database connection")
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                self._in_use += 1
+        finally:
+            # Closing can block on the network; never hold up other checkouts for it
+            for conn in expired:
+                self._close_quietly(conn)
+
+        try:
+            if raw is None:
+                raw = self._connect()
+                self._count('created')
+            elif time.monotonic() - last_used >= self.validate_after:
+                # Only connections that sat idle for a while are pinged
+                self._count('pings')
+                raw.ping(reconnect=True, attempts=1, delay=0)
+            else:
+                self._count('pings_skipped')
+        except mysql.connector.Error:
+            self._count('errors')
+            self._discard(raw)
+            raise
+
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._cond:
+            self._metrics['checkouts'] += 1
+            self._metrics['wait_ms_total'] += waited_ms
+            self._metrics['wait_ms_max'] = max(self._metrics['wait_ms_max'], waited_ms)
+            self._metrics['peak_in_use'] = max(self._metrics['peak_in_use'], self._in_use)
+        if self.on_checkout is not None:
+            self.on_checkout(waited_ms / 1000)
+        return PooledConnection(self, raw)
+
+    def release(self, raw, discard=False):
+        """Return a connection to the pool, rolling back anything left uncommitted
+
+        Broken connections (discard=True, or a failed rollback) are closed and their slot
+        freed instead of going back to the idle list, where the next checkout would skip
+        the ping and hand them out again.
+        """
+        if discard:
+            self._discard(raw)
+            return
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _discard(self, raw):
+        if raw is not None:
+            self._close_quietly(raw)
+        with self._cond:
+            self._in_use -= 1
+            self._size -= 1
+            self._metrics['discarded'] += 1
+            self._cond.notify()
+
+    def _trim_idle(self):
+        """Take connections idle longer than idle_timeout out of the pool (keeping at least
+        min_size open) and return them for the caller to close once the lock is released"""
+        now = time.monotonic()
+        expired = []
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            raw, _ = self._idle.popleft()
+            self._size -= 1
+            expired.append(raw)
+        return expired
+
+    def _count(self, key):
+        with self._cond:
+            self._metrics[key] += 1
+
+    def metrics(self):
+        with self._cond:
+            stats = dict(self._metrics)
+            stats.update(size=self._size, in_use=self._in_use, idle=len(self._idle), waiting=self._waiting,
+                         min_size=self.min_size, max_size=self.max_size)
+        stats['wait_ms_avg'] = round(stats['wait_ms_total'] / stats['checkouts'], 3) if stats['checkouts'] else 0.0
+        stats['wait_ms_total'] = round(stats['wait_ms_total'], 3)
+        stats['wait_ms_max'] = round(stats['wait_ms_max'], 3)
+        attempts = stats['checkouts'] + stats['errors'] + stats['timeouts']
+        stats['error_rate'] = round((stats['errors'] + stats['timeouts']) / attempts, 4) if attempts else 0.0
+        return stats
@@ -0,0 +1,101 @@
+"""
+Waste Management System - Bin fill-level history
+Raw readings go to a day-partitioned bin_fill_history table; every write also folds the
+readings into 1-minute, hourly and daily rollups. Reads pick the coarsest rollup that
+still meets the requested resolution, and retention drops whole raw partitions instead
+of deleting rows.
+"""
+from datetime import date, datetime, timedelta
+
+# (bucket seconds, table, time column); raw history last
+RESOLUTIONS = [
+    (86400, 'bin_fill_rollup_1d', 'bucket_start'),
+    (3600, 'bin_fill_rollup_1h', 'bucket_start'),
+    (60, 'bin_fill_rollup_1m', 'bucket_start'),
+    (1, 'bin_fill_history', 'recorded_at'),
+]
+ROLLUPS = RESOLUTIONS[:3]
+
+STEP_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# MySQL TO_DAYS() of a date is its proleptic ordinal plus 365
+TO_DAYS_OFFSET = 365
+
+
+def bucket_start(moment, seconds):
+    """Start of the (local time) bucket of the given size that contains moment"""
+    if seconds >= 86400:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if seconds >= 3600:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(second=0, microsecond=0)
+
+
+def rollup_rows(readings, seconds):
+    """Fold (bin_id, fill_level, datetime) readings into one row per (bin, bucket)
+
+    Rows are (bin_id, bucket_start, samples, fill_min, fill_max, fill_sum, fill_last, last_at).
+    """
+    buckets = {}
+    for bin_id, fill_level, moment in readings:
+        key = (bin_id, bucket_start(moment, seconds))
+        row = buckets.get(key)
+        if row is None:
+            buckets[key] = [1, fill_level, fill_level, fill_level, fill_level, moment]
+            continue
+        row[0] += 1
+        row[1] = min(row[1], fill_level)
+        row[2] = max(row[2], fill_level)
+        row[3] += fill_level
+        if moment >= row[5]:
+            row[4], row[5] = fill_level, moment
+    return [(bin_id, start, *row) for (bin_id, start), row in buckets.items()]
+
+
+def parse_step(value):
+    """Seconds for a step like '300', '5m', '1h' or '1d'; ValueError if malformed"""
+    value = value.strip().lower()
+    unit = STEP_UNITS.get(value[-1:])
+    seconds = int(value[:-1]) * unit if unit else int(value)
+    if seconds <= 0:
+        raise ValueError(f"Invalid step: {value}")
+    return seconds
+
+
+def choose_resolution(step, start, retention_days, now=None):
+    """(bucket seconds, table, time column) to answer a query from start at the given step
+
+    The coarsest level whose buckets are no wider than step wins; if that level no longer
+    holds data as old as start, the finest coarser level that still does is used instead.
+    """
+    now = now or datetime.now()
+    finest_first = list(reversed(RESOLUTIONS))
+    candidates = [level for level in RESOLUTIONS if level[0] <= step] or [finest_first[0]]
+    chosen = candidates[0]
+    for level in finest_first[finest_first.index(chosen):]:
+        if start >= now - timedelta(days=retention_days[level[1]]):
+            return level
+    return RESOLUTIONS[0]
+
+
+def partition_day(to_days):
+    return date.fromordinal(int(to_days) - TO_DAYS_OFFSET)
+
+
+def partition_plan(partitions, today, keep_days, days_ahead):
+    """Daily partitions to add and expired partitions to drop
+
+    partitions is a list of (name, description) from information_schema.PARTITIONS, where
+    description is the TO_DAYS() upper bound or 'MAXVALUE'. Returns (add, drop): add is a
+    list of (name, exclusive upper bound date) to split out of pmax, drop a list of names.
+    """
+    bounded = [(name, partition_day(desc)) for name, desc in partitions if desc != 'MAXVALUE']
+    cutoff = today - timedelta(days=keep_days)
+    drop = [name for name, upper in bounded if upper <= cutoff]
+    highest = max((upper for _, upper in bounded), default=cutoff)
+    day = max(highest, cutoff)
+    add = []
+    while day <= today + timedelta(days=days_ahead):
+        add.append((f"p{day:%Y%m%d}", day + timedelta(days=1)))
+        day += timedelta(days=1)
+    return add, drop
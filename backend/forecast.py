@@ -0,0 +1,91 @@
+"""
+Waste Management System - Bin fill-rate forecasting
+Estimates every bin's fill rate from its recent fill-level history with one vectorized
+least-squares pass (NumPy), falls back to the area's average rate for bins without
+enough history, and ranks bins by the hours left until they are full.
+"""
+import numpy as np
+
+
+def fill_rates(bin_index, hours, levels, n_bins, reset_drop=20.0):
+    """Per-bin fill rate (percentage points per hour) and sample count
+
+    bin_index, hours and levels are parallel arrays sorted by (bin, time). Only samples
+    after a bin's last emptying (a drop of more than reset_drop points) are fitted, so a
+    collection in the middle of the window doesn't drag the slope negative.
+    """
+    rates = np.full(n_bins, np.nan)
+    counts = np.zeros(n_bins, dtype=np.int64)
+    if len(bin_index) == 0:
+        return rates, counts
+    positions = np.arange(len(bin_index))
+    new_bin = np.ones(len(bin_index), dtype=bool)
+    new_bin[1:] = bin_index[1:] != bin_index[:-1]
+    emptied = np.zeros(len(bin_index), dtype=bool)
+    emptied[1:] = (np.diff(levels) < -reset_drop) & ~new_bin[1:]
+    # Index of the segment each sample belongs to, and the last segment of each bin
+    segment_start = np.maximum.accumulate(np.where(new_bin | emptied, positions, 0))
+    last_start = np.zeros(n_bins, dtype=np.int64)
+    np.maximum.at(last_start, bin_index, segment_start)
+    keep = segment_start == last_start[bin_index]
+
+    b, t, y = bin_index[keep], hours[keep], levels[keep]
+    n = np.bincount(b, minlength=n_bins).astype(float)
+    st = np.bincount(b, t, minlength=n_bins)
+    sy = np.bincount(b, y, minlength=n_bins)
+    stt = np.bincount(b, t * t, minlength=n_bins)
+    sty = np.bincount(b, t * y, minlength=n_bins)
+    denom = n * stt - st * st
+    valid = (n >= 2) & (denom > 1e-9)
+    rates[valid] = (n[valid] * sty[valid] - st[valid] * sy[valid]) / denom[valid]
+    counts[:] = n
+    return rates, counts
+
+
+def area_fallback(rates, area_ids):
+    """Replace missing rates with the mean positive rate of the bin's area (0 if none)"""
+    known = ~np.isnan(rates) & (rates > 0)
+    areas, area_index = np.unique(area_ids, return_inverse=True)
+    totals = np.bincount(area_index, np.where(known, rates, 0.0), minlength=len(areas))
+    counts = np.bincount(area_index, known.astype(float), minlength=len(areas))
+    area_rate = np.divide(totals, counts, out=np.zeros(len(areas)), where=counts > 0)
+    missing = np.isnan(rates)
+    filled = rates.copy()
+    filled[missing] = area_rate[area_index[missing]]
+    return filled, missing
+
+
+def forecast(bin_ids, area_ids, fill_levels, history_bins, history_hours, history_levels,
+             full_level=100.0, reset_drop=20.0):
+    """Fill rate and hours-to-full for every bin
+
+    bin_ids must be sorted; history_* are samples sorted by (bin_id, time). Returns a dict
+    of arrays aligned with bin_ids: rate, hours_to_full (inf when not filling), samples
+    and estimated (True where the area average was used).
+    """
+    bin_ids = np.asarray(bin_ids)
+    history_bins = np.asarray(history_bins)
+    if len(bin_ids) and len(history_bins):
+        index = np.minimum(np.searchsorted(bin_ids, history_bins), len(bin_ids) - 1)
+        known = bin_ids[index] == history_bins  # drops history of bins that no longer exist
+    else:
+        index = np.zeros(len(history_bins), dtype=np.int64)
+        known = np.zeros(len(history_bins), dtype=bool)
+    rates, samples = fill_rates(index[known], np.asarray(history_hours, dtype=float)[known],
+                                np.asarray(history_levels, dtype=float)[known], len(bin_ids), reset_drop)
+    rates, estimated = area_fallback(rates, np.asarray(area_ids))
+
+    fill = np.asarray(fill_levels, dtype=float)
+    remaining = np.maximum(full_level - fill, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hours = np.where(rates > 0, remaining / rates, np.inf)
+    hours[remaining <= 0] = 0.0
+    return {'rate': rates, 'hours_to_full': hours, 'samples': samples, 'estimated': estimated}
+
+
+def rank(hours_to_full, fill_levels, mask=None, limit=None):
+    """Indices of bins ordered soonest-to-full first (fuller bins first on ties)"""
+    order = np.lexsort((-np.asarray(fill_levels, dtype=float), hours_to_full))
+    if mask is not None:
+        order = order[np.asarray(mask)[order]]
+    return order[:limit] if limit else order
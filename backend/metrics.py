@@ -0,0 +1,203 @@
+"""
+Waste Management System - Metrics registry
+Counters and histograms kept in process and rendered in the Prometheus text exposition
+format. Recording is a dict lookup plus a few additions under one lock, so it is cheap
+enough for every request and every SQL statement. Values owned by other components
+(pool size, audit queue depth, ...) are read at scrape time through collector callbacks
+instead of being copied on every change.
+"""
+import re
+import threading
+import zlib
+from bisect import bisect_left
+from functools import lru_cache
+
+# Seconds; covers cached reads (~1 ms) up to slow reports
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label combination"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, _labels(self.labelnames, labels), value) for labels, value in sorted(items)]
+
+
+class Histogram:
+    """Bucketed observations per label combination (cumulative on export, like Prometheus)"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}   # labels -> [count per bucket (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+
+    def quantile(self, fraction, counts):
+        """Estimate a quantile from bucket counts (linear within the bucket, as histogram_quantile does)"""
+        total = sum(counts)
+        if not total:
+            return None
+        rank = fraction * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if seen + count >= rank and count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def summary(self, fractions=(0.5, 0.95, 0.99)):
+        """{labels: {'count', 'sum', 'p50', ...}} for JSON consumers"""
+        result = {}
+        for labels, (counts, total) in self.snapshot().items():
+            entry = {'count': sum(counts), 'sum': round(total, 6)}
+            for fraction in fractions:
+                estimate = self.quantile(fraction, counts)
+                entry[f"p{round(fraction * 100):d}"] = round(estimate, 6) if estimate is not None else None
+            result[labels] = entry
+        return result
+
+    def samples(self):
+        lines = []
+        for labels, (counts, total) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                lines.append((f"{self.name}_bucket", _labels(self.labelnames, labels, f'le="{_number(bound)}"'),
+                              cumulative))
+            lines.append((f"{self.name}_sum", _labels(self.labelnames, labels), total))
+            lines.append((f"{self.name}_count", _labels(self.labelnames, labels), cumulative))
+        return lines
+
+
+class Registry:
+    """Metrics plus scrape-time collectors, rendered together by expose()"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """Register fn() -> [(name, kind, help, [(labels dict, value), ...]), ...]; usable as a decorator"""
+        self._collectors.append(fn)
+        return fn
+
+    def expose(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in metric.samples())
+        for fn in self._collectors:
+            try:
+                families = fn()
+            except Exception as e:
+                lines.append(f"# collector {getattr(fn, '__name__', fn)} failed: {_escape(e)}")
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels.keys(), labels.values())} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+_WHITESPACE = re.compile(r'\s+')
+_VALUE_GROUPS = re.compile(r'(\([^()]*\))(\s*,\s*\([^()]*\))+')
+_IN_LISTS = re.compile(r'\bIN\s*\((\s*%s\s*,)+\s*%s\s*\)', re.IGNORECASE)
+_UNION_ROWS = re.compile(r'\b(SELECT [^()]*?)( UNION ALL \1\b)+', re.IGNORECASE)
+_VERB = re.compile(r'^\W*(\w+)')
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|JOIN)\s+`?(\w+)', re.IGNORECASE)
+# Longer statements are batches; caching them would pin one long string per batch size
+_CACHED_QUERY_CHARS = 2048
+
+
+def _statement_key(query):
+    text = _WHITESPACE.sub(' ', query).strip()
+    text = _VALUE_GROUPS.sub(r'\1, ...', text)
+    text = _IN_LISTS.sub('IN (...)', text)
+    text = _UNION_ROWS.sub(r'\1 UNION ALL ...', text)
+    verb = _VERB.match(text)
+    table = _TABLE.search(text)
+    return (f"{zlib.crc32(text.encode()):08x}", verb.group(1).upper() if verb else '?',
+            table.group(1) if table else '-'), text
+
+
+_cached_statement_key = lru_cache(maxsize=2048)(_statement_key)
+
+
+def statement_key(query):
+    """(fingerprint, verb, table) for a SQL string
+
+    Whitespace is collapsed and multi-row VALUES groups, IN (%s, ...) lists and
+    SELECT ... UNION ALL SELECT ... inline tables (app.derived_rows) are folded, so
+    statements that differ only in batch size share one fingerprint.
+    """
+    if len(query) > _CACHED_QUERY_CHARS:
+        return _statement_key(query)
+    return _cached_statement_key(query)
@@ -0,0 +1,271 @@
+"""
+Waste Management System - Prefork server
+The master binds the listening socket once and forks WORKERS processes that all accept
+on it, each with its own interpreter (and GIL). The application is imported inside each
+worker after the fork, so connection pools, the audit log writer and background threads
+are created per worker instead of being copied half-initialised from the master.
+
+SIGHUP rolls the workers one at a time: a replacement is forked (loading the current
+code), and the old worker is only told to drain once the new one reports ready, so some
+worker is always accepting. SIGTERM/SIGINT drain all workers and exit. Workers that die
+unexpectedly are replaced.
+"""
+import atexit
+import os
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+
+DEFAULT_BIND = '127.0.0.1:8000'
+
+
+def parse_bind(value):
+    """(family, address) for 'host:port', ':port', '[ipv6]:port' or 'unix:/path/to.sock'"""
+    value = value.strip()
+    if value.startswith('unix:'):
+        return socket.AF_UNIX, value[len('unix:'):]
+    host, sep, port = value.rpartition(':')
+    if not sep or not port.isdigit():
+        raise ValueError(f"Invalid bind address '{value}' (expected host:port or unix:/path)")
+    host = host.strip('[]') or '0.0.0.0'
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    return family, (host, int(port))
+
+
+def bind_socket(bind, backlog=2048):
+    """Listening socket for a bind string; raises OSError if the address is taken"""
+    family, address = parse_bind(bind)
+    if family == socket.AF_UNIX and os.path.exists(address):
+        os.unlink(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    if family != socket.AF_UNIX:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(address)
+    sock.listen(backlog)
+    # Workers race to accept; the losers must get EAGAIN instead of blocking in accept()
+    sock.setblocking(False)
+    sock.set_inheritable(True)
+    return sock
+
+
+class InFlight:
+    """WSGI middleware counting requests whose response has not been closed yet"""
+
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.count += 1
+        try:
+            result = self.app(environ, start_response)
+        except BaseException:
+            self._done()
+            raise
+        return _ClosingIterator(result, self._done)
+
+    def _done(self):
+        with self._lock:
+            self.count -= 1
+
+
+class _ClosingIterator:
+    def __init__(self, result, on_close):
+        self._result = result
+        self._iter = iter(result)
+        self._on_close = on_close
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iter)
+
+    def close(self):
+        try:
+            if hasattr(self._result, 'close'):
+                self._result.close()
+        finally:
+            self._on_close()
+
+
+def run_worker(sock, load_app, worker_id, ready_fd, graceful_timeout):
+    """Body of a forked worker: load the app, serve until SIGTERM, drain, exit"""
+    from werkzeug.serving import make_server
+
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    os.environ['WORKER_ID'] = str(worker_id)
+    app = InFlight(load_app(worker_id))
+    family, address = sock.family, sock.getsockname()
+    host = f"unix://{address}" if family == socket.AF_UNIX else address[0]
+    port = 0 if family == socket.AF_UNIX else address[1]
+    server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+
+    stopping = threading.Event()
+
+    def on_term(signum, frame):
+        if not stopping.is_set():
+            stopping.set()
+            # shutdown() waits for serve_forever to return, so it can't run on this thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, on_term)
+    try:
+        os.write(ready_fd, b'1')
+    except BrokenPipeError:
+        pass  # the master isn't waiting for this worker
+    os.close(ready_fd)
+    server.serve_forever()
+
+    # Listening stopped; let requests that were already accepted finish
+    deadline = time.monotonic() + graceful_timeout
+    while app.count > 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if app.count:
+        print(f"⚠️ Worker {worker_id} (PID {os.getpid()}) exiting with {app.count} request(s) in flight")
+
+
+class Master:
+    """Forks and supervises the workers; see the module docstring for the signals"""
+
+    def __init__(self, load_app, bind=DEFAULT_BIND, workers=None, graceful_timeout=30.0, ready_timeout=60.0):
+        self.load_app = load_app
+        self.bind = bind
+        self.num_workers = workers or os.cpu_count() or 1
+        self.graceful_timeout = graceful_timeout
+        self.ready_timeout = ready_timeout
+        self.sock = None
+        self.workers = {}          # pid -> worker id
+        self.retiring = set()      # pids told to drain
+        self._signals = []
+
+    def run(self):
+        self.sock = bind_socket(self.bind)
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(signum, self._on_signal)
+        print(f"✅ Master {os.getpid()} listening on {self.bind} with {self.num_workers} workers")
+        for worker_id in range(self.num_workers):
+            self.spawn(worker_id)
+        try:
+            while True:
+                self.reap()
+                if not self._signals:
+                    time.sleep(0.2)
+                    continue
+                signum = self._signals.pop(0)
+                if signum == signal.SIGHUP:
+                    self.reload()
+                elif signum in (signal.SIGTERM, signal.SIGINT):
+                    break
+        finally:
+            self.stop()
+
+    def _on_signal(self, signum, frame):
+        if signum != signal.SIGCHLD:
+            self._signals.append(signum)
+
+    def spawn(self, worker_id, wait_ready=False):
+        """Fork one worker; with wait_ready, return its pid only once it accepts (None on failure)"""
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            code = 0
+            try:
+                for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+                    signal.signal(signum, signal.SIG_DFL)
+                run_worker(self.sock, self.load_app, worker_id, ready_w, self.graceful_timeout)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                # Flush the audit log and other exit hooks registered by the app in this worker
+                atexit._run_exitfuncs()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        os.close(ready_w)
+        self.workers[pid] = worker_id
+        try:
+            if not wait_ready:
+                return pid
+            readable, _, _ = select.select([ready_r], [], [], self.ready_timeout)
+            if readable and os.read(ready_r, 1) == b'1':
+                return pid
+        finally:
+            os.close(ready_r)
+        print(f"⚠️ Worker {worker_id} (PID {pid}) did not become ready")
+        self.retiring.add(pid)
+        self.kill(pid, signal.SIGKILL)
+        return None
+
+    def reload(self):
+        """Replace every worker, one at a time, without closing the listening socket"""
+        print(f"🔄 Rolling reload of {len(self.workers) - len(self.retiring)} workers")
+        for pid, worker_id in sorted(self.workers.items(), key=lambda item: item[1]):
+            if pid in self.retiring:
+                continue
+            if self.spawn(worker_id, wait_ready=True) is None:
+                print("⚠️ Reload aborted; the remaining old workers keep serving")
+                return
+            self.retire(pid)
+            self.wait_exit({pid}, self.graceful_timeout + 5)
+        print("✅ Reload complete")
+
+    def retire(self, pid):
+        self.retiring.add(pid)
+        self.kill(pid, signal.SIGTERM)
+
+    def kill(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def reap(self):
+        """Collect exited workers; replace the ones that were not retired on purpose"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker_id = self.workers.pop(pid, None)
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+            elif worker_id is not None:
+                print(f"⚠️ Worker {worker_id} (PID {pid}) exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+                time.sleep(1)
+                self.spawn(worker_id)
+
+    def wait_exit(self, pids, timeout):
+        deadline = time.monotonic() + timeout
+        while pids & set(self.workers) and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.05)
+        for pid in pids & set(self.workers):
+            print(f"⚠️ Worker PID {pid} did not drain in time; killing it")
+            self.kill(pid, signal.SIGKILL)
+        self.reap()
+
+    def stop(self):
+        """Drain every worker, then close the socket"""
+        pids = set(self.workers)
+        for pid in pids:
+            self.retire(pid)
+        self.wait_exit(pids, self.graceful_timeout + 5)
+        self.sock.close()
+        family, address = parse_bind(self.bind)
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.unlink(address)
+        print("✅ Master stopped")
@@ -0,0 +1,175 @@
+"""
+Waste Management System - Request sampling profiler
+While a request is being profiled, a sampler thread reads the stack of the thread serving
+it every interval (sys._current_frames), whether that thread is running Python code or
+blocked in the database driver, so the samples add up to wall-clock time. Finished
+profiles are kept in a ring buffer and exported as collapsed stacks (flamegraph.pl,
+speedscope, inferno) or as a speedscope JSON file with the samples in time order.
+"""
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class Profile:
+    """Samples of one request: [(stack, weight in ms), ...] with consecutive repeats merged"""
+
+    def __init__(self, profile_id, thread_id, label, max_samples):
+        self.id = profile_id
+        self.thread_id = thread_id
+        self.label = label
+        self.max_samples = max_samples
+        self.info = {}
+        self.started_at = time.time()
+        self.duration_ms = None
+        self.samples = []
+        self.sample_count = 0
+        self.truncated = False
+        self._started = time.perf_counter()
+        self._last = self._started
+
+    def add(self, stack, now):
+        weight = (now - self._last) * 1000
+        self._last = now
+        self.sample_count += 1
+        if self.samples and self.samples[-1][0] == stack:
+            self.samples[-1][1] += weight
+        elif len(self.samples) < self.max_samples:
+            self.samples.append([stack, weight])
+        else:
+            self.truncated = True
+
+    def finish(self):
+        self.duration_ms = round((time.perf_counter() - self._started) * 1000, 3)
+
+    def summary(self):
+        return {'id': self.id, 'label': self.label, 'started_at': self.started_at, 'duration_ms': self.duration_ms,
+                'samples': self.sample_count, 'truncated': self.truncated, **self.info}
+
+    def stacks(self):
+        """Counter of stack -> total ms"""
+        totals = Counter()
+        for stack, weight in self.samples:
+            totals[stack] += weight
+        return totals
+
+
+def frame_name(frame):
+    """'function (package/module.py:line)'; the parent directory tells flask/app.py from backend/app.py"""
+    name, filename, line = frame
+    parent, base = os.path.split(filename)
+    return f"{name} ({os.path.basename(parent)}/{base}:{line})" if parent else f"{name} ({base}:{line})"
+
+
+def collapsed(profiles):
+    """Brendan Gregg's collapsed format: 'root;caller;callee <ms>' per line, summed over profiles"""
+    totals = Counter()
+    for profile in profiles:
+        totals.update(profile.stacks())
+    lines = [f"{';'.join(frame_name(frame) for frame in stack)} {max(round(ms), 1)}"
+             for stack, ms in totals.most_common()]
+    return "\n".join(lines) + "\n"
+
+
+def speedscope(profiles, name):
+    """Speedscope file with one sampled profile per request, in time order"""
+    frames = {}
+    documents = []
+    for profile in profiles:
+        samples, weights = [], []
+        for stack, weight in profile.samples:
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(round(weight, 3))
+        documents.append({
+            'type': 'sampled', 'name': f"{profile.label} ({profile.id})", 'unit': 'milliseconds',
+            'startValue': 0, 'endValue': round(sum(weights), 3), 'samples': samples, 'weights': weights,
+        })
+    return {
+        '$schema': SPEEDSCOPE_SCHEMA,
+        'name': name,
+        'exporter': 'waste-management profiler',
+        'activeProfileIndex': 0,
+        'shared': {'frames': [{'name': n, 'file': f, 'line': l} for (n, f, l) in frames]},
+        'profiles': documents,
+    }
+
+
+class SamplingProfiler:
+    """Samples the threads of active profiles; finished ones stay in a ring buffer"""
+
+    def __init__(self, interval=0.005, capacity=50, max_samples=20000):
+        self.interval = interval
+        self.max_samples = max_samples
+        self._active = {}                     # thread id -> Profile
+        self._finished = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, label):
+        """Start profiling the calling thread; returns the Profile to pass to stop()"""
+        thread_id = threading.get_ident()
+        profile = Profile(f"{os.getpid()}-{next(self._ids)}", thread_id, label, self.max_samples)
+        with self._lock:
+            self._active[thread_id] = profile
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return profile
+
+    def stop(self, profile, **info):
+        with self._lock:
+            if self._active.get(profile.thread_id) is profile:
+                del self._active[profile.thread_id]
+        profile.finish()
+        profile.info.update(info)
+        with self._lock:
+            self._finished.append(profile)
+        return profile
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((p for p in self._finished if p.id == profile_id), None)
+
+    def profiles(self, label=None):
+        """Finished profiles, newest first; label filters on a substring of the request label"""
+        with self._lock:
+            profiles = list(self._finished)
+        return [p for p in reversed(profiles) if label is None or label in p.label]
+
+    def clear(self):
+        with self._lock:
+            self._finished.clear()
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            # Cleared before looking, so a start() in between still wakes the wait below
+            self._wake.clear()
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            for thread_id, profile in active.items():
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+                profile.add(tuple(stack), now)
+            del frames
+            time.sleep(self.interval)
@@ -0,0 +1,118 @@
+"""
+Waste Management System - Collection schedule optimizer
+Turns area demand (population plus the bins forecast to fill up each day) and crew
+capacity (available staff per day) into one crew-to-area assignment per crew and day.
+Demand is measured in staff-days; whatever a day cannot cover carries over to the next,
+so areas that were passed over rise in priority until a crew is sent.
+"""
+import heapq
+from bisect import bisect_left
+
+import numpy as np
+
+
+def bin_demand(area_index, hours_to_full, refill_hours, n_areas, n_days):
+    """Bin collections due per (area, day) over the horizon
+
+    A bin is due the day it is forecast to be full and again every refill_hours after
+    that (at most once a day); bins that are not filling (inf) are never due.
+    """
+    due = np.zeros((n_areas, n_days))
+    hours_to_full = np.asarray(hours_to_full, dtype=float)
+    filling = np.isfinite(hours_to_full) & (hours_to_full < n_days * 24)
+    if not filling.any():
+        return due
+    first = hours_to_full[filling]
+    # A period past the horizon (including inf for bins that are full but not filling)
+    # leaves only the first collection inside it
+    period = np.clip(np.nan_to_num(np.asarray(refill_hours, dtype=float)[filling], nan=np.inf),
+                     24.0, n_days * 24.0)
+    times = first[:, None] + period[:, None] * np.arange(n_days)[None, :]
+    valid = times < n_days * 24
+    areas = np.broadcast_to(np.asarray(area_index)[filling][:, None], times.shape)
+    cells = areas[valid] * n_days + (times[valid] // 24).astype(np.int64)
+    return np.bincount(cells, minlength=n_areas * n_days).reshape(n_areas, n_days).astype(float)
+
+
+def crew_capacity(team_sizes, staff_crews, staff_start_days, rostered, n_days):
+    """Available staff per (crew, day)
+
+    staff_crews / staff_start_days list every available staff assignment (crew position and
+    the horizon day it starts, <= 0 if already in effect). Crews with a roster (rostered)
+    count their available staff; crews without one fall back to team_size.
+    """
+    capacity = np.zeros((len(team_sizes), n_days + 1))
+    starts = np.clip(np.asarray(staff_start_days, dtype=np.int64), 0, n_days)
+    np.add.at(capacity, (np.asarray(staff_crews, dtype=np.int64), starts), 1)
+    capacity = np.cumsum(capacity, axis=1)[:, :n_days]
+    rostered = np.asarray(rostered, dtype=bool)
+    capacity[~rostered] = np.asarray(team_sizes, dtype=float)[~rostered, None]
+    return capacity
+
+
+def assign(need, capacity, home_area, busy=None, min_need=0.5):
+    """Greedy day-by-day assignment of crews to areas
+
+    need is (areas, days) in staff-days, capacity (crews, days) in staff and home_area the
+    area position of each crew. busy is an optional set of (crew, day) already scheduled.
+    Each day the area with the largest outstanding need (including carry-over) gets a crew
+    from its own area if one is free, otherwise the smallest free crew that covers the need
+    (the largest one if none does), until no crew is free or no area has min_need left.
+
+    Returns (assignments, unmet): assignments is a list of (day, crew, area, staff, need
+    covered) and unmet the need per area still outstanding after the last day.
+    """
+    n_areas, n_days = need.shape
+    busy = busy or set()
+    home_crews = {}
+    backlog = np.zeros(n_areas)
+    assignments = []
+    for day in range(n_days):
+        free = []                       # sorted (capacity, crew)
+        home_crews.clear()
+        for crew in np.flatnonzero(capacity[:, day] > 0):
+            crew = int(crew)
+            if (crew, day) in busy:
+                continue
+            entry = (float(capacity[crew, day]), crew)
+            free.append(entry)
+            home_crews.setdefault(int(home_area[crew]), []).append(entry)
+        free.sort()
+        taken = set()
+
+        outstanding = backlog + need[:, day]
+        heap = [(-outstanding[a], int(a)) for a in np.flatnonzero(outstanding >= min_need)]
+        heapq.heapify(heap)
+        while heap and free:
+            remaining, area = heapq.heappop(heap)
+            remaining = -remaining
+            local = [entry for entry in home_crews.get(area, ()) if entry[1] not in taken]
+            if local:
+                fits = [entry for entry in local if entry[0] >= remaining]
+                entry = min(fits) if fits else max(local)
+            else:
+                position = bisect_left(free, (remaining, -1))
+                entry = free[position] if position < len(free) else free[-1]
+            free.remove(entry)
+            taken.add(entry[1])
+            staff, crew = entry
+            covered = min(staff, remaining)
+            assignments.append((day, crew, area, staff, covered))
+            remaining -= covered
+            outstanding[area] = remaining
+            if remaining >= min_need:
+                heapq.heappush(heap, (-remaining, area))
+        backlog = outstanding
+    return assignments, backlog
+
+
+def release_busy(need, capacity, busy_rows):
+    """Deduct crews already scheduled (crew, area, day) from the need they cover; returns the busy set"""
+    busy = set()
+    for crew, area, day in busy_rows:
+        if (crew, day) in busy:
+            continue
+        busy.add((crew, day))
+        need[area, day] = max(need[area, day] - capacity[crew, day], 0.0)
+    return busy
+
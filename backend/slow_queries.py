@@ -0,0 +1,151 @@
+"""
+Waste Management System - Slow query log
+Statements slower than a threshold are kept in a ring buffer (served by /debug/slow-queries)
+and appended as NDJSON to a size-rotated file (one per process, <name>-<pid>.ndjson, so
+prefork workers never rotate a file under each other). For a sample of them (at most one per
+statement fingerprint per explain_interval) the query plan is captured with the supplied
+explain callable. Plans and file writes happen on a background thread, so the request
+that ran the slow statement only pays for a deque append and a queue put; statements
+under the threshold pay one comparison.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE')
+
+
+def describe_params(params, max_length=500):
+    """JSON-safe, length-capped rendering of a statement's parameters"""
+    if params is None:
+        return None
+    text = json.dumps(params, default=str)
+    return text if len(text) <= max_length else text[:max_length] + '...'
+
+
+class SlowQueryLog:
+
+    def __init__(self, threshold_ms=200, capacity=200, path=None, max_bytes=10 * 1024 * 1024, backups=5,
+                 explain=None, explain_interval=300.0, log_params=True, max_queue=1000):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.log_params = log_params
+        self._entries = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._explained = {}        # fingerprint -> monotonic time of the last EXPLAIN
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._file = None
+        self.path = None
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # pid keeps the files of several worker processes apart, as in the audit log
+            root, ext = os.path.splitext(path)
+            self.path = f"{root}-{os.getpid()}{ext}"
+            self._file = logging.getLogger(f"slow_queries.{self.path}")
+            self._file.setLevel(logging.INFO)
+            self._file.propagate = False
+            if not self._file.handlers:
+                self._file.addHandler(RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backups,
+                                                          encoding='utf-8', delay=True))
+        self._metrics = {'recorded': 0, 'explained': 0, 'explain_errors': 0, 'dropped': 0}
+
+    def record(self, elapsed, fingerprint, verb, text, query=None, params=None, rows=None, route=None):
+        """Keep a statement that took elapsed seconds if it is over the threshold; True if kept
+
+        text is the normalized statement shown in the log, query the original one the
+        parameters belong to (what gets EXPLAINed).
+        """
+        if elapsed < self.threshold:
+            return False
+        entry = {
+            'at': datetime.now().isoformat(timespec='milliseconds'),
+            'ms': round(elapsed * 1000, 3),
+            'statement': fingerprint,
+            'verb': verb,
+            'text': text,
+            'params': describe_params(params) if self.log_params else None,
+            'rows': rows,
+            'route': route,
+        }
+        now = time.monotonic()
+        wants_plan = False
+        with self._lock:
+            self._entries.append(entry)
+            self._metrics['recorded'] += 1
+            if self.explain and verb in EXPLAINABLE and now - self._explained.get(fingerprint, -1e18) >= self.explain_interval:
+                self._explained[fingerprint] = now
+                wants_plan = True
+        if self._file is None and not wants_plan:
+            return True
+        self._start()
+        try:
+            self._queue.put_nowait((entry, query or text, params if wants_plan else None, wants_plan))
+        except queue.Full:
+            with self._lock:
+                self._metrics['dropped'] += 1
+        return True
+
+    def entries(self, limit=None, min_ms=0.0, statement=None):
+        """Newest first (copies, since plans are attached to entries from the background thread)"""
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries]
+        entries = [e for e in reversed(entries) if e['ms'] >= min_ms and (statement is None or e['statement'] == statement)]
+        return entries[:limit] if limit else entries
+
+    def summary(self):
+        """Per fingerprint: count, total and max ms over the entries still in the buffer"""
+        result = {}
+        for entry in self.entries():
+            stats = result.setdefault(entry['statement'], {'text': entry['text'], 'count': 0, 'total_ms': 0.0,
+                                                            'max_ms': 0.0, 'has_plan': False})
+            stats['count'] += 1
+            stats['total_ms'] = round(stats['total_ms'] + entry['ms'], 3)
+            stats['max_ms'] = max(stats['max_ms'], entry['ms'])
+            stats['has_plan'] = stats['has_plan'] or 'plan' in entry
+        return result
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._metrics)
+            stats['buffered'] = len(self._entries)
+        stats['threshold_ms'] = self.threshold * 1000
+        stats['queue_depth'] = self._queue.qsize()
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._explained.clear()
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='slow-query-log', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            entry, query, params, wants_plan = self._queue.get()
+            if wants_plan:
+                try:
+                    entry['plan'] = self.explain(query, params)
+                    with self._lock:
+                        self._metrics['explained'] += 1
+                except Exception as e:
+                    entry['plan_error'] = str(e)
+                    with self._lock:
+                        self._metrics['explain_errors'] += 1
+            if self._file is not None:
+                try:
+                    self._file.info(json.dumps(entry, default=str, ensure_ascii=False))
+                except Exception as e:
+                    print(f"⚠️ Slow query log write failed: {e}")
@@ -0,0 +1,136 @@
+"""
+Waste Management System - Bin sensor telemetry
+Readings are coalesced in memory (only the newest reading per bin survives) and written
+out periodically by one flusher thread, so thousands of sensors reporting every minute
+cost one multi-row UPDATE per flush interval instead of one write per reading.
+"""
+import atexit
+import threading
+import time
+
+
+def bin_status(fill_level, empty_max=10, full_min=80):
+    """Empty/Partial/Full for a fill percentage"""
+    if fill_level >= full_min:
+        return 'Full'
+    if fill_level <= empty_max:
+        return 'Empty'
+    return 'Partial'
+
+
+class ReadingCoalescer:
+    """Latest-reading-per-bin buffer flushed by a background thread
+
+    write(readings) receives a list of (bin_id, fill_level, timestamp) and must raise on
+    failure; failed readings are merged back so a newer reading still wins. Stale readings
+    are only caught here while a newer one for the bin is buffered; once written, the
+    entry is dropped and write() itself must ignore readings older than the stored one
+    (which also covers other processes' coalescers).
+    """
+
+    def __init__(self, write, flush_interval=5.0, max_batch=1000, max_pending=100000):
+        self.write = write
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._pending = {}      # bin_id -> (fill_level, timestamp)
+        self._last_seen = {}    # bin_id -> timestamp of the newest reading not yet written
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._metrics = {
+            'received': 0, 'coalesced': 0, 'stale': 0, 'rejected': 0, 'flushes': 0, 'flushed': 0,
+            'errors': 0, 'last_flush_ms': 0.0, 'max_flush_ms': 0.0,
+        }
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='telemetry-flusher', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+        return self
+
+    def add(self, readings):
+        """Buffer (bin_id, fill_level, timestamp) readings; returns (accepted, stale, rejected)"""
+        if self._thread is None:
+            self.start()
+        accepted = stale = rejected = 0
+        with self._lock:
+            for bin_id, fill_level, timestamp in readings:
+                last = self._last_seen.get(bin_id)
+                if last is not None and timestamp < last:
+                    # Out-of-order reading older than one we already have
+                    stale += 1
+                    continue
+                if bin_id in self._pending:
+                    self._metrics['coalesced'] += 1
+                elif len(self._pending) >= self.max_pending:
+                    rejected += 1
+                    continue
+                self._pending[bin_id] = (fill_level, timestamp)
+                self._last_seen[bin_id] = timestamp
+                accepted += 1
+            self._metrics['received'] += accepted + stale + rejected
+            self._metrics['stale'] += stale
+            self._metrics['rejected'] += rejected
+        return accepted, stale, rejected
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of readings written"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            readings = [(bin_id, fill, ts) for bin_id, (fill, ts) in pending.items()]
+            started = time.perf_counter()
+            written = 0
+            try:
+                for start in range(0, len(readings), self.max_batch):
+                    chunk = readings[start:start + self.max_batch]
+                    self.write(chunk)
+                    written += len(chunk)
+                    self._forget(chunk)
+            except Exception as e:
+                print(f"⚠️ Telemetry flush error: {e}")
+                with self._lock:
+                    self._metrics['errors'] += 1
+                    for bin_id, fill, ts in readings[written:]:
+                        newer = self._pending.get(bin_id)
+                        if newer is None or newer[1] < ts:
+                            self._pending[bin_id] = (fill, ts)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+            with self._lock:
+                self._metrics['flushes'] += 1
+                self._metrics['flushed'] += written
+                self._metrics['last_flush_ms'] = elapsed_ms
+                self._metrics['max_flush_ms'] = max(self._metrics['max_flush_ms'], elapsed_ms)
+            return written
+
+    def _forget(self, written):
+        """Stop tracking bins whose newest reading has been written (keeps _last_seen bounded)"""
+        with self._lock:
+            for bin_id, _, ts in written:
+                if bin_id not in self._pending and self._last_seen.get(bin_id) == ts:
+                    del self._last_seen[bin_id]
+
+    def stop(self, timeout=5):
+        """Stop the flusher thread after one final flush"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._metrics, pending=len(self._pending), tracked_bins=len(self._last_seen))
+        stats['flush_interval'] = self.flush_interval
+        return stats
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
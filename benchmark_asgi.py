@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark: threaded Flask server vs ASGI (uvicorn + backend/asgi.py)
+Starts each server on its own port, opens --concurrency keep-alive connections against
+--path (plus --idle connections that send half a request and then stall, like slow
+mobile clients), and reports throughput, latency percentiles and the server's thread
+count / memory at the peak of the run.
+
+    python benchmark_asgi.py --concurrency 1000 --duration 15
+    python benchmark_asgi.py --url http://127.0.0.1:8000 --path /api/bills/1/balance
+"""
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+PROJECT_DIR = Path(__file__).parent.absolute()
+BACKEND_DIR = PROJECT_DIR / "backend"
+
+SERVERS = {
+    'wsgi': "from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)",
+    'asgi': "import uvicorn; uvicorn.run('asgi:application', host='127.0.0.1', port={port}, "
+            "log_level='warning', backlog=4096)",
+}
+
+
+def start_server(mode, port):
+    env = dict(os.environ, OVERDUE_JOB_INTERVAL='0', HISTORY_MAINTENANCE_INTERVAL='0')
+    return subprocess.Popen([sys.executable, '-c', SERVERS[mode].format(port=port)], cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_ready(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return True
+        except OSError:
+            await asyncio.sleep(0.2)
+    return False
+
+
+def process_stats(pid):
+    """Threads and resident memory (MB) of a process, from /proc (Linux only)"""
+    try:
+        fields = dict(line.split(':', 1) for line in Path(f"/proc/{pid}/status").read_text().splitlines())
+        return int(fields['Threads']), int(fields['VmRSS'].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, keep_alive)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {k.strip().lower(): v.strip() for k, v in (line.split(':', 1) for line in lines[1:] if ':' in line)}
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.read()
+        return status, False
+    return status, headers.get('connection', '').lower() != 'close' and lines[0].startswith('HTTP/1.1')
+
+
+async def client(host, port, path, deadline, latencies, errors):
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: keep-alive\r\n\r\n".encode()
+    writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            started = time.perf_counter()
+            writer.write(request)
+            status, keep_alive = await asyncio.wait_for(read_response(reader), max(deadline - time.monotonic(), 0.1) + 5)
+            latencies.append(time.perf_counter() - started)
+            if status >= 500:
+                errors['http_5xx'] = errors.get('http_5xx', 0) + 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def idle_client(host, port, deadline):
+    """Send half a request and stall until the deadline (holds a server connection the whole run)"""
+    try:
+        _, writer = await asyncio.open_connection(host, port)
+        writer.write(f"GET / HTTP/1.1\r\nHost: {host}\r\n".encode())
+        await asyncio.sleep(max(deadline - time.monotonic(), 0))
+        writer.close()
+    except OSError:
+        pass
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)] * 1000 if values else 0.0
+
+
+async def sample_process(pid, deadline, peak):
+    """Record the server's peak thread count and memory while the run is in progress"""
+    while time.monotonic() < deadline:
+        threads, rss = process_stats(pid)
+        if threads is not None:
+            peak['threads'] = max(peak.get('threads', 0), threads)
+            peak['rss_mb'] = max(peak.get('rss_mb', 0.0), rss)
+        await asyncio.sleep(0.5)
+
+
+async def run(host, port, path, concurrency, idle, duration, pid=None):
+    latencies, errors, peak = [], {}, {}
+    deadline = time.monotonic() + duration
+    idlers = [asyncio.create_task(idle_client(host, port, deadline)) for _ in range(idle)]
+    if pid:
+        idlers.append(asyncio.create_task(sample_process(pid, deadline, peak)))
+    started = time.monotonic()
+    await asyncio.gather(*(client(host, port, path, deadline, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+    await asyncio.gather(*idlers)
+    latencies.sort()
+    return {
+        'requests': len(latencies), 'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 0.50), 'p95': percentile(latencies, 0.95), 'p99': percentile(latencies, 0.99),
+        'errors': errors, 'threads': peak.get('threads'), 'rss_mb': peak.get('rss_mb'),
+    }
+
+
+def report(name, result):
+    threads = result['threads'] if result['threads'] is not None else '-'
+    rss = f"{result['rss_mb']:.0f}" if result['rss_mb'] is not None else '-'
+    errors = ', '.join(f"{k}={v}" for k, v in result['errors'].items()) or 'none'
+    print(f"{name:6} {result['requests']:>9} {result['rps']:>9.0f} {result['p50']:>8.1f} {result['p95']:>8.1f} "
+          f"{result['p99']:>8.1f} {threads:>8} {rss:>7}   {errors}")
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the threaded Flask server with the ASGI entry point")
+    parser.add_argument('--concurrency', type=int, default=1000, help="keep-alive connections sending requests")
+    parser.add_argument('--idle', type=int, default=0, help="extra connections that stall mid-request")
+    parser.add_argument('--duration', type=float, default=15, help="seconds per mode")
+    parser.add_argument('--path', default='/api/dashboard-stats')
+    parser.add_argument('--modes', default='wsgi,asgi', help="servers to start: wsgi, asgi or both")
+    parser.add_argument('--port', type=int, default=8100, help="first port for the started servers")
+    parser.add_argument('--url', help="benchmark an already running server instead of starting them")
+    args = parser.parse_args()
+    raise_fd_limit((args.concurrency + args.idle) * 2 + 256)
+
+    print(f"\n{args.concurrency} connections (+{args.idle} idle), {args.duration:g}s, GET {args.path}\n")
+    print(f"{'mode':6} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'threads':>8} {'rss MB':>7}   errors")
+    if args.url:
+        target = urlsplit(args.url)
+        report('url', asyncio.run(run(target.hostname, target.port or 80, args.path, args.concurrency,
+                                      args.idle, args.duration)))
+        return
+
+    for offset, mode in enumerate(m.strip() for m in args.modes.split(',')):
+        port = args.port + offset
+        server = start_server(mode, port)
+        try:
+            if not asyncio.run(wait_ready('127.0.0.1', port)):
+                print(f"{mode:6} ⚠️ server did not start on port {port}")
+                continue
+            report(mode, asyncio.run(run('127.0.0.1', port, args.path, args.concurrency, args.idle,
+                                         args.duration, server.pid)))
+        finally:
+            server.terminate()
+            try:
+                server.wait(10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == '__main__':
+    main()
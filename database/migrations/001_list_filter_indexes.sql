@@ -0,0 +1,16 @@
+-- ========================================
+-- MIGRATION 001: Indexes for API list filters
+-- Apply to an existing database: mysql -u root waste_management < database/migrations/001_list_filter_indexes.sql
+-- (New installs get these from database/schema.sql)
+-- ========================================
+
+USE waste_management;
+
+CREATE INDEX idx_waste_status_date ON Waste(status, collection_date);
+CREATE INDEX idx_bins_area_status ON Bins(area_id, status);
+CREATE INDEX idx_bins_fill_level ON Bins(fill_level);
+CREATE INDEX idx_bill_status_due ON Bill(status, due_date);
+CREATE INDEX idx_citizen_name ON Citizen(name);
+CREATE INDEX idx_payment_date ON Payment(payment_date);
+CREATE INDEX idx_schedule_date ON Has_Schedule(schedule_date);
+CREATE INDEX idx_staff_name ON Staff(staff_name);
@@ -0,0 +1,273 @@
+-- ========================================
+-- MIGRATION 002: Trigger-maintained summary tables for analytics
+-- Apply to an existing database: mysql -u root waste_management < database/migrations/002_summary_tables.sql
+-- (New installs get these from database/schema.sql)
+-- ========================================
+
+USE waste_management;
+
+-- ===== INCREMENTALLY MAINTAINED SUMMARY TABLES =====
+-- Materialized versions of area_utilization_view, waste_collection_by_area, bin_status_by_area,
+-- waste_status_summary and bill_payment_reconciliation, kept current by the triggers below so
+-- analytic reads cost O(areas) instead of re-aggregating the fact tables.
+-- MySQL does not fire triggers for rows removed by ON DELETE CASCADE, so the Area and Citizen
+-- delete triggers subtract their dependants explicitly before the cascade runs.
+-- CALL refresh_summaries() rebuilds everything from the base tables (initial load / repair).
+
+CREATE TABLE area_summary (
+    area_id INT PRIMARY KEY,
+    citizens INT NOT NULL DEFAULT 0,
+    bins INT NOT NULL DEFAULT 0,
+    full_bins INT NOT NULL DEFAULT 0,
+    partial_bins INT NOT NULL DEFAULT 0,
+    empty_bins INT NOT NULL DEFAULT 0,
+    fill_level_sum BIGINT NOT NULL DEFAULT 0,
+    crews INT NOT NULL DEFAULT 0,
+    waste_items INT NOT NULL DEFAULT 0,
+    waste_kg DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    FOREIGN KEY (area_id) REFERENCES Area(area_id) ON DELETE CASCADE
+);
+
+CREATE TABLE waste_status_totals (
+    status VARCHAR(20) PRIMARY KEY,
+    total_items INT NOT NULL DEFAULT 0,
+    total_weight_kg DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    citizens INT NOT NULL DEFAULT 0
+);
+
+-- Per (status, citizen) item counts, so waste_status_totals.citizens (a DISTINCT count) stays exact
+CREATE TABLE waste_status_citizen (
+    status VARCHAR(20) NOT NULL,
+    citizen_id INT NOT NULL,
+    items INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, citizen_id),
+    KEY idx_wsc_citizen (citizen_id)
+);
+
+CREATE TABLE bill_balance (
+    bill_id INT PRIMARY KEY,
+    citizen_id INT NOT NULL,
+    bill_amount DECIMAL(10, 2) NOT NULL,
+    total_paid DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    KEY idx_bill_balance_citizen (citizen_id),
+    FOREIGN KEY (bill_id) REFERENCES Bill(bill_id) ON DELETE CASCADE
+);
+
+DELIMITER //
+
+CREATE PROCEDURE summary_waste_delta(IN p_status VARCHAR(20), IN p_citizen INT, IN p_weight DECIMAL(10, 2), IN p_sign INT)
+BEGIN
+    DECLARE v_area INT;
+    DECLARE v_status VARCHAR(20) DEFAULT IFNULL(p_status, 'Unknown');
+    SELECT area_id INTO v_area FROM Citizen WHERE citizen_id = p_citizen;
+    UPDATE area_summary SET waste_items = waste_items + p_sign, waste_kg = waste_kg + p_sign * p_weight
+     WHERE area_id = v_area;
+    INSERT INTO waste_status_totals (status, total_items, total_weight_kg) VALUES (v_status, p_sign, p_sign * p_weight)
+        ON DUPLICATE KEY UPDATE total_items = total_items + p_sign, total_weight_kg = total_weight_kg + p_sign * p_weight;
+    IF p_sign > 0 THEN
+        INSERT INTO waste_status_citizen (status, citizen_id, items) VALUES (v_status, p_citizen, 1)
+            ON DUPLICATE KEY UPDATE items = items + 1;
+        IF ROW_COUNT() = 1 THEN
+            UPDATE waste_status_totals SET citizens = citizens + 1 WHERE status = v_status;
+        END IF;
+    ELSE
+        UPDATE waste_status_citizen SET items = items - 1 WHERE status = v_status AND citizen_id = p_citizen;
+        DELETE FROM waste_status_citizen WHERE status = v_status AND citizen_id = p_citizen AND items <= 0;
+        IF ROW_COUNT() > 0 THEN
+            UPDATE waste_status_totals SET citizens = citizens - 1 WHERE status = v_status;
+        END IF;
+    END IF;
+END //
+
+CREATE PROCEDURE summary_bin_delta(IN p_area INT, IN p_status VARCHAR(20), IN p_fill INT, IN p_sign INT)
+BEGIN
+    UPDATE area_summary
+       SET bins = bins + p_sign,
+           full_bins = full_bins + IF(p_status = 'Full', p_sign, 0),
+           partial_bins = partial_bins + IF(p_status = 'Partial', p_sign, 0),
+           empty_bins = empty_bins + IF(p_status = 'Empty', p_sign, 0),
+           fill_level_sum = fill_level_sum + p_sign * IFNULL(p_fill, 0)
+     WHERE area_id = p_area;
+END //
+
+-- Called before a Citizen row is deleted: its Waste and Payment rows go by cascade without triggers
+CREATE PROCEDURE summary_citizen_removed(IN p_citizen INT)
+BEGIN
+    DECLARE v_area INT;
+    DECLARE v_items INT;
+    DECLARE v_kg DECIMAL(14, 2);
+    SELECT area_id INTO v_area FROM Citizen WHERE citizen_id = p_citizen;
+    SELECT COUNT(*), IFNULL(SUM(weight), 0) INTO v_items, v_kg FROM Waste WHERE citizen_id = p_citizen;
+    UPDATE area_summary SET citizens = citizens - 1, waste_items = waste_items - v_items, waste_kg = waste_kg - v_kg
+     WHERE area_id = v_area;
+    UPDATE waste_status_totals t
+      JOIN (SELECT IFNULL(status, 'Unknown') AS status, COUNT(*) AS n, SUM(weight) AS kg
+              FROM Waste WHERE citizen_id = p_citizen GROUP BY IFNULL(status, 'Unknown')) x ON t.status = x.status
+       SET t.total_items = t.total_items - x.n, t.total_weight_kg = t.total_weight_kg - x.kg, t.citizens = t.citizens - 1;
+    DELETE FROM waste_status_citizen WHERE citizen_id = p_citizen;
+    -- Payments this citizen made towards bills that will survive the delete
+    UPDATE bill_balance bb
+      JOIN (SELECT bill_id, SUM(amount) AS paid FROM Payment
+             WHERE citizen_id = p_citizen AND bill_id IS NOT NULL GROUP BY bill_id) p ON bb.bill_id = p.bill_id
+       SET bb.total_paid = bb.total_paid - p.paid;
+END //
+
+-- Called before an Area row is deleted: Citizen/Waste/Payment rows in it go by cascade without triggers
+CREATE PROCEDURE summary_area_removed(IN p_area INT)
+BEGIN
+    UPDATE waste_status_totals t
+      JOIN (SELECT IFNULL(w.status, 'Unknown') AS status, COUNT(*) AS n, SUM(w.weight) AS kg,
+                   COUNT(DISTINCT w.citizen_id) AS cz
+              FROM Waste w JOIN Citizen c ON w.citizen_id = c.citizen_id
+             WHERE c.area_id = p_area GROUP BY IFNULL(w.status, 'Unknown')) x ON t.status = x.status
+       SET t.total_items = t.total_items - x.n, t.total_weight_kg = t.total_weight_kg - x.kg, t.citizens = t.citizens - x.cz;
+    DELETE wsc FROM waste_status_citizen wsc JOIN Citizen c ON wsc.citizen_id = c.citizen_id WHERE c.area_id = p_area;
+    UPDATE bill_balance bb
+      JOIN (SELECT p.bill_id, SUM(p.amount) AS paid FROM Payment p JOIN Citizen c ON p.citizen_id = c.citizen_id
+             WHERE c.area_id = p_area AND p.bill_id IS NOT NULL GROUP BY p.bill_id) x ON bb.bill_id = x.bill_id
+       SET bb.total_paid = bb.total_paid - x.paid;
+END //
+
+CREATE PROCEDURE refresh_summaries()
+BEGIN
+    DELETE FROM area_summary;
+    DELETE FROM waste_status_totals;
+    DELETE FROM waste_status_citizen;
+    DELETE FROM bill_balance;
+    INSERT INTO area_summary (area_id, citizens, bins, full_bins, partial_bins, empty_bins, fill_level_sum,
+                              crews, waste_items, waste_kg)
+    SELECT a.area_id,
+           (SELECT COUNT(*) FROM Citizen c WHERE c.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id AND b.status = 'Full'),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id AND b.status = 'Partial'),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id AND b.status = 'Empty'),
+           (SELECT IFNULL(SUM(b.fill_level), 0) FROM Bins b WHERE b.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Crew cr WHERE cr.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Waste w JOIN Citizen c ON w.citizen_id = c.citizen_id WHERE c.area_id = a.area_id),
+           (SELECT IFNULL(SUM(w.weight), 0) FROM Waste w JOIN Citizen c ON w.citizen_id = c.citizen_id
+             WHERE c.area_id = a.area_id)
+    FROM Area a;
+    INSERT INTO waste_status_citizen (status, citizen_id, items)
+    SELECT IFNULL(status, 'Unknown'), citizen_id, COUNT(*) FROM Waste GROUP BY IFNULL(status, 'Unknown'), citizen_id;
+    INSERT INTO waste_status_totals (status, total_items, total_weight_kg, citizens)
+    SELECT IFNULL(status, 'Unknown'), COUNT(*), SUM(weight), COUNT(DISTINCT citizen_id)
+      FROM Waste GROUP BY IFNULL(status, 'Unknown');
+    INSERT INTO bill_balance (bill_id, citizen_id, bill_amount, total_paid)
+    SELECT b.bill_id, b.citizen_id, b.amount, IFNULL(SUM(p.amount), 0)
+      FROM Bill b LEFT JOIN Payment p ON p.bill_id = b.bill_id
+     GROUP BY b.bill_id, b.citizen_id, b.amount;
+END //
+
+CREATE TRIGGER trg_area_insert AFTER INSERT ON Area FOR EACH ROW
+BEGIN
+    INSERT INTO area_summary (area_id) VALUES (NEW.area_id);
+END //
+
+CREATE TRIGGER trg_area_delete BEFORE DELETE ON Area FOR EACH ROW
+BEGIN
+    CALL summary_area_removed(OLD.area_id);
+END //
+
+CREATE TRIGGER trg_citizen_insert AFTER INSERT ON Citizen FOR EACH ROW
+BEGIN
+    UPDATE area_summary SET citizens = citizens + 1 WHERE area_id = NEW.area_id;
+END //
+
+CREATE TRIGGER trg_citizen_update AFTER UPDATE ON Citizen FOR EACH ROW
+BEGIN
+    DECLARE v_items INT;
+    DECLARE v_kg DECIMAL(14, 2);
+    IF NOT (OLD.area_id <=> NEW.area_id) THEN
+        SELECT COUNT(*), IFNULL(SUM(weight), 0) INTO v_items, v_kg FROM Waste WHERE citizen_id = NEW.citizen_id;
+        UPDATE area_summary SET citizens = citizens - 1, waste_items = waste_items - v_items, waste_kg = waste_kg - v_kg
+         WHERE area_id = OLD.area_id;
+        UPDATE area_summary SET citizens = citizens + 1, waste_items = waste_items + v_items, waste_kg = waste_kg + v_kg
+         WHERE area_id = NEW.area_id;
+    END IF;
+END //
+
+CREATE TRIGGER trg_citizen_delete BEFORE DELETE ON Citizen FOR EACH ROW
+BEGIN
+    CALL summary_citizen_removed(OLD.citizen_id);
+END //
+
+CREATE TRIGGER trg_bins_insert AFTER INSERT ON Bins FOR EACH ROW
+BEGIN
+    CALL summary_bin_delta(NEW.area_id, NEW.status, NEW.fill_level, 1);
+END //
+
+CREATE TRIGGER trg_bins_update AFTER UPDATE ON Bins FOR EACH ROW
+BEGIN
+    CALL summary_bin_delta(OLD.area_id, OLD.status, OLD.fill_level, -1);
+    CALL summary_bin_delta(NEW.area_id, NEW.status, NEW.fill_level, 1);
+END //
+
+CREATE TRIGGER trg_bins_delete AFTER DELETE ON Bins FOR EACH ROW
+BEGIN
+    CALL summary_bin_delta(OLD.area_id, OLD.status, OLD.fill_level, -1);
+END //
+
+CREATE TRIGGER trg_crew_insert AFTER INSERT ON Crew FOR EACH ROW
+BEGIN
+    UPDATE area_summary SET crews = crews + 1 WHERE area_id = NEW.area_id;
+END //
+
+CREATE TRIGGER trg_crew_update AFTER UPDATE ON Crew FOR EACH ROW
+BEGIN
+    IF NOT (OLD.area_id <=> NEW.area_id) THEN
+        UPDATE area_summary SET crews = crews - 1 WHERE area_id = OLD.area_id;
+        UPDATE area_summary SET crews = crews + 1 WHERE area_id = NEW.area_id;
+    END IF;
+END //
+
+CREATE TRIGGER trg_crew_delete AFTER DELETE ON Crew FOR EACH ROW
+BEGIN
+    UPDATE area_summary SET crews = crews - 1 WHERE area_id = OLD.area_id;
+END //
+
+CREATE TRIGGER trg_waste_insert AFTER INSERT ON Waste FOR EACH ROW
+BEGIN
+    CALL summary_waste_delta(NEW.status, NEW.citizen_id, NEW.weight, 1);
+END //
+
+CREATE TRIGGER trg_waste_update AFTER UPDATE ON Waste FOR EACH ROW
+BEGIN
+    CALL summary_waste_delta(OLD.status, OLD.citizen_id, OLD.weight, -1);
+    CALL summary_waste_delta(NEW.status, NEW.citizen_id, NEW.weight, 1);
+END //
+
+CREATE TRIGGER trg_waste_delete AFTER DELETE ON Waste FOR EACH ROW
+BEGIN
+    CALL summary_waste_delta(OLD.status, OLD.citizen_id, OLD.weight, -1);
+END //
+
+CREATE TRIGGER trg_bill_insert AFTER INSERT ON Bill FOR EACH ROW
+BEGIN
+    INSERT INTO bill_balance (bill_id, citizen_id, bill_amount) VALUES (NEW.bill_id, NEW.citizen_id, NEW.amount);
+END //
+
+CREATE TRIGGER trg_bill_update AFTER UPDATE ON Bill FOR EACH ROW
+BEGIN
+    UPDATE bill_balance SET citizen_id = NEW.citizen_id, bill_amount = NEW.amount WHERE bill_id = NEW.bill_id;
+END //
+
+CREATE TRIGGER trg_payment_insert AFTER INSERT ON Payment FOR EACH ROW
+BEGIN
+    UPDATE bill_balance SET total_paid = total_paid + NEW.amount WHERE bill_id = NEW.bill_id;
+END //
+
+CREATE TRIGGER trg_payment_update AFTER UPDATE ON Payment FOR EACH ROW
+BEGIN
+    UPDATE bill_balance SET total_paid = total_paid - OLD.amount WHERE bill_id = OLD.bill_id;
+    UPDATE bill_balance SET total_paid = total_paid + NEW.amount WHERE bill_id = NEW.bill_id;
+END //
+
+CREATE TRIGGER trg_payment_delete AFTER DELETE ON Payment FOR EACH ROW
+BEGIN
+    UPDATE bill_balance SET total_paid = total_paid - OLD.amount WHERE bill_id = OLD.bill_id;
+END //
+
+DELIMITER ;
+
+CALL refresh_summaries();
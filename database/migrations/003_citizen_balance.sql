@@ -0,0 +1,95 @@
+-- ========================================
+-- MIGRATION 003: Per-citizen running balances for bill reconciliation
+-- Apply to an existing database after 002: mysql -u root waste_management < database/migrations/003_citizen_balance.sql
+-- (New installs get these from database/schema.sql)
+-- ========================================
+
+USE waste_management;
+
+-- Per-citizen totals over bill_balance (kept current by the bill_balance triggers)
+CREATE TABLE citizen_balance (
+    citizen_id INT PRIMARY KEY,
+    bills INT NOT NULL DEFAULT 0,
+    billed DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    paid DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    outstanding DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    KEY idx_citizen_balance_outstanding (outstanding),
+    FOREIGN KEY (citizen_id) REFERENCES Citizen(citizen_id) ON DELETE CASCADE
+);
+
+DELIMITER //
+
+DROP PROCEDURE IF EXISTS refresh_summaries //
+
+CREATE PROCEDURE refresh_summaries()
+BEGIN
+    DELETE FROM area_summary;
+    DELETE FROM waste_status_totals;
+    DELETE FROM waste_status_citizen;
+    DELETE FROM citizen_balance;
+    DELETE FROM bill_balance;
+    INSERT INTO area_summary (area_id, citizens, bins, full_bins, partial_bins, empty_bins, fill_level_sum,
+                              crews, waste_items, waste_kg)
+    SELECT a.area_id,
+           (SELECT COUNT(*) FROM Citizen c WHERE c.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id AND b.status = 'Full'),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id AND b.status = 'Partial'),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id AND b.status = 'Empty'),
+           (SELECT IFNULL(SUM(b.fill_level), 0) FROM Bins b WHERE b.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Crew cr WHERE cr.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Waste w JOIN Citizen c ON w.citizen_id = c.citizen_id WHERE c.area_id = a.area_id),
+           (SELECT IFNULL(SUM(w.weight), 0) FROM Waste w JOIN Citizen c ON w.citizen_id = c.citizen_id
+             WHERE c.area_id = a.area_id)
+    FROM Area a;
+    INSERT INTO waste_status_citizen (status, citizen_id, items)
+    SELECT IFNULL(status, 'Unknown'), citizen_id, COUNT(*) FROM Waste GROUP BY IFNULL(status, 'Unknown'), citizen_id;
+    INSERT INTO waste_status_totals (status, total_items, total_weight_kg, citizens)
+    SELECT IFNULL(status, 'Unknown'), COUNT(*), SUM(weight), COUNT(DISTINCT citizen_id)
+      FROM Waste GROUP BY IFNULL(status, 'Unknown');
+    -- citizen_balance is repopulated by the bill_balance insert trigger
+    INSERT INTO bill_balance (bill_id, citizen_id, bill_amount, total_paid)
+    SELECT b.bill_id, b.citizen_id, b.amount, IFNULL(SUM(p.amount), 0)
+      FROM Bill b LEFT JOIN Payment p ON p.bill_id = b.bill_id
+     GROUP BY b.bill_id, b.citizen_id, b.amount;
+END //
+
+-- The Bill -> bill_balance cascade would skip the bill_balance triggers, so delete it explicitly
+CREATE TRIGGER trg_bill_delete BEFORE DELETE ON Bill FOR EACH ROW
+BEGIN
+    DELETE FROM bill_balance WHERE bill_id = OLD.bill_id;
+END //
+
+CREATE TRIGGER trg_bill_balance_insert AFTER INSERT ON bill_balance FOR EACH ROW
+BEGIN
+    INSERT INTO citizen_balance (citizen_id, bills, billed, paid, outstanding)
+    VALUES (NEW.citizen_id, 1, NEW.bill_amount, NEW.total_paid, GREATEST(NEW.bill_amount - NEW.total_paid, 0))
+        ON DUPLICATE KEY UPDATE bills = bills + 1, billed = billed + NEW.bill_amount, paid = paid + NEW.total_paid,
+                                outstanding = outstanding + GREATEST(NEW.bill_amount - NEW.total_paid, 0);
+END //
+
+CREATE TRIGGER trg_bill_balance_update AFTER UPDATE ON bill_balance FOR EACH ROW
+BEGIN
+    UPDATE citizen_balance
+       SET bills = bills - 1, billed = billed - OLD.bill_amount, paid = paid - OLD.total_paid,
+           outstanding = outstanding - GREATEST(OLD.bill_amount - OLD.total_paid, 0)
+     WHERE citizen_id = OLD.citizen_id;
+    INSERT INTO citizen_balance (citizen_id, bills, billed, paid, outstanding)
+    VALUES (NEW.citizen_id, 1, NEW.bill_amount, NEW.total_paid, GREATEST(NEW.bill_amount - NEW.total_paid, 0))
+        ON DUPLICATE KEY UPDATE bills = bills + 1, billed = billed + NEW.bill_amount, paid = paid + NEW.total_paid,
+                                outstanding = outstanding + GREATEST(NEW.bill_amount - NEW.total_paid, 0);
+END //
+
+CREATE TRIGGER trg_bill_balance_delete AFTER DELETE ON bill_balance FOR EACH ROW
+BEGIN
+    UPDATE citizen_balance
+       SET bills = bills - 1, billed = billed - OLD.bill_amount, paid = paid - OLD.total_paid,
+           outstanding = outstanding - GREATEST(OLD.bill_amount - OLD.total_paid, 0)
+     WHERE citizen_id = OLD.citizen_id;
+END //
+
+DELIMITER ;
+
+INSERT INTO citizen_balance (citizen_id, bills, billed, paid, outstanding)
+SELECT citizen_id, COUNT(*), SUM(bill_amount), SUM(total_paid), SUM(GREATEST(bill_amount - total_paid, 0))
+  FROM bill_balance GROUP BY citizen_id;
@@ -0,0 +1,15 @@
+-- ========================================
+-- MIGRATION 004: Checkpoint table for background batch jobs
+-- Apply to an existing database: mysql -u root waste_management < database/migrations/004_batch_checkpoint.sql
+-- (New installs get this from database/schema.sql)
+-- ========================================
+
+USE waste_management;
+
+CREATE TABLE batch_checkpoint (
+    job_name VARCHAR(50) PRIMARY KEY,
+    last_key BIGINT NULL,
+    rows_done BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
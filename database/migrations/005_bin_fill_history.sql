@@ -0,0 +1,58 @@
+-- ========================================
+-- MIGRATION 005: Bin fill-level history and rollups
+-- Apply to an existing database: mysql -u root waste_management < database/migrations/005_bin_fill_history.sql
+-- (New installs get these from database/schema.sql)
+-- ========================================
+
+USE waste_management;
+
+CREATE TABLE bin_fill_history (
+    bin_id INT NOT NULL,
+    recorded_at DATETIME NOT NULL,
+    fill_level TINYINT UNSIGNED NOT NULL,
+    PRIMARY KEY (bin_id, recorded_at)
+)
+PARTITION BY RANGE (TO_DAYS(recorded_at)) (
+    PARTITION p_initial VALUES LESS THAN (TO_DAYS('2025-01-01')),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE bin_fill_rollup_1m (
+    bin_id INT NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    samples INT NOT NULL,
+    fill_min TINYINT UNSIGNED NOT NULL,
+    fill_max TINYINT UNSIGNED NOT NULL,
+    fill_sum INT NOT NULL,
+    fill_last TINYINT UNSIGNED NOT NULL,
+    last_at DATETIME NOT NULL,
+    PRIMARY KEY (bin_id, bucket_start),
+    KEY idx_fill_rollup_1m_bucket (bucket_start)
+);
+
+CREATE TABLE bin_fill_rollup_1h (
+    bin_id INT NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    samples INT NOT NULL,
+    fill_min TINYINT UNSIGNED NOT NULL,
+    fill_max TINYINT UNSIGNED NOT NULL,
+    fill_sum INT NOT NULL,
+    fill_last TINYINT UNSIGNED NOT NULL,
+    last_at DATETIME NOT NULL,
+    PRIMARY KEY (bin_id, bucket_start),
+    KEY idx_fill_rollup_1h_bucket (bucket_start)
+);
+
+CREATE TABLE bin_fill_rollup_1d (
+    bin_id INT NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    samples INT NOT NULL,
+    fill_min TINYINT UNSIGNED NOT NULL,
+    fill_max TINYINT UNSIGNED NOT NULL,
+    fill_sum INT NOT NULL,
+    fill_last TINYINT UNSIGNED NOT NULL,
+    last_at DATETIME NOT NULL,
+    PRIMARY KEY (bin_id, bucket_start),
+    KEY idx_fill_rollup_1d_bucket (bucket_start)
+);
+
@@ -0,0 +1,11 @@
+-- ========================================
+-- MIGRATION 006: Timestamp of the sensor reading behind Bins.fill_level
+-- Apply to an existing database: mysql -u root waste_management < database/migrations/006_bin_last_reading.sql
+-- (New installs get this from database/schema.sql)
+-- ========================================
+
+USE waste_management;
+
+-- POST /api/bins/readings only applies a reading newer than this, so a worker flushing an
+-- older reading after another worker wrote a newer one can't move fill_level backwards
+ALTER TABLE Bins ADD COLUMN last_reading_at DATETIME(6) NULL;
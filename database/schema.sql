@@ -37,6 +37,8 @@ CREATE TABLE Bins (
     location VARCHAR(255),
     area_id INT NOT NULL,
     sensor VARCHAR(100),
+    -- Sensor time of the reading behind fill_level; older readings are not applied
+    last_reading_at DATETIME(6) NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (area_id) REFERENCES Area(area_id) ON DELETE CASCADE
 );
@@ -193,6 +195,16 @@ CREATE INDEX idx_assigned_crew ON Assigned(crew_id);
 CREATE INDEX idx_assigned_staff ON Assigned(staff_id);
 CREATE INDEX idx_staff_contact ON Staff(contact);
 
+-- Composite / search indexes for the API list filters (status, date ranges, prefix search)
+CREATE INDEX idx_waste_status_date ON Waste(status, collection_date);
+CREATE INDEX idx_bins_area_status ON Bins(area_id, status);
+CREATE INDEX idx_bins_fill_level ON Bins(fill_level);
+CREATE INDEX idx_bill_status_due ON Bill(status, due_date);
+CREATE INDEX idx_citizen_name ON Citizen(name);
+CREATE INDEX idx_payment_date ON Payment(payment_date);
+CREATE INDEX idx_schedule_date ON Has_Schedule(schedule_date);
+CREATE INDEX idx_staff_name ON Staff(staff_name);
+
 -- ===== INSERT TEST DATA - DHAKA CONTEXT (ENGLISH ONLY) =====
 
 -- Areas (Dhaka Districts - English Names Only)
@@ -399,6 +411,385 @@ SELECT b.bill_id, b.bill_number, b.status, b.amount as bill_amount, COALESCE(SUM
 FROM Bill b JOIN Citizen c ON b.citizen_id = c.citizen_id JOIN Area a ON c.area_id = a.area_id
 LEFT JOIN Payment p ON b.bill_id = p.bill_id GROUP BY b.bill_id, b.bill_number, b.status, b.amount, c.name, a.area_name;
 
+-- ===== BATCH JOB CHECKPOINTS =====
+-- Last primary key processed by each background batch job (backend/batch_jobs.py);
+-- NULL once a full pass has completed.
+
+CREATE TABLE batch_checkpoint (
+    job_name VARCHAR(50) PRIMARY KEY,
+    last_key BIGINT NULL,
+    rows_done BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- ===== BIN FILL-LEVEL HISTORY =====
+-- Append-only sensor history (backend/fill_history.py). Raw rows are partitioned by day so
+-- retention drops whole partitions; the server splits new daily partitions out of pmax.
+-- Rollups keep min/max/sum/last per bin and 1-minute, hourly or daily bucket.
+
+CREATE TABLE bin_fill_history (
+    bin_id INT NOT NULL,
+    recorded_at DATETIME NOT NULL,
+    fill_level TINYINT UNSIGNED NOT NULL,
+    PRIMARY KEY (bin_id, recorded_at)
+)
+PARTITION BY RANGE (TO_DAYS(recorded_at)) (
+    PARTITION p_initial VALUES LESS THAN (TO_DAYS('2025-01-01')),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE bin_fill_rollup_1m (
+    bin_id INT NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    samples INT NOT NULL,
+    fill_min TINYINT UNSIGNED NOT NULL,
+    fill_max TINYINT UNSIGNED NOT NULL,
+    fill_sum INT NOT NULL,
+    fill_last TINYINT UNSIGNED NOT NULL,
+    last_at DATETIME NOT NULL,
+    PRIMARY KEY (bin_id, bucket_start),
+    KEY idx_fill_rollup_1m_bucket (bucket_start)
+);
+
+CREATE TABLE bin_fill_rollup_1h (
+    bin_id INT NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    samples INT NOT NULL,
+    fill_min TINYINT UNSIGNED NOT NULL,
+    fill_max TINYINT UNSIGNED NOT NULL,
+    fill_sum INT NOT NULL,
+    fill_last TINYINT UNSIGNED NOT NULL,
+    last_at DATETIME NOT NULL,
+    PRIMARY KEY (bin_id, bucket_start),
+    KEY idx_fill_rollup_1h_bucket (bucket_start)
+);
+
+CREATE TABLE bin_fill_rollup_1d (
+    bin_id INT NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    samples INT NOT NULL,
+    fill_min TINYINT UNSIGNED NOT NULL,
+    fill_max TINYINT UNSIGNED NOT NULL,
+    fill_sum INT NOT NULL,
+    fill_last TINYINT UNSIGNED NOT NULL,
+    last_at DATETIME NOT NULL,
+    PRIMARY KEY (bin_id, bucket_start),
+    KEY idx_fill_rollup_1d_bucket (bucket_start)
+);
+
+-- ===== INCREMENTALLY MAINTAINED SUMMARY TABLES =====
+-- Materialized versions of area_utilization_view, waste_collection_by_area, bin_status_by_area,
+-- waste_status_summary and bill_payment_reconciliation, kept current by the triggers below so
+-- analytic reads cost O(areas) instead of re-aggregating the fact tables.
+-- MySQL does not fire triggers for rows removed by ON DELETE CASCADE, so the Area and Citizen
+-- delete triggers subtract their dependants explicitly before the cascade runs.
+-- CALL refresh_summaries() rebuilds everything from the base tables (initial load / repair).
+
+CREATE TABLE area_summary (
+    area_id INT PRIMARY KEY,
+    citizens INT NOT NULL DEFAULT 0,
+    bins INT NOT NULL DEFAULT 0,
+    full_bins INT NOT NULL DEFAULT 0,
+    partial_bins INT NOT NULL DEFAULT 0,
+    empty_bins INT NOT NULL DEFAULT 0,
+    fill_level_sum BIGINT NOT NULL DEFAULT 0,
+    crews INT NOT NULL DEFAULT 0,
+    waste_items INT NOT NULL DEFAULT 0,
+    waste_kg DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    FOREIGN KEY (area_id) REFERENCES Area(area_id) ON DELETE CASCADE
+);
+
+CREATE TABLE waste_status_totals (
+    status VARCHAR(20) PRIMARY KEY,
+    total_items INT NOT NULL DEFAULT 0,
+    total_weight_kg DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    citizens INT NOT NULL DEFAULT 0
+);
+
+-- Per (status, citizen) item counts, so waste_status_totals.citizens (a DISTINCT count) stays exact
+CREATE TABLE waste_status_citizen (
+    status VARCHAR(20) NOT NULL,
+    citizen_id INT NOT NULL,
+    items INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, citizen_id),
+    KEY idx_wsc_citizen (citizen_id)
+);
+
+CREATE TABLE bill_balance (
+    bill_id INT PRIMARY KEY,
+    citizen_id INT NOT NULL,
+    bill_amount DECIMAL(10, 2) NOT NULL,
+    total_paid DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    KEY idx_bill_balance_citizen (citizen_id),
+    FOREIGN KEY (bill_id) REFERENCES Bill(bill_id) ON DELETE CASCADE
+);
+
+-- Per-citizen totals over bill_balance (kept current by the bill_balance triggers)
+CREATE TABLE citizen_balance (
+    citizen_id INT PRIMARY KEY,
+    bills INT NOT NULL DEFAULT 0,
+    billed DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    paid DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    outstanding DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    KEY idx_citizen_balance_outstanding (outstanding),
+    FOREIGN KEY (citizen_id) REFERENCES Citizen(citizen_id) ON DELETE CASCADE
+);
+
+DELIMITER //
+
+CREATE PROCEDURE summary_waste_delta(IN p_status VARCHAR(20), IN p_citizen INT, IN p_weight DECIMAL(10, 2), IN p_sign INT)
+BEGIN
+    DECLARE v_area INT;
+    DECLARE v_status VARCHAR(20) DEFAULT IFNULL(p_status, 'Unknown');
+    SELECT area_id INTO v_area FROM Citizen WHERE citizen_id = p_citizen;
+    UPDATE area_summary SET waste_items = waste_items + p_sign, waste_kg = waste_kg + p_sign * p_weight
+     WHERE area_id = v_area;
+    INSERT INTO waste_status_totals (status, total_items, total_weight_kg) VALUES (v_status, p_sign, p_sign * p_weight)
+        ON DUPLICATE KEY UPDATE total_items = total_items + p_sign, total_weight_kg = total_weight_kg + p_sign * p_weight;
+    IF p_sign > 0 THEN
+        INSERT INTO waste_status_citizen (status, citizen_id, items) VALUES (v_status, p_citizen, 1)
+            ON DUPLICATE KEY UPDATE items = items + 1;
+        IF ROW_COUNT() = 1 THEN
+            UPDATE waste_status_totals SET citizens = citizens + 1 WHERE status = v_status;
+        END IF;
+    ELSE
+        UPDATE waste_status_citizen SET items = items - 1 WHERE status = v_status AND citizen_id = p_citizen;
+        DELETE FROM waste_status_citizen WHERE status = v_status AND citizen_id = p_citizen AND items <= 0;
+        IF ROW_COUNT() > 0 THEN
+            UPDATE waste_status_totals SET citizens = citizens - 1 WHERE status = v_status;
+        END IF;
+    END IF;
+END //
+
+CREATE PROCEDURE summary_bin_delta(IN p_area INT, IN p_status VARCHAR(20), IN p_fill INT, IN p_sign INT)
+BEGIN
+    UPDATE area_summary
+       SET bins = bins + p_sign,
+           full_bins = full_bins + IF(p_status = 'Full', p_sign, 0),
+           partial_bins = partial_bins + IF(p_status = 'Partial', p_sign, 0),
+           empty_bins = empty_bins + IF(p_status = 'Empty', p_sign, 0),
+           fill_level_sum = fill_level_sum + p_sign * IFNULL(p_fill, 0)
+     WHERE area_id = p_area;
+END //
+
+-- Called before a Citizen row is deleted: its Waste and Payment rows go by cascade without triggers
+CREATE PROCEDURE summary_citizen_removed(IN p_citizen INT)
+BEGIN
+    DECLARE v_area INT;
+    DECLARE v_items INT;
+    DECLARE v_kg DECIMAL(14, 2);
+    SELECT area_id INTO v_area FROM Citizen WHERE citizen_id = p_citizen;
+    SELECT COUNT(*), IFNULL(SUM(weight), 0) INTO v_items, v_kg FROM Waste WHERE citizen_id = p_citizen;
+    UPDATE area_summary SET citizens = citizens - 1, waste_items = waste_items - v_items, waste_kg = waste_kg - v_kg
+     WHERE area_id = v_area;
+    UPDATE waste_status_totals t
+      JOIN (SELECT IFNULL(status, 'Unknown') AS status, COUNT(*) AS n, SUM(weight) AS kg
+              FROM Waste WHERE citizen_id = p_citizen GROUP BY IFNULL(status, 'Unknown')) x ON t.status = x.status
+       SET t.total_items = t.total_items - x.n, t.total_weight_kg = t.total_weight_kg - x.kg, t.citizens = t.citizens - 1;
+    DELETE FROM waste_status_citizen WHERE citizen_id = p_citizen;
+    -- Payments this citizen made towards bills that will survive the delete
+    UPDATE bill_balance bb
+      JOIN (SELECT bill_id, SUM(amount) AS paid FROM Payment
+             WHERE citizen_id = p_citizen AND bill_id IS NOT NULL GROUP BY bill_id) p ON bb.bill_id = p.bill_id
+       SET bb.total_paid = bb.total_paid - p.paid;
+END //
+
+-- Called before an Area row is deleted: Citizen/Waste/Payment rows in it go by cascade without triggers
+CREATE PROCEDURE summary_area_removed(IN p_area INT)
+BEGIN
+    UPDATE waste_status_totals t
+      JOIN (SELECT IFNULL(w.status, 'Unknown') AS status, COUNT(*) AS n, SUM(w.weight) AS kg,
+                   COUNT(DISTINCT w.citizen_id) AS cz
+              FROM Waste w JOIN Citizen c ON w.citizen_id = c.citizen_id
+             WHERE c.area_id = p_area GROUP BY IFNULL(w.status, 'Unknown')) x ON t.status = x.status
+       SET t.total_items = t.total_items - x.n, t.total_weight_kg = t.total_weight_kg - x.kg, t.citizens = t.citizens - x.cz;
+    DELETE wsc FROM waste_status_citizen wsc JOIN Citizen c ON wsc.citizen_id = c.citizen_id WHERE c.area_id = p_area;
+    UPDATE bill_balance bb
+      JOIN (SELECT p.bill_id, SUM(p.amount) AS paid FROM Payment p JOIN Citizen c ON p.citizen_id = c.citizen_id
+             WHERE c.area_id = p_area AND p.bill_id IS NOT NULL GROUP BY p.bill_id) x ON bb.bill_id = x.bill_id
+       SET bb.total_paid = bb.total_paid - x.paid;
+END //
+
+CREATE PROCEDURE refresh_summaries()
+BEGIN
+    DELETE FROM area_summary;
+    DELETE FROM waste_status_totals;
+    DELETE FROM waste_status_citizen;
+    DELETE FROM citizen_balance;
+    DELETE FROM bill_balance;
+    INSERT INTO area_summary (area_id, citizens, bins, full_bins, partial_bins, empty_bins, fill_level_sum,
+                              crews, waste_items, waste_kg)
+    SELECT a.area_id,
+           (SELECT COUNT(*) FROM Citizen c WHERE c.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id AND b.status = 'Full'),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id AND b.status = 'Partial'),
+           (SELECT COUNT(*) FROM Bins b WHERE b.area_id = a.area_id AND b.status = 'Empty'),
+           (SELECT IFNULL(SUM(b.fill_level), 0) FROM Bins b WHERE b.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Crew cr WHERE cr.area_id = a.area_id),
+           (SELECT COUNT(*) FROM Waste w JOIN Citizen c ON w.citizen_id = c.citizen_id WHERE c.area_id = a.area_id),
+           (SELECT IFNULL(SUM(w.weight), 0) FROM Waste w JOIN Citizen c ON w.citizen_id = c.citizen_id
+             WHERE c.area_id = a.area_id)
+    FROM Area a;
+    INSERT INTO waste_status_citizen (status, citizen_id, items)
+    SELECT IFNULL(status, 'Unknown'), citizen_id, COUNT(*) FROM Waste GROUP BY IFNULL(status, 'Unknown'), citizen_id;
+    INSERT INTO waste_status_totals (status, total_items, total_weight_kg, citizens)
+    SELECT IFNULL(status, 'Unknown'), COUNT(*), SUM(weight), COUNT(DISTINCT citizen_id)
+      FROM Waste GROUP BY IFNULL(status, 'Unknown');
+    -- citizen_balance is repopulated by the bill_balance insert trigger
+    INSERT INTO bill_balance (bill_id, citizen_id, bill_amount, total_paid)
+    SELECT b.bill_id, b.citizen_id, b.amount, IFNULL(SUM(p.amount), 0)
+      FROM Bill b LEFT JOIN Payment p ON p.bill_id = b.bill_id
+     GROUP BY b.bill_id, b.citizen_id, b.amount;
+END //
+
+CREATE TRIGGER trg_area_insert AFTER INSERT ON Area FOR EACH ROW
+BEGIN
+    INSERT INTO area_summary (area_id) VALUES (NEW.area_id);
+END //
+
+CREATE TRIGGER trg_area_delete BEFORE DELETE ON Area FOR EACH ROW
+BEGIN
+    CALL summary_area_removed(OLD.area_id);
+END //
+
+CREATE TRIGGER trg_citizen_insert AFTER INSERT ON Citizen FOR EACH ROW
+BEGIN
+    UPDATE area_summary SET citizens = citizens + 1 WHERE area_id = NEW.area_id;
+END //
+
+CREATE TRIGGER trg_citizen_update AFTER UPDATE ON Citizen FOR EACH ROW
+BEGIN
+    DECLARE v_items INT;
+    DECLARE v_kg DECIMAL(14, 2);
+    IF NOT (OLD.area_id <=> NEW.area_id) THEN
+        SELECT COUNT(*), IFNULL(SUM(weight), 0) INTO v_items, v_kg FROM Waste WHERE citizen_id = NEW.citizen_id;
+        UPDATE area_summary SET citizens = citizens - 1, waste_items = waste_items - v_items, waste_kg = waste_kg - v_kg
+         WHERE area_id = OLD.area_id;
+        UPDATE area_summary SET citizens = citizens + 1, waste_items = waste_items + v_items, waste_kg = waste_kg + v_kg
+         WHERE area_id = NEW.area_id;
+    END IF;
+END //
+
+CREATE TRIGGER trg_citizen_delete BEFORE DELETE ON Citizen FOR EACH ROW
+BEGIN
+    CALL summary_citizen_removed(OLD.citizen_id);
+END //
+
+CREATE TRIGGER trg_bins_insert AFTER INSERT ON Bins FOR EACH ROW
+BEGIN
+    CALL summary_bin_delta(NEW.area_id, NEW.status, NEW.fill_level, 1);
+END //
+
+CREATE TRIGGER trg_bins_update AFTER UPDATE ON Bins FOR EACH ROW
+BEGIN
+    CALL summary_bin_delta(OLD.area_id, OLD.status, OLD.fill_level, -1);
+    CALL summary_bin_delta(NEW.area_id, NEW.status, NEW.fill_level, 1);
+END //
+
+CREATE TRIGGER trg_bins_delete AFTER DELETE ON Bins FOR EACH ROW
+BEGIN
+    CALL summary_bin_delta(OLD.area_id, OLD.status, OLD.fill_level, -1);
+END //
+
+CREATE TRIGGER trg_crew_insert AFTER INSERT ON Crew FOR EACH ROW
+BEGIN
+    UPDATE area_summary SET crews = crews + 1 WHERE area_id = NEW.area_id;
+END //
+
+CREATE TRIGGER trg_crew_update AFTER UPDATE ON Crew FOR EACH ROW
+BEGIN
+    IF NOT (OLD.area_id <=> NEW.area_id) THEN
+        UPDATE area_summary SET crews = crews - 1 WHERE area_id = OLD.area_id;
+        UPDATE area_summary SET crews = crews + 1 WHERE area_id = NEW.area_id;
+    END IF;
+END //
+
+CREATE TRIGGER trg_crew_delete AFTER DELETE ON Crew FOR EACH ROW
+BEGIN
+    UPDATE area_summary SET crews = crews - 1 WHERE area_id = OLD.area_id;
+END //
+
+CREATE TRIGGER trg_waste_insert AFTER INSERT ON Waste FOR EACH ROW
+BEGIN
+    CALL summary_waste_delta(NEW.status, NEW.citizen_id, NEW.weight, 1);
+END //
+
+CREATE TRIGGER trg_waste_update AFTER UPDATE ON Waste FOR EACH ROW
+BEGIN
+    CALL summary_waste_delta(OLD.status, OLD.citizen_id, OLD.weight, -1);
+    CALL summary_waste_delta(NEW.status, NEW.citizen_id, NEW.weight, 1);
+END //
+
+CREATE TRIGGER trg_waste_delete AFTER DELETE ON Waste FOR EACH ROW
+BEGIN
+    CALL summary_waste_delta(OLD.status, OLD.citizen_id, OLD.weight, -1);
+END //
+
+CREATE TRIGGER trg_bill_insert AFTER INSERT ON Bill FOR EACH ROW
+BEGIN
+    INSERT INTO bill_balance (bill_id, citizen_id, bill_amount) VALUES (NEW.bill_id, NEW.citizen_id, NEW.amount);
+END //
+
+CREATE TRIGGER trg_bill_update AFTER UPDATE ON Bill FOR EACH ROW
+BEGIN
+    UPDATE bill_balance SET citizen_id = NEW.citizen_id, bill_amount = NEW.amount WHERE bill_id = NEW.bill_id;
+END //
+
+-- The Bill -> bill_balance cascade would skip the bill_balance triggers, so delete it explicitly
+CREATE TRIGGER trg_bill_delete BEFORE DELETE ON Bill FOR EACH ROW
+BEGIN
+    DELETE FROM bill_balance WHERE bill_id = OLD.bill_id;
+END //
+
+CREATE TRIGGER trg_bill_balance_insert AFTER INSERT ON bill_balance FOR EACH ROW
+BEGIN
+    INSERT INTO citizen_balance (citizen_id, bills, billed, paid, outstanding)
+    VALUES (NEW.citizen_id, 1, NEW.bill_amount, NEW.total_paid, GREATEST(NEW.bill_amount - NEW.total_paid, 0))
+        ON DUPLICATE KEY UPDATE bills = bills + 1, billed = billed + NEW.bill_amount, paid = paid + NEW.total_paid,
+                                outstanding = outstanding + GREATEST(NEW.bill_amount - NEW.total_paid, 0);
+END //
+
+CREATE TRIGGER trg_bill_balance_update AFTER UPDATE ON bill_balance FOR EACH ROW
+BEGIN
+    UPDATE citizen_balance
+       SET bills = bills - 1, billed = billed - OLD.bill_amount, paid = paid - OLD.total_paid,
+           outstanding = outstanding - GREATEST(OLD.bill_amount - OLD.total_paid, 0)
+     WHERE citizen_id = OLD.citizen_id;
+    INSERT INTO citizen_balance (citizen_id, bills, billed, paid, outstanding)
+    VALUES (NEW.citizen_id, 1, NEW.bill_amount, NEW.total_paid, GREATEST(NEW.bill_amount - NEW.total_paid, 0))
+        ON DUPLICATE KEY UPDATE bills = bills + 1, billed = billed + NEW.bill_amount, paid = paid + NEW.total_paid,
+                                outstanding = outstanding + GREATEST(NEW.bill_amount - NEW.total_paid, 0);
+END //
+
+CREATE TRIGGER trg_bill_balance_delete AFTER DELETE ON bill_balance FOR EACH ROW
+BEGIN
+    UPDATE citizen_balance
+       SET bills = bills - 1, billed = billed - OLD.bill_amount, paid = paid - OLD.total_paid,
+           outstanding = outstanding - GREATEST(OLD.bill_amount - OLD.total_paid, 0)
+     WHERE citizen_id = OLD.citizen_id;
+END //
+
+CREATE TRIGGER trg_payment_insert AFTER INSERT ON Payment FOR EACH ROW
+BEGIN
+    UPDATE bill_balance SET total_paid = total_paid + NEW.amount WHERE bill_id = NEW.bill_id;
+END //
+
+CREATE TRIGGER trg_payment_update AFTER UPDATE ON Payment FOR EACH ROW
+BEGIN
+    UPDATE bill_balance SET total_paid = total_paid - OLD.amount WHERE bill_id = OLD.bill_id;
+    UPDATE bill_balance SET total_paid = total_paid + NEW.amount WHERE bill_id = NEW.bill_id;
+END //
+
+CREATE TRIGGER trg_payment_delete AFTER DELETE ON Payment FOR EACH ROW
+BEGIN
+    UPDATE bill_balance SET total_paid = total_paid - OLD.amount WHERE bill_id = OLD.bill_id;
+END //
+
+DELIMITER ;
+
+CALL refresh_summaries();
+
 -- ===== AGGREGATE FUNCTIONS WITH GROUP BY - QUERIES FOR REAL-TIME REPORTING =====
 
 -- 1. WASTE STATISTICS BY CATEGORY (COUNT, SUM, AVG, MIN, MAX)
@@ -0,0 +1,647 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data Generator - Dhaka-scale datasets for performance work
+
+  python generate_data.py --scale 0.01                 # ~450k rows, a laptop-sized city
+  python generate_data.py --scale 1 --reset            # ~45M rows: 129 wards, 4.5M households
+  python generate_data.py --citizens 200000 --waste 5000000 --method insert
+  python generate_data.py --scale 0.1 --out /tmp/dhaka # TSV files + load.sql, no database needed
+
+Areas get log-normal populations; citizens, bins and crews are spread over areas in
+proportion to population, and waste is spread over citizens by a log-normal activity
+weight, so a few wards and households dominate as they do in the real city. Bills are
+monthly per household; payments, bill statuses and due dates agree with each other the
+way reconcile_bills() would leave them. Ids are assigned here (continuing from the
+current MAX(id) of each table), so every foreign key points at a row of the same run.
+
+Rows are generated with numpy in chunks and loaded on a background thread while the
+next chunk is generated, through LOAD DATA LOCAL INFILE (--method infile, needs
+local_infile=ON on the server) or multi-row INSERTs (--method insert). Per-row summary
+triggers are dropped for the load and recreated afterwards, followed by
+CALL refresh_summaries(); --keep-triggers maintains the summaries row by row instead
+(much slower, but safe while the app is serving writes). The app's in-process caches do
+not see rows loaded behind its back, so restart it after a run.
+"""
+
+import argparse
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'waste_management')
+}
+BIN_EMPTY_MAX = int(os.environ.get('BIN_EMPTY_MAX', 10))
+BIN_FULL_MIN = int(os.environ.get('BIN_FULL_MIN', 80))
+NULL = '\\N'
+
+# Row counts at --scale 1: Dhaka's 129 city-corporation wards, ~4.5M households
+DHAKA = {'areas': 129, 'centers': 40, 'crews': 1300, 'staff': 10000, 'citizens': 4500000, 'bins': 50000,
+         'waste': 20000000, 'bills': 9000000}
+FIXED = ('areas', 'centers')        # not multiplied by --scale
+
+# Columns in load order; ids are explicit so children can reference them before the load
+TABLES = {
+    'Area': ('area_id', 'area_name', 'location', 'population'),
+    'Recycling_Center': ('center_id', 'location', 'capacity', 'operational_hours'),
+    'Crew': ('crew_id', 'team_name', 'contact', 'area_id', 'team_size'),
+    'Staff': ('staff_id', 'staff_name', 'position', 'contact', 'email', 'status'),
+    'Assigned': ('assigned_id', 'crew_id', 'staff_id', 'assignment_date', 'role', 'status'),
+    'Citizen': ('citizen_id', 'name', 'address', 'contact', 'area_id', 'email', 'registration_date'),
+    'Bins': ('bin_id', 'bin_number', 'status', 'fill_level', 'location', 'area_id', 'sensor'),
+    'Waste': ('waste_id', 'waste_type', 'name', 'category', 'weight', 'citizen_id', 'status', 'collection_date'),
+    'Bill': ('bill_id', 'bill_number', 'status', 'amount', 'due_date', 'citizen_id'),
+    'Payment': ('payment_id', 'payment_date', 'amount', 'method', 'citizen_id', 'bill_id'),
+    'Has_Schedule': ('schedule_id', 'area_id', 'crew_id', 'schedule_date'),
+}
+# Cleared by --reset along with TABLES (children first)
+DEPENDENT_TABLES = ('bin_fill_rollup_1d', 'bin_fill_rollup_1h', 'bin_fill_rollup_1m', 'bin_fill_history',
+                    'Collection_Schedule', 'citizen_balance', 'bill_balance', 'waste_status_citizen',
+                    'waste_status_totals', 'area_summary')
+
+THANAS = ['Gulshan', 'Banani', 'Dhanmondi', 'Mirpur', 'Motijheel', 'Uttara', 'Mohammadpur', 'Tejgaon', 'Badda',
+          'Rampura', 'Khilgaon', 'Jatrabari', 'Demra', 'Shyampur', 'Kamrangirchar', 'Lalbagh', 'Chawkbazar',
+          'Kotwali', 'Sutrapur', 'Wari', 'Gendaria', 'Hazaribagh', 'Kalabagan', 'Shahbagh', 'Ramna', 'Paltan',
+          'Shahjahanpur', 'Sabujbagh', 'Mugda', 'Khilkhet', 'Dakshinkhan', 'Uttarkhan', 'Turag', 'Pallabi',
+          'Kafrul', 'Cantonment', 'Bhashantek', 'Shah Ali', 'Darus Salam', 'Adabor', 'Sher-e-Bangla Nagar',
+          'Vatara', 'Bimanbandar', 'New Market', 'Kadamtali', 'Bangshal', 'Hatirjheel', 'Rupnagar', 'Mohakhali']
+STREETS = ['Road', 'Lane', 'Avenue', 'Sarani', 'Bazar Road', 'Main Road']
+FIRST_NAMES = ['Rahim', 'Karim', 'Abdul', 'Mohammad', 'Hasan', 'Hossain', 'Rafiq', 'Jamal', 'Kamal', 'Nasir',
+               'Shafiq', 'Tariq', 'Imran', 'Sohel', 'Rasel', 'Arif', 'Mamun', 'Faruk', 'Habib', 'Jahid',
+               'Fatima', 'Ayesha', 'Nasrin', 'Salma', 'Shirin', 'Rokeya', 'Taslima', 'Nusrat', 'Farzana',
+               'Sharmin', 'Shapla', 'Rupa', 'Mitu', 'Sumaiya', 'Tania', 'Jannat', 'Laila', 'Moushumi', 'Anika', 'Rima']
+LAST_NAMES = ['Ahmed', 'Hossain', 'Rahman', 'Islam', 'Khan', 'Chowdhury', 'Akter', 'Begum', 'Uddin', 'Alam',
+              'Miah', 'Sarkar', 'Talukdar', 'Siddique', 'Haque', 'Karim', 'Sheikh', 'Mollah', 'Bhuiyan', 'Das',
+              'Roy', 'Saha', 'Paul', 'Biswas', 'Mondal']
+# (waste_type, name, category, share of items, median kg); roughly Dhaka's mostly-organic mix
+WASTE_KINDS = [('Organic', 'Food Waste', 'Biodegradable', 0.52, 3.0), ('Organic', 'Garden Waste', 'Biodegradable', 0.08, 5.0),
+               ('Plastic', 'Bottles and Bags', 'Recyclable', 0.10, 1.0), ('Paper', 'Cardboard', 'Recyclable', 0.09, 2.0),
+               ('Metal', 'Aluminum Cans', 'Recyclable', 0.03, 0.8), ('Glass', 'Glass Bottles', 'Recyclable', 0.03, 1.5),
+               ('Textile', 'Old Clothes', 'Non-recyclable', 0.04, 1.5), ('E-waste', 'Electronics', 'Non-recyclable', 0.02, 2.5),
+               ('Mixed', 'General Waste', 'Non-recyclable', 0.09, 4.0)]
+CREW_KINDS = ['Cleaning Team', 'Collection Team', 'Sanitation Team', 'Disposal Team', 'Recycling Team']
+POSITIONS = (['Team Lead', 'Supervisor', 'Driver', 'Field Staff'], [0.1, 0.1, 0.2, 0.6])
+PAYMENT_METHODS = (['Cash', 'Online', 'Card', 'Check'], [0.45, 0.35, 0.15, 0.05])
+
+
+def strings(values):
+    """numpy array (or list) -> list of str for the TSV/SQL writers"""
+    return np.asarray(values).astype(str).tolist()
+
+
+def pick(rng, choices, size, p=None):
+    return np.asarray(choices, dtype=object)[rng.choice(len(choices), size=size, p=p)].tolist()
+
+
+def join(*columns):
+    """Element-wise string concatenation of equal-length lists (or repeated str)"""
+    lists = [column for column in columns if not isinstance(column, str)]
+    size = len(lists[0])
+    return [''.join(parts) for parts in zip(*(column if not isinstance(column, str) else [column] * size
+                                              for column in columns))]
+
+
+class Days:
+    """ISO date strings by day offset from today, for vectorized date columns"""
+
+    def __init__(self, first, last):
+        self.first = first
+        today = date.today()
+        self.names = np.array([(today + timedelta(days=offset)).isoformat() for offset in range(first, last + 1)],
+                              dtype=object)
+        self.times = np.array([f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(86400)], dtype=object)
+
+    def dates(self, offsets):
+        return self.names[np.asarray(offsets) - self.first].tolist()
+
+    def datetimes(self, offsets, seconds):
+        return join(self.dates(offsets), ' ', self.times[np.asarray(seconds)].tolist())
+
+
+# ===== SINKS =====
+
+class MySQLSink:
+    """Loads chunks into MySQL with LOAD DATA LOCAL INFILE or multi-row INSERTs"""
+
+    def __init__(self, conn, method, rows_per_statement=5000):
+        self.conn = conn
+        self.method = method
+        self.rows_per_statement = rows_per_statement
+        self.tmpdir = tempfile.mkdtemp(prefix='generate_data-')
+
+    def load(self, table, columns, rows):
+        cursor = self.conn.cursor()
+        try:
+            if self.method == 'infile':
+                path = os.path.join(self.tmpdir, f"{table}.tsv")
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(map('\t'.join, rows)))
+                    f.write('\n')
+                cursor.execute(f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                               f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})", (path,))
+                if cursor.rowcount != len(rows):
+                    raise RuntimeError(f"{table}: loaded {cursor.rowcount} of {len(rows)} rows")
+                os.remove(path)
+            else:
+                head = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+                for start in range(0, len(rows), self.rows_per_statement):
+                    # Values are generated here (no quotes or backslashes), NULLs are the TSV marker
+                    values = "),(".join("'" + "','".join(row) + "'" for row in rows[start:start + self.rows_per_statement])
+                    cursor.execute(head + "(" + values.replace(f"'{NULL}'", "NULL") + ")")
+            self.conn.commit()
+        finally:
+            cursor.close()
+
+    def close(self):
+        try:
+            os.rmdir(self.tmpdir)
+        except OSError:
+            pass
+
+
+class FileSink:
+    """Writes one TSV per table plus load.sql (for mysql --local-infile < load.sql)"""
+
+    def __init__(self, out_dir):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.files = {}
+
+    def load(self, table, columns, rows):
+        if table not in self.files:
+            self.files[table] = (open(self.out_dir / f"{table}.tsv", 'w', encoding='utf-8'), columns)
+        f = self.files[table][0]
+        f.write('\n'.join(map('\t'.join, rows)))
+        f.write('\n')
+
+    def close(self):
+        lines = ["SET foreign_key_checks = 0;", "SET unique_checks = 0;"]
+        for table in TABLES:
+            if table not in self.files:
+                continue
+            f, columns = self.files[table]
+            f.close()
+            lines.append(f"LOAD DATA LOCAL INFILE '{(self.out_dir / f'{table}.tsv').as_posix()}' INTO TABLE {table} "
+                         f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)});")
+        lines += ["SET unique_checks = 1;", "SET foreign_key_checks = 1;", "CALL refresh_summaries();"]
+        (self.out_dir / "load.sql").write_text("\n".join(lines) + "\n")
+
+
+class Loader:
+    """Runs a sink on a background thread so loading overlaps generating the next chunk"""
+
+    def __init__(self, sink, max_pending=2):
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.stats = {}
+        self.thread = threading.Thread(target=self._run, name='loader', daemon=True)
+        self.thread.start()
+
+    def put(self, table, columns):
+        """Queue one chunk given as {column: list of str}; raises if an earlier chunk failed"""
+        if self.error:
+            raise self.error
+        names = TABLES[table]
+        self.queue.put((table, names, list(zip(*(columns[name] for name in names)))))
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            table, names, rows = item
+            if self.error:
+                continue
+            started = time.monotonic()
+            try:
+                self.sink.load(table, names, rows)
+            except Exception as e:
+                self.error = e
+                continue
+            stats = self.stats.setdefault(table, {'rows': 0, 'seconds': 0.0})
+            stats['rows'] += len(rows)
+            stats['seconds'] += time.monotonic() - started
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.sink.close()
+        if self.error:
+            raise self.error
+
+
+# ===== GENERATOR =====
+
+class Generator:
+
+    def __init__(self, counts, loader, start_ids, rng, chunk_size, history_days, schedule_days):
+        self.counts = counts
+        self.loader = loader
+        self.start = start_ids
+        self.rng = rng
+        self.chunk_size = chunk_size
+        self.history_days = history_days
+        self.schedule_days = schedule_days
+        months = -(-counts['bills'] // max(counts['citizens'], 1))
+        self.days = Days(-max(history_days + 400, 30 * months + 60), schedule_days + 60)
+
+    def chunks(self, total):
+        for start in range(0, total, self.chunk_size):
+            yield start, min(self.chunk_size, total - start)
+
+    def ids(self, table, start, size):
+        return np.arange(self.start[table] + start, self.start[table] + start + size)
+
+    def progress(self, table, done, total, started):
+        elapsed = time.monotonic() - started
+        print(f"\r   {table:14} {done:>12,} / {total:<12,} {done / elapsed if elapsed else 0:>10,.0f} rows/s",
+              end='', flush=True)
+
+    def run(self):
+        self.areas()
+        self.centers()
+        self.crews()
+        self.staff()
+        self.citizens()
+        self.bins()
+        self.waste()
+        self.bills_and_payments()
+        self.schedules()
+
+    def areas(self):
+        rng, n = self.rng, self.counts['areas']
+        self.area_ids = self.ids('Area', 0, n)
+        self.population = np.clip(rng.lognormal(np.log(160000), 0.55, n), 20000, 1500000).astype(np.int64)
+        self.area_share = self.population / self.population.sum()
+        self.area_thana = [THANAS[i % len(THANAS)] for i in range(n)]
+        self.loader.put('Area', {
+            'area_id': strings(self.area_ids),
+            'area_name': [f"{thana} Ward {area_id}" for thana, area_id in zip(self.area_thana, self.area_ids.tolist())],
+            'location': [f"{thana} Thana, Dhaka" for thana in self.area_thana],
+            'population': strings(self.population),
+        })
+        print(f"   {'Area':14} {n:>12,} (population {self.population.sum():,})")
+
+    def centers(self):
+        rng, n = self.rng, self.counts['centers']
+        ids = self.ids('Recycling_Center', 0, n)
+        self.center_ids = ids
+        self.loader.put('Recycling_Center', {
+            'center_id': strings(ids),
+            'location': [f"{THANAS[i % len(THANAS)]} Recycling Center {center_id}" for i, center_id in enumerate(ids.tolist())],
+            'capacity': strings(rng.integers(5, 60, n) * 100),
+            'operational_hours': pick(rng, ['8:00 - 18:00', '9:00 - 17:00', '7:00 - 19:00', '24 Hours'], n),
+        })
+        print(f"   {'Recycling_Center':14} {n:>12,}")
+
+    def crews(self):
+        rng, n = self.rng, max(self.counts['crews'], len(self.area_ids))
+        # One crew per ward, the rest where the people are
+        areas = np.concatenate([np.arange(len(self.area_ids)),
+                                rng.choice(len(self.area_ids), n - len(self.area_ids), p=self.area_share)])
+        self.crew_ids = self.ids('Crew', 0, n)
+        self.crew_area = self.area_ids[areas]
+        self.crew_size = rng.integers(3, 13, n)
+        kinds = pick(rng, CREW_KINDS, n)
+        self.loader.put('Crew', {
+            'crew_id': strings(self.crew_ids),
+            'team_name': [f"{self.area_thana[a]} {kind} {crew_id}" for a, kind, crew_id in
+                          zip(areas.tolist(), kinds, self.crew_ids.tolist())],
+            'contact': [f"880{crew_id:010d}" for crew_id in self.crew_ids.tolist()],
+            'area_id': strings(self.crew_area),
+            'team_size': strings(self.crew_size),
+        })
+        print(f"   {'Crew':14} {n:>12,}")
+
+    def staff(self):
+        rng, n = self.rng, self.counts['staff']
+        ids = self.ids('Staff', 0, n)
+        first, last = pick(rng, FIRST_NAMES, n), pick(rng, LAST_NAMES, n)
+        positions = pick(rng, POSITIONS[0], n, POSITIONS[1])
+        self.loader.put('Staff', {
+            'staff_id': strings(ids),
+            'staff_name': join(first, ' ', last),
+            'position': positions,
+            'contact': [f"881{staff_id:010d}" for staff_id in ids.tolist()],
+            'email': [f"{f.lower()}.{l.lower()}{staff_id}@waste.com" for f, l, staff_id in zip(first, last, ids.tolist())],
+            'status': pick(rng, ['Active', 'Inactive', 'On Leave'], n, [0.9, 0.04, 0.06]),
+        })
+        # Every staff member is on exactly one crew, bigger crews get more of them
+        crews = self.crew_ids[rng.choice(len(self.crew_ids), n, p=self.crew_size / self.crew_size.sum())]
+        self.loader.put('Assigned', {
+            'assigned_id': strings(self.ids('Assigned', 0, n)),
+            'crew_id': strings(crews),
+            'staff_id': strings(ids),
+            'assignment_date': self.days.dates(-rng.integers(0, 3 * 365, n)),
+            'role': positions,
+            'status': pick(rng, ['Assigned', 'Unassigned', 'On Leave'], n, [0.9, 0.04, 0.06]),
+        })
+        print(f"   {'Staff':14} {n:>12,}  (+ as many Assigned rows)")
+
+    def citizens(self):
+        rng, n = self.rng, self.counts['citizens']
+        self.citizen_area = np.empty(n, dtype=np.int32)
+        # How much waste a household produces relative to the others
+        self.activity = np.cumsum(rng.lognormal(0, 0.8, n))
+        started = time.monotonic()
+        for start, size in self.chunks(n):
+            ids = self.ids('Citizen', start, size)
+            areas = rng.choice(len(self.area_ids), size, p=self.area_share)
+            self.citizen_area[start:start + size] = areas
+            first, last = pick(rng, FIRST_NAMES, size), pick(rng, LAST_NAMES, size)
+            thana = np.asarray(self.area_thana, dtype=object)[areas].tolist()
+            has_email = (rng.random(size) < 0.6).tolist()
+            self.loader.put('Citizen', {
+                'citizen_id': strings(ids),
+                'name': join(first, ' ', last),
+                'address': join('House ', strings(rng.integers(1, 400, size)), ', ',
+                                pick(rng, STREETS, size), ' ', strings(rng.integers(1, 60, size)), ', ', thana),
+                'contact': [f"882{citizen_id:010d}" for citizen_id in ids.tolist()],
+                'area_id': strings(self.area_ids[areas]),
+                'email': [f"{f.lower()}.{l.lower()}{citizen_id}@email.com" if email else NULL
+                          for f, l, citizen_id, email in zip(first, last, ids.tolist(), has_email)],
+                'registration_date': self.days.datetimes(-rng.integers(self.history_days, self.history_days + 400, size),
+                                                         rng.integers(0, 86400, size)),
+            })
+            self.progress('Citizen', start + size, n, started)
+        print()
+
+    def bins(self):
+        rng, n = self.rng, self.counts['bins']
+        ids = self.ids('Bins', 0, n)
+        areas = rng.choice(len(self.area_ids), n, p=self.area_share)
+        fill = np.clip(np.round(rng.beta(1.6, 1.4, n) * 100), 0, 100).astype(np.int64)
+        status = np.where(fill >= BIN_FULL_MIN, 'Full', np.where(fill <= BIN_EMPTY_MAX, 'Empty', 'Partial'))
+        thana = np.asarray(self.area_thana, dtype=object)[areas].tolist()
+        self.loader.put('Bins', {
+            'bin_id': strings(ids),
+            'bin_number': [f"DHK-{bin_id:07d}" for bin_id in ids.tolist()],
+            'status': strings(status),
+            'fill_level': strings(fill),
+            'location': join(thana, ' ', pick(rng, STREETS, n), ' ', strings(rng.integers(1, 60, n))),
+            'area_id': strings(self.area_ids[areas]),
+            'sensor': [f"IOT_{bin_id:07d}" for bin_id in ids.tolist()],
+        })
+        print(f"   {'Bins':14} {n:>12,}")
+
+    def waste(self):
+        rng, n = self.rng, self.counts['waste']
+        kinds = np.array([share for *_, share, _ in WASTE_KINDS])
+        kinds /= kinds.sum()
+        median_kg = np.array([kg for *_, kg in WASTE_KINDS])
+        recyclable = np.array([category == 'Recyclable' for _, _, category, _, _ in WASTE_KINDS])
+        columns = [np.asarray([kind[i] for kind in WASTE_KINDS], dtype=object) for i in range(3)]
+        started = time.monotonic()
+        for start, size in self.chunks(n):
+            citizens = np.searchsorted(self.activity, rng.random(size) * self.activity[-1])
+            kind = rng.choice(len(WASTE_KINDS), size, p=kinds)
+            age = rng.integers(0, self.history_days, size)
+            # Recent items are still pending/collected; older ones were recycled or disposed of
+            settled = np.where(recyclable[kind], np.where(rng.random(size) < 0.8, 'Recycled', 'Disposed'),
+                               np.where(rng.random(size) < 0.9, 'Disposed', 'Recycled'))
+            status = np.where(age < 2, np.where(rng.random(size) < 0.5, 'Pending', 'Collected'),
+                              np.where(age < 7, np.where(rng.random(size) < 0.6, 'Collected', settled), settled))
+            self.loader.put('Waste', {
+                'waste_id': strings(self.ids('Waste', start, size)),
+                'waste_type': columns[0][kind].tolist(),
+                'name': columns[1][kind].tolist(),
+                'category': columns[2][kind].tolist(),
+                'weight': strings(np.maximum(np.round(median_kg[kind] * rng.lognormal(0, 0.5, size), 2), 0.1)),
+                'citizen_id': strings(self.start['Citizen'] + citizens),
+                'status': strings(status),
+                'collection_date': self.days.datetimes(-age, np.clip(rng.normal(10.5 * 3600, 3 * 3600, size),
+                                                                     0, 86399).astype(np.int64)),
+            })
+            self.progress('Waste', start + size, n, started)
+        print()
+
+    def bills_and_payments(self):
+        """Monthly bills per household, newest month first, with the payments that settle them"""
+        rng, n, households = self.rng, self.counts['bills'], self.counts['citizens']
+        activity = np.diff(self.activity, prepend=0.0)
+        payment_id = self.start['Payment']
+        payments = 0
+        started = time.monotonic()
+        for start, size in self.chunks(n):
+            index = np.arange(start, start + size)
+            citizens, month = index % households, index // households
+            due = 15 - 30 * month
+            amount = np.round(np.clip(300 * activity[citizens] * rng.lognormal(0, 0.15, size), 150, 20000), 2)
+            outcome = rng.random(size)
+            # Settled bills are mostly old; the current month is still being paid
+            paid_share = np.where(due > 0, 0.35, 0.8)
+            full = outcome < paid_share
+            partial = ~full & (outcome < paid_share + 0.1)
+            status = np.where(full, 'Paid', np.where(due < 0, 'Overdue', 'Pending'))
+            bill_ids = self.ids('Bill', start, size)
+            self.loader.put('Bill', {
+                'bill_id': strings(bill_ids),
+                'bill_number': [f"DHK-B{bill_id:010d}" for bill_id in bill_ids.tolist()],
+                'status': strings(status),
+                'amount': strings(amount),
+                'due_date': self.days.dates(due),
+                'citizen_id': strings(self.start['Citizen'] + citizens),
+            })
+            payer = np.flatnonzero(full | partial)
+            count = len(payer)
+            if count:
+                # Between the bill's issue (30 days before due) and its due date, a fifth of payers late
+                issued = due[payer] - 30
+                latest = np.minimum(due[payer] + np.where(rng.random(count) < 0.2, 40, 0), 0)
+                paid_on = issued + (rng.random(count) * (latest - issued + 1)).astype(np.int64)
+                paid = np.where(full[payer], amount[payer],
+                                np.round(amount[payer] * rng.uniform(0.2, 0.8, count), 2))
+                self.loader.put('Payment', {
+                    'payment_id': strings(np.arange(payment_id, payment_id + count)),
+                    'payment_date': self.days.dates(paid_on),
+                    'amount': strings(paid),
+                    'method': pick(rng, PAYMENT_METHODS[0], count, PAYMENT_METHODS[1]),
+                    'citizen_id': strings(self.start['Citizen'] + citizens[payer]),
+                    'bill_id': strings(bill_ids[payer]),
+                })
+                payment_id += count
+                payments += count
+            self.progress('Bill', start + size, n, started)
+        print(f"  (+ {payments:,} Payment rows)")
+
+    def schedules(self):
+        """Each crew works its own ward six days a week (not Fridays), one day in ten elsewhere"""
+        rng = self.rng
+        today = date.today()
+        offsets = [offset for offset in range(-self.schedule_days // 2, self.schedule_days - self.schedule_days // 2)
+                   if (today + timedelta(days=offset)).weekday() != 4]
+        crews = np.repeat(np.arange(len(self.crew_ids)), len(offsets))
+        days = np.tile(np.asarray(offsets), len(self.crew_ids))
+        areas = np.where(rng.random(len(crews)) < 0.9, self.crew_area[crews],
+                         self.area_ids[rng.choice(len(self.area_ids), len(crews), p=self.area_share)])
+        total = len(crews)
+        started = time.monotonic()
+        for start, size in self.chunks(total):
+            part = slice(start, start + size)
+            self.loader.put('Has_Schedule', {
+                'schedule_id': strings(self.ids('Has_Schedule', start, size)),
+                'area_id': strings(areas[part]),
+                'crew_id': strings(self.crew_ids[crews[part]]),
+                'schedule_date': self.days.dates(days[part]),
+            })
+            self.progress('Has_Schedule', start + size, total, started)
+        print()
+
+
+# ===== DATABASE =====
+
+def next_ids(conn):
+    """First free id of every table (explicit ids continue after existing rows)"""
+    cursor = conn.cursor()
+    ids = {}
+    for table, columns in TABLES.items():
+        cursor.execute(f"SELECT IFNULL(MAX({columns[0]}), 0) + 1 FROM {table}")
+        ids[table] = int(cursor.fetchone()[0])
+    cursor.close()
+    return ids
+
+
+def drop_triggers(conn):
+    """Drop the triggers on the loaded tables; returns their CREATE statements"""
+    cursor = conn.cursor()
+    placeholders = ', '.join(['%s'] * len(TABLES))
+    cursor.execute(f"""SELECT TRIGGER_NAME FROM information_schema.TRIGGERS
+                       WHERE TRIGGER_SCHEMA = DATABASE() AND EVENT_OBJECT_TABLE IN ({placeholders})""", tuple(TABLES))
+    saved = []
+    for (name,) in cursor.fetchall():
+        cursor.execute(f"SHOW CREATE TRIGGER `{name}`")
+        row = cursor.fetchone()
+        saved.append((name, row[2]))
+    for name, _ in saved:
+        cursor.execute(f"DROP TRIGGER `{name}`")
+    cursor.close()
+    return saved
+
+
+def restore_triggers(conn, saved):
+    cursor = conn.cursor()
+    for name, statement in saved:
+        try:
+            cursor.execute(statement)
+        except Exception as e:
+            print(f"⚠️ Could not recreate trigger {name}: {e} (definition in database/schema.sql)")
+    cursor.close()
+
+
+def reset_tables(conn):
+    cursor = conn.cursor()
+    cursor.execute("SET foreign_key_checks = 0")
+    for table in DEPENDENT_TABLES + tuple(reversed(TABLES)):
+        cursor.execute(f"TRUNCATE TABLE {table}")
+    cursor.execute("SET foreign_key_checks = 1")
+    cursor.close()
+
+
+def resolve_counts(args):
+    counts = {}
+    for name, base in DHAKA.items():
+        value = getattr(args, name)
+        counts[name] = value if value is not None else base if name in FIXED else max(int(base * args.scale), 1)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Dhaka-scale dataset")
+    parser.add_argument('--scale', type=float, default=0.1, help="multiplier on the Dhaka row counts (1 = ~45M rows)")
+    for name, base in DHAKA.items():
+        parser.add_argument(f'--{name}', type=int, help=f"row count (default {base:,}{'' if name in FIXED else ' x scale'})")
+    parser.add_argument('--history-days', type=int, default=365, help='days of waste history')
+    parser.add_argument('--schedule-days', type=int, default=60, help='days of crew schedules around today')
+    parser.add_argument('--method', choices=('infile', 'insert'), default='infile',
+                        help='LOAD DATA LOCAL INFILE or multi-row INSERTs')
+    parser.add_argument('--chunk', type=int, default=100000, help='rows generated and loaded at a time')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--reset', action='store_true', help='empty the tables first (ids restart at 1)')
+    parser.add_argument('--keep-triggers', action='store_true',
+                        help='keep the summary triggers during the load instead of rebuilding summaries afterwards')
+    parser.add_argument('--out', help='write TSV files and load.sql to this directory instead of loading')
+    args = parser.parse_args()
+
+    counts = resolve_counts(args)
+    rng = np.random.default_rng(args.seed)
+    print(f"\n{', '.join(f'{k} {v:,}' for k, v in counts.items())}")
+    started = time.monotonic()
+
+    if args.out:
+        loader = Loader(FileSink(args.out))
+        print(f"Writing TSV files to {args.out}\n")
+        Generator(counts, loader, {table: 1 for table in TABLES}, rng, args.chunk,
+                  args.history_days, args.schedule_days).run()
+        loader.close()
+        print(f"\n✅ Done in {time.monotonic() - started:.1f}s; load into empty tables with: "
+              f"mysql --local-infile=1 {DB_CONFIG['database']} < {Path(args.out) / 'load.sql'}")
+        return 0
+
+    import mysql.connector
+    conn = mysql.connector.connect(**DB_CONFIG, allow_local_infile=args.method == 'infile')
+    cursor = conn.cursor()
+    if args.method == 'infile':
+        cursor.execute("SELECT @@GLOBAL.local_infile")
+        if not int(cursor.fetchone()[0]):
+            print("⚠️ local_infile is OFF on the server; falling back to --method insert")
+            args.method = 'insert'
+    if args.reset:
+        reset_tables(conn)
+        print("✅ Tables emptied")
+    cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+    cursor.close()
+    saved = [] if args.keep_triggers else drop_triggers(conn)
+    print(f"Loading into {DB_CONFIG['database']} on {DB_CONFIG['host']} ({args.method}"
+          f"{', triggers kept' if args.keep_triggers else f', {len(saved)} triggers dropped for the load'})\n")
+
+    loader = Loader(MySQLSink(conn, args.method))
+    failed = False
+    try:
+        try:
+            Generator(counts, loader, next_ids(conn), rng, args.chunk, args.history_days, args.schedule_days).run()
+        finally:
+            # Lets queued chunks finish before the connection is used again
+            loader.close()
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted; loaded chunks are kept")
+        failed = True
+    except Exception as e:
+        print(f"\n⚠️ Load failed: {e}")
+        failed = True
+    finally:
+        if saved:
+            restore_triggers(conn, saved)
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+        if saved or args.reset:
+            refreshed = time.monotonic()
+            print("Rebuilding summary tables (CALL refresh_summaries())...")
+            cursor.execute("CALL refresh_summaries()")
+            conn.commit()
+            print(f"✅ Summaries rebuilt in {time.monotonic() - refreshed:.1f}s")
+        cursor.close()
+        conn.close()
+
+    total = sum(stats['rows'] for stats in loader.stats.values())
+    elapsed = time.monotonic() - started
+    print(f"\n{'⚠️' if failed else '✅'} {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    for table, stats in loader.stats.items():
+        print(f"   {table:16} {stats['rows']:>12,} rows, {stats['seconds']:7.1f}s in the database")
+    print("Restart the app (or wait for its cache TTLs) so cached lists and stats pick up the new rows.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,730 @@
+#!/usr/bin/env python3
+"""
+Load Test - Seed the database at scale, drive mixed read/write traffic at every /api/*
+route and keep the results as JSON for comparison across commits
+
+  python load_test.py seed --citizens 50000 --bills 200000 --waste 1000000
+  python load_test.py run --concurrency 64 --duration 60 [--write-ratio 0.2] [--only 'GET /api/bills*']
+  python load_test.py smoke                      # every operation once, in order (replaces test_api.py)
+  python load_test.py compare benchmarks/<old>.json benchmarks/<new>.json [--threshold 10]
+  python load_test.py list
+
+seed tops each table up to the requested row count, so it can be re-run before every
+benchmark. run opens --concurrency keep-alive connections, each picking operations at
+random by weight until --duration is up, and records latency per operation plus the
+status codes seen. DELETE routes are not exercised (they would erode the dataset being
+measured); heavy maintenance calls (reconcile, job runs) have weight 0 unless --weight
+sets one. Results go to benchmarks/<time>-<commit>.json with the git commit, settings,
+dataset counts and the server's own /api/system/stats; compare exits 1 on a regression.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmark_asgi import percentile, raise_fd_limit
+
+PROJECT_DIR = Path(__file__).parent.absolute()
+sys.path.insert(0, str(PROJECT_DIR / "backend"))
+
+from prefork import DEFAULT_BIND  # noqa: E402
+
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'waste_management')
+}
+DEFAULT_URL = os.environ.get('LOAD_TEST_URL', f"http://{os.environ.get('BIND', DEFAULT_BIND)}")
+RESULTS_DIR = PROJECT_DIR / "benchmarks"
+SAMPLE_ROWS = 500       # rows per entity fetched up front for PUT payloads and valid foreign keys
+
+WASTE_KINDS = [('Organic', 'Food scraps', 'Biodegradable'), ('Plastic', 'PET bottles', 'Recyclable'),
+               ('Paper', 'Newspaper', 'Recyclable'), ('Metal', 'Cans', 'Recyclable'),
+               ('Glass', 'Bottles', 'Recyclable'), ('E-waste', 'Batteries', 'Non-recyclable'),
+               ('Textile', 'Old clothes', 'Non-recyclable')]
+WASTE_STATUSES = ('Pending', 'Collected', 'Recycled', 'Disposed')
+PAYMENT_METHODS = ('Card', 'Cash', 'Online', 'Check')
+BIN_STATUSES = ((10, 'Empty'), (80, 'Partial'), (101, 'Full'))
+
+
+# ===== SEEDING =====
+
+class Seeder:
+    """Tops tables up to a target row count with batched multi-row INSERTs"""
+
+    def __init__(self, conn, rng, batch_size):
+        self.conn = conn
+        self.rng = rng
+        self.batch_size = batch_size
+        # Prefix for unique columns (contact, bill_number, ...), distinct per seeding run
+        self.tag = int(time.time()) % 1000000
+
+    def ids(self, table, key):
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {key} FROM {table}")
+        ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return ids
+
+    def top_up(self, table, columns, target, make_row):
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        existing = cursor.fetchone()[0]
+        missing = max(target - existing, 0)
+        if not missing:
+            print(f"   {table:14} {existing:>10,} rows (target {target:,}), nothing to add")
+            cursor.close()
+            return 0
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        started = time.monotonic()
+        done = 0
+        while done < missing:
+            # mysql.connector sends an INSERT executemany as one multi-row statement
+            batch = [make_row(existing + done + i) for i in range(min(self.batch_size, missing - done))]
+            cursor.executemany(query, batch)
+            self.conn.commit()
+            done += len(batch)
+            elapsed = time.monotonic() - started
+            print(f"\r   {table:14} {existing + done:>10,} rows  (+{done:,}, {done / elapsed if elapsed else 0:,.0f} rows/s)",
+                  end='', flush=True)
+        print()
+        cursor.close()
+        return missing
+
+    def contact(self, n):
+        return f"09{self.tag:06d}{n:07d}"
+
+    def recent_day(self, days=365):
+        return date.today() - timedelta(days=self.rng.randrange(days))
+
+
+def cmd_seed(args):
+    import mysql.connector
+    rng = random.Random(args.seed)
+    conn = mysql.connector.connect(**DB_CONFIG)
+    seeder = Seeder(conn, rng, args.batch)
+    started = time.monotonic()
+    print(f"\nSeeding {DB_CONFIG['database']} on {DB_CONFIG['host']} (batches of {args.batch})\n")
+    try:
+        seeder.top_up('Area', ('area_name', 'location', 'population'), args.areas,
+                      lambda n: (f"Zone {seeder.tag}-{n}", f"Dhaka Ward {n % 100 + 1}", rng.randint(20000, 400000)))
+        areas = seeder.ids('Area', 'area_id')
+        seeder.top_up('Recycling_Center', ('location', 'capacity', 'operational_hours'), args.centers,
+                      lambda n: (f"Recycling Center {seeder.tag}-{n}", rng.randint(500, 20000), '8AM-6PM'))
+        seeder.top_up('Crew', ('team_name', 'contact', 'area_id', 'team_size'), args.crews,
+                      lambda n: (f"Crew {seeder.tag}-{n}", seeder.contact(n), rng.choice(areas), rng.randint(2, 12)))
+        crews = seeder.ids('Crew', 'crew_id')
+        seeder.top_up('Staff', ('staff_name', 'position', 'contact', 'email', 'status'), args.staff,
+                      lambda n: (f"Staff {seeder.tag}-{n}", rng.choice(('Collector', 'Driver', 'Supervisor')),
+                                 seeder.contact(n), f"staff{seeder.tag}-{n}@example.com",
+                                 rng.choices(('Active', 'Inactive', 'On Leave'), (90, 5, 5))[0]))
+        staff = seeder.ids('Staff', 'staff_id')
+        seeder.top_up('Citizen', ('name', 'address', 'contact', 'area_id', 'email'), args.citizens,
+                      lambda n: (f"Citizen {seeder.tag}-{n}", f"House {n % 500 + 1}, Road {n % 40 + 1}",
+                                 seeder.contact(n), rng.choice(areas), f"citizen{seeder.tag}-{n}@example.com"))
+        citizens = seeder.ids('Citizen', 'citizen_id')
+
+        def bin_row(n):
+            fill = rng.randint(0, 100)
+            return (f"BIN-{seeder.tag}-{n}", next(s for bound, s in BIN_STATUSES if fill < bound), fill,
+                    f"Block {n % 50 + 1}", rng.choice(areas), f"SENSOR-{seeder.tag}-{n}")
+        seeder.top_up('Bins', ('bin_number', 'status', 'fill_level', 'location', 'area_id', 'sensor'), args.bins, bin_row)
+
+        def waste_row(n):
+            waste_type, name, category = rng.choice(WASTE_KINDS)
+            return (waste_type, name, category, round(rng.uniform(0.5, 60), 2), rng.choice(citizens),
+                    rng.choices(WASTE_STATUSES, (5, 50, 30, 15))[0],
+                    datetime.now() - timedelta(seconds=rng.randrange(365 * 86400)))
+        seeder.top_up('Waste', ('waste_type', 'name', 'category', 'weight', 'citizen_id', 'status', 'collection_date'),
+                      args.waste, waste_row)
+
+        seeder.top_up('Bill', ('bill_number', 'status', 'amount', 'due_date', 'citizen_id'), args.bills,
+                      lambda n: (f"LT-{seeder.tag}-{n}", rng.choices(('Pending', 'Paid', 'Overdue'), (40, 45, 15))[0],
+                                 round(rng.uniform(100, 5000), 2), seeder.recent_day() + timedelta(days=30),
+                                 rng.choice(citizens)))
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT bill_id, citizen_id, amount FROM Bill ORDER BY RAND({args.seed}) LIMIT %s",
+                       (args.payments,))
+        bills = cursor.fetchall()
+        cursor.close()
+
+        def payment_row(n):
+            bill_id, citizen_id, amount = bills[n % len(bills)] if bills else (None, rng.choice(citizens), 500)
+            return (seeder.recent_day(), round(float(amount) * rng.choice((0.25, 0.5, 1.0)), 2),
+                    rng.choice(PAYMENT_METHODS), citizen_id, bill_id)
+        seeder.top_up('Payment', ('payment_date', 'amount', 'method', 'citizen_id', 'bill_id'), args.payments, payment_row)
+
+        seeder.top_up('Has_Schedule', ('area_id', 'crew_id', 'schedule_date'), args.schedules,
+                      lambda n: (rng.choice(areas), rng.choice(crews), seeder.recent_day(60) + timedelta(days=30)))
+        pairs = rng.sample([(c, s) for c in crews[:200] for s in staff[:200]], min(args.assignments, 40000))
+        cursor = conn.cursor()
+        cursor.executemany("""INSERT IGNORE INTO Assigned (crew_id, staff_id, assignment_date, role, status)
+                              VALUES (%s, %s, %s, 'Staff Member', 'Assigned')""",
+                           [(c, s, seeder.recent_day()) for c, s in pairs])
+        conn.commit()
+        cursor.close()
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted; committed batches are kept")
+        return 1
+    finally:
+        conn.close()
+    print(f"\n✅ Seeding finished in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+# ===== HTTP CLIENT =====
+
+class HTTPConnection:
+    """One keep-alive HTTP/1.1 connection (reconnects after errors or Connection: close)"""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        """(status, body bytes); raises OSError/asyncio errors on transport failures"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = b'' if body is None else body if isinstance(body, bytes) else json.dumps(body).encode()
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nConnection: keep-alive\r\n"
+        if body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+        self.writer.write(head.encode() + b"\r\n" + payload)
+        try:
+            status, data, keep_alive = await asyncio.wait_for(self._read_response(), self.timeout)
+        except BaseException:
+            self.close()
+            raise
+        if not keep_alive:
+            self.close()
+        return status, data
+
+    async def _read_response(self):
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        headers = {k.strip().lower(): v.strip() for k, v in (line.split(':', 1) for line in lines[1:] if ':' in line)}
+        if 'content-length' in headers:
+            data = await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding') == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunks.append((await self.reader.readexactly(size + 2))[:-2])
+                if size == 0:
+                    break
+            data = b''.join(chunks)
+        else:
+            return status, await self.reader.read(), False
+        return status, data, headers.get('connection', '').lower() != 'close' and lines[0].startswith('HTTP/1.1')
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def get_json(conn, path):
+    status, data = await conn.request('GET', path)
+    if status != 200:
+        raise RuntimeError(f"GET {path} returned {status}: {data[:200]!r}")
+    return json.loads(data)
+
+
+# ===== WORKLOAD =====
+
+class Dataset:
+    """Id ranges and sample rows discovered through the API before the run"""
+
+    RANGES = {'citizens': 'citizen_id', 'waste': 'waste_id', 'bins': 'bin_id', 'bills': 'bill_id',
+              'payments': 'payment_id', 'schedules': 'schedule_id', 'staff': 'staff_id'}
+
+    def __init__(self):
+        self.ranges = {}
+        self.samples = {}
+        self.areas = []
+        self.crews = []
+        self.centers = []
+        self.counter = 0
+        self.tag = int(time.time()) % 1000000
+
+    async def discover(self, conn):
+        for entity, key in self.RANGES.items():
+            first = await get_json(conn, f"/api/{entity}?limit={SAMPLE_ROWS}")
+            last = await get_json(conn, f"/api/{entity}?sort={key}&order=desc&limit=1")
+            rows = first['data']
+            self.samples[entity] = rows
+            self.ranges[entity] = (rows[0][key], last[0][key]) if rows and last else None
+        self.areas = [row['area_id'] for row in await get_json(conn, "/api/areas-list")]
+        self.crews = [row['crew_id'] for row in await get_json(conn, "/api/crews-list")]
+        self.centers = [row['center_id'] for row in await get_json(conn, "/api/centers")]
+        missing = [name for name in ('citizens', 'bills', 'bins') if not self.ranges.get(name)]
+        if missing or not self.areas or not self.crews:
+            raise RuntimeError(f"The database has no {', '.join(missing) or 'areas/crews'}; run 'load_test.py seed' first")
+
+    def id(self, rng, entity):
+        lo, hi = self.ranges.get(entity) or (1, 1)
+        return rng.randint(lo, hi)
+
+    def sample(self, rng, entity):
+        return rng.choice(self.samples[entity])
+
+    def unique(self):
+        self.counter += 1
+        return self.counter
+
+    def contact(self):
+        return f"08{self.tag:06d}{self.unique():07d}"
+
+    def summary(self):
+        return {'id_ranges': self.ranges, 'areas': len(self.areas), 'crews': len(self.crews),
+                'centers': len(self.centers)}
+
+
+def today(offset=0):
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+def waste_body(d, rng):
+    waste_type, name, category = rng.choice(WASTE_KINDS)
+    return {'waste_type': waste_type, 'name': name, 'category': category, 'weight': round(rng.uniform(0.5, 60), 2),
+            'citizen_id': d.id(rng, 'citizens'), 'status': rng.choice(WASTE_STATUSES),
+            'center_id': rng.choice(d.centers) if d.centers else 1}
+
+
+def bin_update(d, rng):
+    """PUT of a sampled bin with a new fill level (the other fields unchanged)"""
+    row = d.sample(rng, 'bins')
+    fill = rng.randint(0, 100)
+    return 'PUT', f"/api/bins/{row['bin_id']}", {
+        'bin_number': row['bin_number'], 'status': next(s for bound, s in BIN_STATUSES if fill < bound),
+        'fill_level': fill, 'location': row['location'], 'area_id': row['area_id'], 'sensor': row.get('sensor') or ''}
+
+
+def citizen_update(d, rng):
+    """PUT of a sampled citizen with a new address"""
+    row = d.sample(rng, 'citizens')
+    return 'PUT', f"/api/citizens/{row['citizen_id']}", {
+        'name': row['name'], 'address': f"House {rng.randint(1, 500)}, Road {rng.randint(1, 40)}",
+        'contact': row['contact'], 'area_id': row['area_id'], 'email': row.get('email') or ''}
+
+
+def payment_body(d, rng):
+    bill = d.sample(rng, 'bills')
+    return {'payment_date': today(), 'amount': round(float(bill['amount']) * rng.choice((0.25, 0.5)), 2),
+            'method': rng.choice(PAYMENT_METHODS), 'citizen_id': bill['citizen_id'], 'bill_id': bill['bill_id']}
+
+
+# (name, weight, is_write, build(dataset, rng) -> (method, path, body)); names are the Flask
+# rule plus a variant, so results line up with /metrics and /api/system/stats
+OPERATIONS = [
+    ('GET /api/dashboard-stats', 8, False, lambda d, r: ('GET', "/api/dashboard-stats", None)),
+    ('GET /api/system/stats', 0.5, False, lambda d, r: ('GET', "/api/system/stats", None)),
+    ('GET /api/jobs', 0.5, False, lambda d, r: ('GET', "/api/jobs", None)),
+
+    ('GET /api/citizens page', 5, False, lambda d, r: ('GET', f"/api/citizens?after={d.id(r, 'citizens')}&limit=50", None)),
+    ('GET /api/citizens by area', 2, False, lambda d, r: ('GET', f"/api/citizens?area_id={r.choice(d.areas)}&limit=50", None)),
+    ('GET /api/citizens search', 1, False, lambda d, r: ('GET', f"/api/citizens?q=Citizen%20{r.randint(1, 9)}&limit=20", None)),
+    ('GET /api/citizens/<id>', 6, False, lambda d, r: ('GET', f"/api/citizens/{d.id(r, 'citizens')}", None)),
+    ('GET /api/citizens/<id>/balance', 5, False, lambda d, r: ('GET', f"/api/citizens/{d.id(r, 'citizens')}/balance", None)),
+    ('GET /api/citizens-list', 0.2, False, lambda d, r: ('GET', "/api/citizens-list", None)),
+
+    ('GET /api/areas', 2, False, lambda d, r: ('GET', "/api/areas", None)),
+    ('GET /api/areas/<id>', 1, False, lambda d, r: ('GET', f"/api/areas/{r.choice(d.areas)}", None)),
+    ('GET /api/areas-list', 1, False, lambda d, r: ('GET', "/api/areas-list", None)),
+    ('GET /api/crew', 1, False, lambda d, r: ('GET', "/api/crew?limit=50", None)),
+    ('GET /api/crew/<id>', 1, False, lambda d, r: ('GET', f"/api/crew/{r.choice(d.crews)}", None)),
+    ('GET /api/crews-list', 0.5, False, lambda d, r: ('GET', "/api/crews-list", None)),
+    ('GET /api/centers', 1, False, lambda d, r: ('GET', "/api/centers", None)),
+    ('GET /api/centers/<id>', 0.5, False, lambda d, r: ('GET', f"/api/centers/{r.choice(d.centers or [1])}", None)),
+
+    ('GET /api/waste page', 5, False, lambda d, r: ('GET', f"/api/waste?after={d.id(r, 'waste')}&limit=50", None)),
+    ('GET /api/waste by status', 3, False, lambda d, r: ('GET', f"/api/waste?status={r.choice(WASTE_STATUSES)}"
+                                                               f"&from={today(-r.randint(1, 30))}&limit=50", None)),
+    ('GET /api/waste by citizen', 2, False, lambda d, r: ('GET', f"/api/waste?citizen_id={d.id(r, 'citizens')}&limit=50", None)),
+    ('GET /api/waste/<id>', 4, False, lambda d, r: ('GET', f"/api/waste/{d.id(r, 'waste')}", None)),
+
+    ('GET /api/bins page', 3, False, lambda d, r: ('GET', f"/api/bins?after={d.id(r, 'bins')}&limit=50", None)),
+    ('GET /api/bins fullest', 2, False, lambda d, r: ('GET', f"/api/bins?area_id={r.choice(d.areas)}&min_fill=80&limit=50", None)),
+    ('GET /api/bins/<id>', 3, False, lambda d, r: ('GET', f"/api/bins/{d.id(r, 'bins')}", None)),
+    ('GET /api/bins/<id>/history', 2, False, lambda d, r: ('GET', f"/api/bins/{d.id(r, 'bins')}/history", None)),
+    ('GET /api/bins/collect-next', 2, False, lambda d, r: ('GET', f"/api/bins/collect-next?area_id={r.choice(d.areas)}&limit=20", None)),
+    ('GET /api/bins/collect-next by area', 0.5, False, lambda d, r: ('GET', "/api/bins/collect-next?group=area&limit=5", None)),
+    ('GET /api/crew/<id>/collect-next', 1, False, lambda d, r: ('GET', f"/api/crew/{r.choice(d.crews)}/collect-next", None)),
+
+    ('GET /api/bills page', 5, False, lambda d, r: ('GET', f"/api/bills?after={d.id(r, 'bills')}&limit=50", None)),
+    ('GET /api/bills overdue', 2, False, lambda d, r: ('GET', f"/api/bills?status=Overdue&due_to={today()}&limit=50", None)),
+    ('GET /api/bills/<id>', 4, False, lambda d, r: ('GET', f"/api/bills/{d.id(r, 'bills')}", None)),
+    ('GET /api/bills/<id>/balance', 5, False, lambda d, r: ('GET', f"/api/bills/{d.id(r, 'bills')}/balance", None)),
+    ('GET /api/bills-list', 0.2, False, lambda d, r: ('GET', "/api/bills-list", None)),
+    ('GET /api/billing/outstanding', 2, False, lambda d, r: ('GET', f"/api/billing/outstanding?after={d.id(r, 'citizens')}&limit=50", None)),
+    ('GET /api/billing/outstanding top', 1, False, lambda d, r: ('GET', "/api/billing/outstanding?sort=outstanding&order=desc&limit=20", None)),
+    ('GET /api/payments page', 3, False, lambda d, r: ('GET', f"/api/payments?after={d.id(r, 'payments')}&limit=50", None)),
+    ('GET /api/payments by citizen', 1, False, lambda d, r: ('GET', f"/api/payments?citizen_id={d.id(r, 'citizens')}", None)),
+    ('GET /api/payments/<id>', 2, False, lambda d, r: ('GET', f"/api/payments/{d.id(r, 'payments')}", None)),
+
+    ('GET /api/schedules page', 2, False, lambda d, r: ('GET', f"/api/schedules?from={today()}&to={today(7)}&limit=50", None)),
+    ('GET /api/schedules/<id>', 1, False, lambda d, r: ('GET', f"/api/schedules/{d.id(r, 'schedules')}", None)),
+    ('GET /api/staff', 1, False, lambda d, r: ('GET', f"/api/staff?after={d.id(r, 'staff')}&limit=50", None)),
+    ('GET /api/staff/<id>', 1, False, lambda d, r: ('GET', f"/api/staff/{d.id(r, 'staff')}", None)),
+    ('GET /api/staff/<id>/teams', 1, False, lambda d, r: ('GET', f"/api/staff/{d.id(r, 'staff')}/teams", None)),
+    ('GET /api/team/<id>/staff', 1, False, lambda d, r: ('GET', f"/api/team/{r.choice(d.crews)}/staff", None)),
+    ('GET /api/assignments', 1, False, lambda d, r: ('GET', f"/api/assignments?crew_id={r.choice(d.crews)}", None)),
+    ('GET /api/assignments/<id>', 0.5, False, lambda d, r: ('GET', f"/api/assignments/{r.randint(1, 1000)}", None)),
+
+    ('GET /api/analytics/area-utilization', 1, False, lambda d, r: ('GET', "/api/analytics/area-utilization", None)),
+    ('GET /api/analytics/waste-by-area', 1, False, lambda d, r: ('GET', "/api/analytics/waste-by-area", None)),
+    ('GET /api/analytics/bins-by-area', 1, False, lambda d, r: ('GET', "/api/analytics/bins-by-area", None)),
+    ('GET /api/analytics/waste-status', 1, False, lambda d, r: ('GET', "/api/analytics/waste-status", None)),
+    ('GET /api/analytics/bill-reconciliation', 1, False, lambda d, r: ('GET', f"/api/analytics/bill-reconciliation?after={d.id(r, 'bills')}&limit=50", None)),
+
+    ('POST /api/waste', 6, True, lambda d, r: ('POST', "/api/waste", waste_body(d, r))),
+    ('POST /api/waste/bulk', 0.5, True, lambda d, r: ('POST', "/api/waste/bulk", [waste_body(d, r) for _ in range(100)])),
+    ('POST /api/bins/readings', 4, True, lambda d, r: ('POST', "/api/bins/readings", [
+        {'bin_id': d.id(r, 'bins'), 'fill_level': r.randint(0, 100)} for _ in range(50)])),
+    ('PUT /api/bins/<id>', 2, True, bin_update),
+    ('POST /api/citizens', 2, True, lambda d, r: ('POST', "/api/citizens", {
+        'name': f"Load Test {d.tag}", 'address': "Road 1", 'contact': d.contact(), 'area_id': r.choice(d.areas)})),
+    ('PUT /api/citizens/<id>', 1, True, citizen_update),
+    ('POST /api/bills', 2, True, lambda d, r: ('POST', "/api/bills", {
+        'bill_number': f"LR-{d.tag}-{d.unique()}", 'amount': round(r.uniform(100, 5000), 2), 'due_date': today(30),
+        'citizen_id': d.id(r, 'citizens')})),
+    ('POST /api/payments', 3, True, lambda d, r: ('POST', "/api/payments", payment_body(d, r))),
+    ('POST /api/schedules', 0.5, True, lambda d, r: ('POST', "/api/schedules", {
+        'area_id': r.choice(d.areas), 'crew_id': r.choice(d.crews), 'schedule_date': today(r.randint(1, 30))})),
+    ('POST /api/schedules/optimize dry run', 0.1, True, lambda d, r: ('POST', "/api/schedules/optimize",
+                                                                     {'from': today(1), 'to': today(7), 'dry_run': True})),
+    ('POST /api/staff', 0.3, True, lambda d, r: ('POST', "/api/staff", {
+        'staff_name': f"Load Test {d.tag}", 'position': 'Collector', 'contact': d.contact()})),
+    ('POST /api/assignments', 0.1, True, lambda d, r: ('POST', "/api/assignments", {
+        'crew_id': r.choice(d.crews), 'staff_id': d.id(r, 'staff'), 'assignment_date': today()})),
+    ('POST /api/crew', 0.1, True, lambda d, r: ('POST', "/api/crew", {
+        'team_name': f"Load Test {d.tag}", 'contact': d.contact(), 'area_id': r.choice(d.areas), 'team_size': 4})),
+    ('POST /api/centers', 0.05, True, lambda d, r: ('POST', "/api/centers", {
+        'location': f"Load Test {d.tag}", 'capacity': 1000})),
+    ('POST /api/areas', 0.02, True, lambda d, r: ('POST', "/api/areas", {
+        'area_name': f"Load Test {d.tag}-{d.unique()}", 'location': "Dhaka", 'population': 1000})),
+    ('POST /api/bills/reconcile', 0, True, lambda d, r: ('POST', "/api/bills/reconcile", None)),
+    ('POST /api/jobs/overdue/run', 0, True, lambda d, r: ('POST', "/api/jobs/overdue/run", None)),
+]
+
+
+def select_operations(only=None, overrides=None, write_ratio=None):
+    """[(name, weight, is_write, build)] after --only, --weight and --write-ratio"""
+    overrides = overrides or {}
+    selected = []
+    for name, weight, is_write, build in OPERATIONS:
+        if only and not any(fnmatch.fnmatchcase(name, pattern) for pattern in only):
+            continue
+        selected.append([name, overrides.get(name, weight), is_write, build])
+    if write_ratio is not None:
+        reads = sum(op[1] for op in selected if not op[2])
+        writes = sum(op[1] for op in selected if op[2])
+        for op in selected:
+            if op[2] and writes:
+                op[1] = op[1] / writes * (reads * write_ratio / (1 - write_ratio) if write_ratio < 1 else 1)
+            elif not op[2] and write_ratio >= 1:
+                op[1] = 0
+    return [tuple(op) for op in selected if op[1] > 0]
+
+
+class Stats:
+    """Latencies and status codes per operation"""
+
+    def __init__(self):
+        self.ops = {}
+
+    def record(self, name, latency, status):
+        op = self.ops.setdefault(name, {'latencies': [], 'statuses': {}})
+        op['latencies'].append(latency)
+        op['statuses'][status] = op['statuses'].get(status, 0) + 1
+
+    @staticmethod
+    def summarize(latencies, statuses, elapsed):
+        latencies = sorted(latencies)
+        count = sum(statuses.values())
+        server_errors = sum(n for s, n in statuses.items() if isinstance(s, int) and s >= 500)
+        transport = sum(n for s, n in statuses.items() if not isinstance(s, int))
+        client_errors = sum(n for s, n in statuses.items() if isinstance(s, int) and 400 <= s < 500)
+        return {
+            'requests': count, 'rps': round(count / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 0.50), 3), 'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            'client_errors': client_errors, 'server_errors': server_errors, 'transport_errors': transport,
+            'error_rate': round((server_errors + transport) / count, 5) if count else 0.0,
+            'statuses': {str(s): n for s, n in sorted(statuses.items(), key=lambda item: str(item[0]))},
+        }
+
+    def results(self, elapsed):
+        operations = {name: self.summarize(op['latencies'], op['statuses'], elapsed)
+                      for name, op in sorted(self.ops.items())}
+        everything = [latency for op in self.ops.values() for latency in op['latencies']]
+        statuses = {}
+        for op in self.ops.values():
+            for status, n in op['statuses'].items():
+                statuses[status] = statuses.get(status, 0) + n
+        return self.summarize(everything, statuses, elapsed), operations
+
+
+async def worker(host, port, timeout, operations, dataset, rng, deadline, measure_from, stats):
+    conn = HTTPConnection(host, port, timeout)
+    names = [op[0] for op in operations]
+    builds = {op[0]: op[3] for op in operations}
+    cum_weights = []
+    total = 0
+    for op in operations:
+        total += op[1]
+        cum_weights.append(total)
+    while time.monotonic() < deadline:
+        name = rng.choices(names, cum_weights=cum_weights)[0]
+        method, path, body = builds[name](dataset, rng)
+        started = time.perf_counter()
+        try:
+            status, _ = await conn.request(method, path, body)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError) as e:
+            status = type(e).__name__
+            await asyncio.sleep(0.05)
+        if time.monotonic() >= measure_from:
+            stats.record(name, time.perf_counter() - started, status)
+    conn.close()
+
+
+async def run_load(args, operations):
+    target = urlsplit(args.url)
+    host, port = target.hostname, target.port or 80
+    setup = HTTPConnection(host, port, args.timeout)
+    dataset = Dataset()
+    await dataset.discover(setup)
+    counts = await get_json(setup, "/api/dashboard-stats")
+    stats = Stats()
+    started = time.monotonic()
+    measure_from = started + args.warmup
+    deadline = measure_from + args.duration
+    await asyncio.gather(*(worker(host, port, args.timeout, operations, dataset, random.Random(args.seed + i),
+                                  deadline, measure_from, stats) for i in range(args.concurrency)))
+    elapsed = time.monotonic() - measure_from
+    try:
+        server = await get_json(setup, "/api/system/stats")
+    except (OSError, RuntimeError, asyncio.TimeoutError, ValueError) as e:
+        server = {'error': str(e)}
+    setup.close()
+    totals, per_operation = stats.results(elapsed)
+    return {'dataset': dict(dataset.summary(), counts=counts), 'elapsed_s': round(elapsed, 3),
+            'totals': totals, 'operations': per_operation, 'server': server}
+
+
+def git_revision():
+    def git(*argv):
+        try:
+            return subprocess.run(['git', *argv], cwd=PROJECT_DIR, capture_output=True, text=True,
+                                  timeout=30).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ''
+    return {'commit': git('rev-parse', 'HEAD') or None, 'branch': git('rev-parse', '--abbrev-ref', 'HEAD') or None,
+            'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def print_table(totals, operations):
+    print(f"\n{'operation':46} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'4xx':>6} {'5xx':>6} {'net':>5}")
+    for name, op in list(operations.items()) + [('TOTAL', totals)]:
+        print(f"{name[:46]:46} {op['requests']:>9} {op['rps']:>8.1f} {op['p50_ms']:>8.1f} {op['p95_ms']:>8.1f} "
+              f"{op['p99_ms']:>8.1f} {op['client_errors']:>6} {op['server_errors']:>6} {op['transport_errors']:>5}")
+
+
+def cmd_run(args):
+    overrides = dict(parse_weight(item) for item in args.weight)
+    operations = select_operations(args.only, overrides, args.write_ratio)
+    if not operations:
+        print("⚠️ No operations selected (see 'load_test.py list')")
+        return 2
+    raise_fd_limit(args.concurrency * 2 + 256)
+    writes = sum(op[1] for op in operations if op[2]) / sum(op[1] for op in operations)
+    print(f"\n{args.concurrency} connections, {args.duration:g}s (+{args.warmup:g}s warm-up), "
+          f"{len(operations)} operations, {writes:.0%} writes, {args.url}")
+    try:
+        result = asyncio.run(run_load(args, operations))
+    except (OSError, RuntimeError) as e:
+        print(f"⚠️ {e}")
+        return 1
+    print_table(result['totals'], result['operations'])
+
+    revision = git_revision()
+    document = {
+        'meta': {'started_at': datetime.now().isoformat(timespec='seconds'), 'url': args.url, **revision,
+                 'label': args.label, 'concurrency': args.concurrency, 'duration_s': args.duration,
+                 'warmup_s': args.warmup, 'seed': args.seed, 'write_ratio': round(writes, 4),
+                 'weights': {name: round(weight, 4) for name, weight, _, _ in operations},
+                 'python': platform.python_version(), 'host': platform.node(), 'cpus': os.cpu_count()},
+        **result,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{(revision['commit'] or 'nogit')[:10]}"
+        f"{'-dirty' if revision['dirty'] else ''}{'-' + args.label if args.label else ''}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2, default=str))
+    print(f"\n✅ Results saved to {output}")
+    return 0 if result['totals']['error_rate'] <= args.max_error_rate else 1
+
+
+def parse_weight(item):
+    name, _, weight = item.rpartition('=')
+    if not name:
+        raise argparse.ArgumentTypeError(f"Expected NAME=WEIGHT, got {item!r}")
+    return name, float(weight)
+
+
+# ===== SMOKE / LIST / COMPARE =====
+
+async def run_smoke(args):
+    target = urlsplit(args.url)
+    conn = HTTPConnection(target.hostname, target.port or 80, args.timeout)
+    dataset = Dataset()
+    await dataset.discover(conn)
+    rng = random.Random(args.seed)
+    failed = 0
+    for name, weight, is_write, build in OPERATIONS:
+        if weight == 0 and not args.all:
+            continue
+        method, path, body = build(dataset, rng)
+        started = time.perf_counter()
+        try:
+            status, data = await conn.request(method, path, body)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+            status, data = type(e).__name__, b''
+        ok = isinstance(status, int) and status < 400 or status == 404 and method == 'GET'
+        failed += not ok
+        detail = '' if ok else f"  {data[:120].decode('utf-8', 'replace')}"
+        print(f"{'✓' if ok else '✗'} {status!s:>4} {(time.perf_counter() - started) * 1000:8.1f} ms  {name}{detail}")
+    conn.close()
+    return failed
+
+
+def cmd_smoke(args):
+    try:
+        failed = asyncio.run(run_smoke(args))
+    except (OSError, RuntimeError) as e:
+        print(f"⚠️ {e}")
+        return 1
+    print(f"\n{'✅ All operations answered' if not failed else f'⚠️ {failed} operation(s) failed'}")
+    return 1 if failed else 0
+
+
+def cmd_list(args):
+    operations = select_operations(args.only, dict(parse_weight(item) for item in args.weight), args.write_ratio)
+    total = sum(op[1] for op in operations) or 1
+    for name, weight, is_write, _ in operations:
+        print(f"{'write' if is_write else 'read ':5} {weight:>7.2f} {weight / total:>7.1%}  {name}")
+    disabled = sorted({op[0] for op in OPERATIONS} - {op[0] for op in operations})
+    if disabled:
+        print(f"\nNot selected (weight 0 or filtered): {', '.join(disabled)}")
+    return 0
+
+
+def cmd_compare(args):
+    base, new = (json.loads(Path(path).read_text()) for path in (args.base, args.new))
+    threshold = args.threshold / 100
+    print(f"\nbase: {base['meta'].get('commit', '?')[:10]} ({base['meta'].get('started_at')})")
+    print(f"new:  {new['meta'].get('commit', '?')[:10]} ({new['meta'].get('started_at')})")
+    print(f"\n{'operation':46} {'req/s':>17} {'p95 ms':>19} {'p99 ms':>19} {'errors':>13}")
+    regressions = []
+    rows = [(name, base['operations'].get(name), op) for name, op in new['operations'].items()]
+    for name, old, op in rows + [('TOTAL', base['totals'], new['totals'])]:
+        if old is None or old['requests'] < args.min_requests or op['requests'] < args.min_requests:
+            continue
+        flags = []
+        if old['rps'] and op['rps'] < old['rps'] * (1 - threshold):
+            flags.append('throughput')
+        for key in ('p95_ms', 'p99_ms'):
+            if op[key] > old[key] * (1 + threshold) and op[key] - old[key] > args.min_ms:
+                flags.append(key[:3])
+        if op['error_rate'] > old['error_rate'] + args.max_error_rate:
+            flags.append('errors')
+        if flags:
+            regressions.append((name, flags))
+        change = lambda a, b: f"{(b - a) / a:+6.0%}" if a else '     -'  # noqa: E731
+        print(f"{name[:46]:46} {op['rps']:>9.1f} {change(old['rps'], op['rps'])} {op['p95_ms']:>11.1f} "
+              f"{change(old['p95_ms'], op['p95_ms'])} {op['p99_ms']:>11.1f} {change(old['p99_ms'], op['p99_ms'])} "
+              f"{op['error_rate']:>12.2%}{'  ⚠️ ' + ', '.join(flags) if flags else ''}")
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} regression(s) beyond {args.threshold:g}%: "
+              f"{', '.join(name for name, _ in regressions)}")
+        return 1
+    print(f"\n✅ No regressions beyond {args.threshold:g}%")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load testing and benchmarks for the API")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_seed = sub.add_parser('seed', help='Top tables up to the given row counts')
+    for table, default in (('areas', 50), ('centers', 10), ('crews', 200), ('staff', 1000), ('citizens', 50000),
+                           ('bins', 20000), ('waste', 1000000), ('bills', 200000), ('payments', 100000),
+                           ('schedules', 10000), ('assignments', 1000)):
+        p_seed.add_argument(f'--{table}', type=int, default=default, help=f"target rows (default {default:,})")
+    p_seed.add_argument('--batch', type=int, default=5000, help='rows per INSERT')
+    p_seed.add_argument('--seed', type=int, default=42, help='random seed')
+    p_seed.set_defaults(func=cmd_seed)
+
+    def add_selection(p):
+        p.add_argument('--only', action='append', help="operation name pattern, e.g. 'GET /api/bills*' (repeatable)")
+        p.add_argument('--weight', action='append', default=[], metavar='NAME=W',
+                       help="override an operation's weight, e.g. 'POST /api/bills/reconcile=0.1'")
+        p.add_argument('--write-ratio', type=float, help='scale write weights to this share of requests (0-1)')
+
+    def add_target(p):
+        p.add_argument('--url', default=DEFAULT_URL, help=f"server to test (default {DEFAULT_URL}; env LOAD_TEST_URL)")
+        p.add_argument('--timeout', type=float, default=30, help='seconds per request')
+        p.add_argument('--seed', type=int, default=42, help='random seed')
+
+    p_run = sub.add_parser('run', help='Drive a mixed workload and save the results')
+    add_target(p_run)
+    add_selection(p_run)
+    p_run.add_argument('--concurrency', type=int, default=32, help='keep-alive connections')
+    p_run.add_argument('--duration', type=float, default=60, help='measured seconds')
+    p_run.add_argument('--warmup', type=float, default=5, help='seconds of traffic before measuring')
+    p_run.add_argument('--label', help='added to the result file name and metadata')
+    p_run.add_argument('--output', help='result file (default benchmarks/<time>-<commit>.json)')
+    p_run.add_argument('--max-error-rate', type=float, default=0.01, help='exit 1 above this 5xx+transport error rate')
+    p_run.set_defaults(func=cmd_run)
+
+    p_smoke = sub.add_parser('smoke', help='Send every operation once and report failures')
+    add_target(p_smoke)
+    p_smoke.add_argument('--all', action='store_true', help='include weight-0 operations (reconcile, job runs)')
+    p_smoke.set_defaults(func=cmd_smoke)
+
+    p_list = sub.add_parser('list', help='Show the operations and their share of the mix')
+    add_selection(p_list)
+    p_list.set_defaults(func=cmd_list)
+
+    p_compare = sub.add_parser('compare', help='Compare two result files; exit 1 on regressions')
+    p_compare.add_argument('base')
+    p_compare.add_argument('new')
+    p_compare.add_argument('--threshold', type=float, default=10, help='percent change that counts as a regression')
+    p_compare.add_argument('--min-ms', type=float, default=1, help='ignore latency changes smaller than this')
+    p_compare.add_argument('--min-requests', type=int, default=50, help='skip operations with fewer requests')
+    p_compare.add_argument('--max-error-rate', type=float, default=0.001, help='tolerated error-rate increase')
+    p_compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args) or 0)
+
+
+if __name__ == "__main__":
+    main()
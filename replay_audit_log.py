@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Audit Log Replay Tool - Rebuild the database from a snapshot plus audit log segments
+
+  python replay_audit_log.py list [--since TS] [--table T]
+  python replay_audit_log.py snapshot
+  python replay_audit_log.py replay [--snapshot FILE] [--since TS] [--table T] [--dry-run | --sql]
+
+A snapshot is a mysqldump taken with --single-transaction while FLUSH TABLES WITH READ
+LOCK holds every commit back, so nothing can land between the audit timestamp recorded in
+its first line and the dump's consistent view. replay applies only audit records stamped
+after that position; replaying onto any other starting point (or with an earlier --since)
+re-applies writes the database already has. Audit records are stamped with the app's
+clock, so take snapshots on the app host; the lock needs the RELOAD privilege.
+"""
+
+import argparse
+import glob
+import heapq
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent.absolute()
+sys.path.insert(0, str(PROJECT_DIR / "backend"))
+
+from audit_log import list_segments, iter_records, format_query_log_entry  # noqa: E402
+
+AUDIT_LOG_DIR = os.environ.get('AUDIT_LOG_DIR', str(PROJECT_DIR / "database" / "audit_log"))
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'waste_management')
+}
+SNAPSHOT_FORMAT = '%Y%m%dT%H%M%S'
+POSITION_HEADER = '-- audit-log-position: '
+
+
+def mysql_cli_args(tool):
+    args = [tool, '-h', DB_CONFIG['host'], '-u', DB_CONFIG['user']]
+    if DB_CONFIG['password']:
+        args.append(f"-p{DB_CONFIG['password']}")
+    return args
+
+
+def snapshot_time(path):
+    """ISO timestamp encoded in a snapshot-<YYYYmmddTHHMMSS>.sql file name, or None"""
+    stem = Path(path).stem
+    try:
+        return datetime.strptime(stem.split('snapshot-', 1)[1], SNAPSHOT_FORMAT).isoformat(timespec='microseconds')
+    except (IndexError, ValueError):
+        return None
+
+
+def snapshot_position(path):
+    """(audit timestamp the snapshot is consistent with, exact?) - from the header line written
+    by cmd_snapshot, or the whole second in the file name for snapshots taken without one"""
+    with open(path) as f:
+        first = f.readline()
+    if first.startswith(POSITION_HEADER):
+        return first[len(POSITION_HEADER):].strip(), True
+    return snapshot_time(path), False
+
+
+def latest_snapshot():
+    snapshots = sorted(glob.glob(os.path.join(AUDIT_LOG_DIR, 'snapshot-*.sql')))
+    return snapshots[-1] if snapshots else None
+
+
+def merged_records(since=None, table=None):
+    """Records from every matching segment, merged into timestamp order"""
+    segments = list_segments(AUDIT_LOG_DIR, since=since, table=table)
+    streams = [iter_records(path) for path in segments]
+    for record in heapq.merge(*streams, key=lambda r: r['ts']):
+        if since and record['ts'] <= since:
+            continue
+        if table and record['table'] != table:
+            continue
+        yield record
+
+
+def cmd_list(args):
+    for path in list_segments(AUDIT_LOG_DIR, since=args.since, table=args.table):
+        print(f"{os.path.basename(path)}  {os.path.getsize(path):>12,} bytes")
+
+
+def cmd_snapshot(args):
+    import mysql.connector
+    os.makedirs(AUDIT_LOG_DIR, exist_ok=True)
+    path = os.path.join(AUDIT_LOG_DIR, f"snapshot-{datetime.now().strftime(SNAPSHOT_FORMAT)}.sql")
+    print(f"📸 Writing snapshot to {path}")
+    lock_conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        cursor = lock_conn.cursor()
+        cursor.execute("SET SESSION lock_wait_timeout = %s", (args.lock_timeout,))
+        cursor.execute("FLUSH TABLES WITH READ LOCK")
+        # Writers that committed just before the lock stamp their audit records right after
+        # commit returns; give them time so every record at or before position is in the dump
+        time.sleep(args.settle)
+        position = datetime.now().isoformat(timespec='microseconds')
+        with open(path, 'w') as out:
+            out.write(f"{POSITION_HEADER}{position}\n")
+            dump = subprocess.Popen(mysql_cli_args('mysqldump') + ['--single-transaction', '--routines',
+                                    '--databases', DB_CONFIG['database']], stdout=subprocess.PIPE, text=True)
+            for line in dump.stdout:
+                out.write(line)
+                # mysqldump opens its consistent snapshot before it dumps the first database
+                if line.startswith('-- Current Database:'):
+                    break
+            cursor.execute("UNLOCK TABLES")
+            lock_conn.close()
+            shutil.copyfileobj(dump.stdout, out, 1024 * 1024)
+            returncode = dump.wait()
+    except mysql.connector.Error as e:
+        print(f"❌ Could not lock the database for a consistent snapshot: {e}")
+        returncode = None
+    finally:
+        if lock_conn.is_connected():
+            lock_conn.close()
+    if returncode != 0:
+        if os.path.exists(path):
+            os.remove(path)
+        if returncode is not None:
+            print("❌ mysqldump failed")
+        return 1
+    print(f"✅ Snapshot complete (replay applies audit records after {position})")
+    return 0
+
+
+def cmd_replay(args):
+    snapshot = args.snapshot or latest_snapshot()
+    since = args.since
+    if snapshot and not since:
+        since, exact = snapshot_position(snapshot)
+        if not exact:
+            print(f"⚠️ {os.path.basename(snapshot)} has no recorded audit position; records from "
+                  f"around {since} may already be in it and would be applied twice")
+
+    if args.sql:
+        for record in merged_records(since, args.table):
+            sys.stdout.write(format_query_log_entry(record['sql'], record['params'], record['op'],
+                                                    record['table'], record['ts']))
+        return 0
+
+    if snapshot and not args.dry_run:
+        print(f"📥 Loading snapshot {snapshot}")
+        with open(snapshot) as f:
+            if subprocess.run(mysql_cli_args('mysql'), stdin=f).returncode != 0:
+                print("❌ Snapshot load failed")
+                return 1
+
+    import mysql.connector
+    conn = None if args.dry_run else mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor() if conn else None
+    applied = failed = 0
+    print(f"🔁 Replaying audit records newer than {since or 'the beginning'}")
+    for record in merged_records(since, args.table):
+        if cursor is None:
+            applied += 1
+            continue
+        try:
+            cursor.execute(record['sql'], record['params'] or None)
+            applied += 1
+        except mysql.connector.Error as e:
+            failed += 1
+            print(f"⚠️ {record['ts']} {record['op']} {record['table']}: {e}")
+        if applied % args.batch == 0:
+            conn.commit()
+    if conn:
+        conn.commit()
+        conn.close()
+    print(f"✅ Replayed {applied} records ({failed} failed){' [dry run]' if args.dry_run else ''}")
+    return 0 if failed == 0 else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit log snapshot and replay tool")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_list = sub.add_parser('list', help='List segments that match the filters')
+    p_list.add_argument('--since', help='ISO timestamp; skip older records')
+    p_list.add_argument('--table', help='Only segments containing this table')
+    p_list.set_defaults(func=cmd_list)
+
+    p_snap = sub.add_parser('snapshot', help='Dump the database to a timestamped snapshot')
+    p_snap.add_argument('--settle', type=float, default=1.0,
+                        help='Seconds to hold the lock before recording the audit position')
+    p_snap.add_argument('--lock-timeout', type=int, default=30,
+                        help='Give up if FLUSH TABLES WITH READ LOCK waits longer than this (seconds)')
+    p_snap.set_defaults(func=cmd_snapshot)
+
+    p_replay = sub.add_parser('replay', help='Load a snapshot and re-apply newer audit records')
+    p_replay.add_argument('--snapshot', help='Snapshot file (default: latest in the audit log directory)')
+    p_replay.add_argument('--since', help='ISO timestamp; overrides the snapshot position')
+    p_replay.add_argument('--table', help='Only replay records for this table')
+    p_replay.add_argument('--batch', type=int, default=1000, help='Commit every N records')
+    p_replay.add_argument('--dry-run', action='store_true', help='Count records without touching the database')
+    p_replay.add_argument('--sql', action='store_true', help='Print records as SQL instead of executing them')
+    p_replay.set_defaults(func=cmd_replay)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args) or 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -67,18 +67,20 @@ fi
 # Also kill any Python processes running Flask (in case they're on different ports)
 pkill -f "backend/app.py" 2>/dev/null || true
 pkill -f "python.*app.py" 2>/dev/null || true
+pkill -f "python3 serve.py" 2>/dev/null || true
 sleep 1
 
-# Step 5: Start Flask server
-echo -e "\n${YELLOW}[4/4]${NC} Starting Flask server..."
+# Step 5: Start the server (prefork workers, one per core; override with BIND / WORKERS)
+echo -e "\n${YELLOW}[4/4]${NC} Starting server..."
 cd "$SCRIPT_DIR"
-python3 backend/app.py > server.log 2>&1 &
+BIND="${BIND:-127.0.0.1:8000}"
+python3 serve.py --bind "$BIND" > server.log 2>&1 &
 SERVER_PID=$!
 
 sleep 4
 
-# Find which port the server is actually running on
-ACTUAL_PORT=$(lsof -i -P -n 2>/dev/null | grep -i "python\|app" | grep LISTEN | awk '{print $9}' | cut -d: -f2 | head -1)
+ACTUAL_PORT="${BIND##*:}"
+kill -0 $SERVER_PID 2>/dev/null || ACTUAL_PORT=""
 
 # Verify server started
 if [ ! -z "$ACTUAL_PORT" ]; then
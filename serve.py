@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Waste Management System - Production Launcher
+Prefork server: one master process owns the listening socket and forks one worker per
+CPU core (see backend/prefork.py). Run from the project root.
+
+    python serve.py --bind 0.0.0.0:8000 --workers 4
+    kill -HUP <master pid>     # zero-downtime rolling reload (picks up new code)
+    kill -TERM <master pid>    # drain in-flight requests and stop
+"""
+import argparse
+import os
+import sys
+
+# Add backend directory to path
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, backend_dir)
+
+from prefork import DEFAULT_BIND, Master
+
+
+def load_app(worker_id):
+    """Import the app inside the worker (after the fork); worker 0 also runs the background jobs"""
+    import app as flask_app
+    if worker_id == 0:
+        flask_app.start_background_jobs()
+    print(f"✅ Worker {worker_id} ready (PID {os.getpid()})")
+    return flask_app.app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the Waste Management System with prefork workers")
+    parser.add_argument('--bind', default=os.environ.get('BIND', DEFAULT_BIND),
+                        help="host:port or unix:/path/to.sock (env BIND)")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WORKERS', 0)) or None,
+                        help="worker processes (env WORKERS, default: one per CPU core)")
+    parser.add_argument('--graceful-timeout', type=float, default=float(os.environ.get('GRACEFUL_TIMEOUT', 30)),
+                        help="seconds a stopping worker may spend finishing its requests")
+    args = parser.parse_args()
+
+    try:
+        Master(load_app, bind=args.bind, workers=args.workers, graceful_timeout=args.graceful_timeout).run()
+    except OSError as e:
+        print(f"❌ Could not bind {args.bind}: {e}")
+        sys.exit(1)
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Waste Management System - ASGI Starter Script
+Runs the app under uvicorn (see backend/asgi.py) instead of the threaded Flask server.
+Run from the project root, like start_app.py.
+"""
+import os
+import sys
+
+# Add backend directory to path
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, backend_dir)
+
+import uvicorn
+
+from prefork import DEFAULT_BIND, parse_bind
+
+if __name__ == '__main__':
+    bind = os.environ.get('BIND', DEFAULT_BIND)
+    _, address = parse_bind(bind)
+    listen = {'uds': address} if isinstance(address, str) else {'host': address[0], 'port': address[1]}
+    print(f"\n✅ Starting Waste Management System (ASGI) on {bind}")
+    
+    # Background jobs are started by the ASGI lifespan handler
+    uvicorn.run('asgi:application', app_dir=backend_dir, backlog=2048,
+                log_level=os.environ.get('ASGI_LOG_LEVEL', 'warning'), **listen)
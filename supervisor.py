@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Waste Management System - Process supervisor
+Runs one or more server children and keeps them up:
+- child stdout/stderr is drained as it arrives (selectors) into one rotating log per child,
+  so a chatty child never blocks on a full pipe
+- exits are noticed the moment SIGCHLD arrives (self-pipe + waitpid), not on the next poll
+- TCP children are probed on GET /healthz over a keep-alive connection; a child that stops
+  answering is restarted, /readyz failures are only logged
+- restarts back off exponentially while a child keeps crashing and reset once it has
+  stayed up for a while
+- per-child restart counters and state are served in Prometheus text format
+
+    python supervisor.py                          # backend/app.py on BIND
+    python supervisor.py --workers 3              # three children on consecutive ports
+    python supervisor.py --command "python serve.py" --no-health
+"""
+
+import argparse
+import http.client
+import logging
+import os
+import selectors
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent.absolute()
+FLASK_APP = PROJECT_DIR / "backend" / "app.py"
+LOG_DIR = Path(os.environ.get('SUPERVISOR_LOG_DIR', PROJECT_DIR / "logs"))
+
+sys.path.insert(0, str(PROJECT_DIR / "backend"))
+from prefork import DEFAULT_BIND, parse_bind
+
+LOG_MAX_BYTES = int(os.environ.get('SUPERVISOR_LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUPS = int(os.environ.get('SUPERVISOR_LOG_BACKUPS', 5))
+CHECK_INTERVAL = float(os.environ.get('SUPERVISOR_CHECK_INTERVAL', 3))
+PROBE_TIMEOUT = float(os.environ.get('SUPERVISOR_PROBE_TIMEOUT', 2))
+# Consecutive failed /healthz probes before a running child is considered hung
+FAILURE_THRESHOLD = int(os.environ.get('SUPERVISOR_FAILURES', 3))
+# Time a freshly started child gets to bind before failed probes count
+STARTUP_GRACE = float(os.environ.get('SUPERVISOR_STARTUP_GRACE', 10))
+BACKOFF_MIN = float(os.environ.get('SUPERVISOR_BACKOFF_MIN', 2))
+BACKOFF_MAX = float(os.environ.get('SUPERVISOR_BACKOFF_MAX', 60))
+# A child that stays up this long resets its backoff
+STABLE_AFTER = float(os.environ.get('SUPERVISOR_STABLE_AFTER', 60))
+STOP_TIMEOUT = float(os.environ.get('SUPERVISOR_STOP_TIMEOUT', 10))
+METRICS_BIND = os.environ.get('SUPERVISOR_METRICS_BIND', '127.0.0.1:9101')
+
+
+def rotating_logger(name, path, console=False):
+    logger = logging.getLogger(f"supervisor.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    formatter = logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+    handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    if console:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(formatter)
+        logger.addHandler(stream)
+    return logger
+
+
+class Prober:
+    """GET requests over one keep-alive connection, reconnecting only after an error"""
+
+    def __init__(self, address, timeout):
+        host, port = address
+        if host in ('0.0.0.0', '::'):
+            host = '127.0.0.1' if host == '0.0.0.0' else '::1'
+        self.host, self.port, self.timeout = host, port, timeout
+        self.conn = None
+
+    def get(self, path):
+        """(status, None) or (None, error)"""
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.conn.request("GET", path, headers={"Connection": "keep-alive"})
+            response = self.conn.getresponse()
+            response.read()
+            if response.will_close:
+                self.close()
+            return response.status, None
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            return None, e
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class Child:
+    """One supervised command and its restart bookkeeping"""
+
+    def __init__(self, name, argv, env, bind=None, health=True):
+        self.name = name
+        self.argv = argv
+        self.env = env
+        self.bind = bind
+        family, address = parse_bind(bind) if bind else (None, None)
+        self.prober = Prober(address, PROBE_TIMEOUT) if health and family in (socket.AF_INET, socket.AF_INET6) else None
+        self.log = rotating_logger(name, LOG_DIR / f"{name}.log")
+        self.process = None
+        self.partial = b''
+        self.started_at = None
+        self.restart_at = None          # monotonic time of the pending restart
+        self.stop_deadline = None       # SIGKILL after this if SIGTERM was ignored
+        self.next_probe = None
+        self.failures = 0
+        self.ready = None
+        self.restarts = 0
+        self.crashes = 0                # consecutive short-lived runs
+        self.backoff = 0.0
+        self.last_exit = None
+
+    @property
+    def running(self):
+        return self.process is not None
+
+    def uptime(self):
+        return time.monotonic() - self.started_at if self.running else 0.0
+
+
+class Supervisor:
+
+    def __init__(self, children, log):
+        self.children = children
+        self.log = log
+        self.stopping = False
+        self.selector = selectors.DefaultSelector()
+        self.lock = threading.Lock()
+        self.wake_r, self.wake_w = socket.socketpair()
+        for sock in (self.wake_r, self.wake_w):
+            sock.setblocking(False)
+        self.selector.register(self.wake_r, selectors.EVENT_READ, None)
+
+    # ----- signals -----
+
+    def install_signals(self):
+        signal.set_wakeup_fd(self.wake_w.fileno(), warn_on_full_buffer=False)
+        # A Python-level handler is needed for SIGCHLD to reach the wakeup fd
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    # ----- children -----
+
+    def start(self, child):
+        env = dict(os.environ, PYTHONUNBUFFERED='1', **child.env)
+        try:
+            process = subprocess.Popen(child.argv, cwd=str(PROJECT_DIR), env=env, stdin=subprocess.DEVNULL,
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                       start_new_session=True)  # own process group for clean shutdown
+        except OSError as e:
+            self.log.info(f"❌ {child.name}: failed to start: {e}")
+            self.schedule_restart(child, crashed=True)
+            return
+        os.set_blocking(process.stdout.fileno(), False)
+        self.selector.register(process.stdout, selectors.EVENT_READ, child)
+        with self.lock:
+            child.process = process
+            child.started_at = time.monotonic()
+            child.restart_at = None
+            child.failures = 0
+            child.ready = None
+        child.next_probe = child.started_at + CHECK_INTERVAL
+        self.log.info(f"✅ {child.name} started (PID: {process.pid})")
+
+    def signal_child(self, child, signum):
+        try:
+            os.killpg(child.process.pid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def stop(self, child, reason):
+        if child.running and child.stop_deadline is None:
+            self.log.info(f"🔄 Stopping {child.name} (PID: {child.process.pid}): {reason}")
+            self.signal_child(child, signal.SIGTERM)
+            child.stop_deadline = time.monotonic() + STOP_TIMEOUT
+
+    def schedule_restart(self, child, crashed):
+        with self.lock:
+            if crashed:
+                child.crashes += 1
+                child.backoff = min(BACKOFF_MIN * 2 ** (child.crashes - 1), BACKOFF_MAX)
+            else:
+                child.crashes = 0
+                child.backoff = BACKOFF_MIN
+            child.restart_at = time.monotonic() + child.backoff
+
+    def reap(self):
+        """Collect every exited child without blocking"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            child = next((c for c in self.children if c.running and c.process.pid == pid), None)
+            if child is not None:
+                self.exited(child, os.waitstatus_to_exitcode(status))
+
+    def exited(self, child, code):
+        self.drain(child, final=True)
+        child.process.returncode = code
+        uptime = child.uptime()
+        intentional = child.stop_deadline is not None
+        with self.lock:
+            child.process = None
+            child.stop_deadline = None
+            child.last_exit = code
+        if child.prober:
+            child.prober.close()
+        if self.stopping:
+            self.log.info(f"✅ {child.name} stopped (status {code})")
+            return
+        with self.lock:
+            child.restarts += 1
+        # Hung children killed on purpose count as crashes too; only a long healthy run resets the backoff
+        self.schedule_restart(child, crashed=uptime < STABLE_AFTER)
+        what = "was stopped" if intentional else "exited"
+        self.log.info(f"⚠️ {child.name} {what} with status {code} after {uptime:.0f}s! "
+                      f"Restart #{child.restarts} in {child.backoff:g}s")
+
+    # ----- output -----
+
+    def drain(self, child, final=False):
+        """Move whatever the child has written into its log, line by line"""
+        stream = child.process.stdout
+        if stream.closed:
+            return
+        while True:
+            try:
+                data = os.read(stream.fileno(), 65536)
+            except BlockingIOError:
+                data = None
+            except OSError:
+                data = b''
+            if not data:
+                break
+            lines = (child.partial + data).split(b'\n')
+            child.partial = lines.pop()
+            for line in lines:
+                child.log.info(line.decode('utf-8', 'replace').rstrip('\r'))
+        if data == b'' or final:
+            if child.partial:
+                child.log.info(child.partial.decode('utf-8', 'replace'))
+                child.partial = b''
+            self.selector.unregister(stream)
+            stream.close()
+
+    # ----- health -----
+
+    def probe(self, child, now):
+        child.next_probe = now + CHECK_INTERVAL
+        if child.prober is None or child.stop_deadline is not None:
+            return
+        status, error = child.prober.get("/healthz")
+        if status == 200:
+            child.failures = 0
+            # Readiness is only reported: restarting won't bring the database back
+            ready_status, _ = child.prober.get("/readyz")
+            if (ready_status == 200) != child.ready:
+                with self.lock:
+                    child.ready = ready_status == 200
+                self.log.info(f"✅ {child.name} ready" if child.ready
+                              else f"⚠️ {child.name} not ready (/readyz: {ready_status})")
+        elif now - child.started_at >= STARTUP_GRACE:
+            child.failures += 1
+            if child.failures >= FAILURE_THRESHOLD:
+                self.stop(child, f"not responding ({error or f'HTTP {status}'})")
+
+    # ----- main loop -----
+
+    def timeout(self, now):
+        deadlines = []
+        for child in self.children:
+            if child.running:
+                deadlines.append(child.stop_deadline or child.next_probe)
+            elif child.restart_at and not self.stopping:
+                deadlines.append(child.restart_at)
+        return max(min(deadlines, default=now + CHECK_INTERVAL) - now, 0)
+
+    def run(self):
+        self.install_signals()
+        for child in self.children:
+            self.start(child)
+        shutting_down = False
+        while True:
+            for key, _ in self.selector.select(self.timeout(time.monotonic())):
+                if key.data is None:
+                    try:
+                        while self.wake_r.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    self.drain(key.data)
+            self.reap()
+            now = time.monotonic()
+            if self.stopping and not shutting_down:
+                shutting_down = True
+                self.log.info("🛑 Supervisor shutdown requested")
+                for child in self.children:
+                    self.stop(child, "shutdown")
+            for child in self.children:
+                if child.running and child.stop_deadline and now >= child.stop_deadline:
+                    self.log.info(f"⚠️ {child.name} ignored SIGTERM; force killing")
+                    self.signal_child(child, signal.SIGKILL)
+                    child.stop_deadline = now + STOP_TIMEOUT
+                elif self.stopping:
+                    continue
+                elif not child.running and child.restart_at and now >= child.restart_at:
+                    self.start(child)
+                elif child.running and now >= child.next_probe:
+                    self.probe(child, now)
+            if shutting_down and not any(child.running for child in self.children):
+                self.log.info("✅ Supervisor stopped cleanly")
+                return
+
+    # ----- metrics -----
+
+    def metrics(self):
+        """Prometheus text exposition of the per-child counters"""
+        series = [
+            ('supervisor_child_restarts_total', 'counter', 'Times the child was restarted', lambda c: c.restarts),
+            ('supervisor_child_up', 'gauge', 'Whether the child process is running', lambda c: int(c.running)),
+            ('supervisor_child_ready', 'gauge', 'Last /readyz result (1 ready, 0 not, -1 unknown)',
+             lambda c: -1 if c.ready is None else int(c.ready)),
+            ('supervisor_child_uptime_seconds', 'gauge', 'Seconds since the child was started', lambda c: round(c.uptime(), 1)),
+            ('supervisor_child_consecutive_crashes', 'gauge', 'Crashes since the child last stayed up', lambda c: c.crashes),
+            ('supervisor_child_backoff_seconds', 'gauge', 'Delay before the pending or last restart', lambda c: c.backoff),
+            ('supervisor_child_last_exit_code', 'gauge', 'Exit status of the last run (negative: signal)',
+             lambda c: c.last_exit if c.last_exit is not None else 0),
+        ]
+        lines = []
+        with self.lock:
+            for name, kind, help_text, value in series:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f'{name}{{child="{c.name}"}} {value(c)}' for c in self.children)
+        return "\n".join(lines) + "\n"
+
+    def serve_metrics(self, bind):
+        family, address = parse_bind(bind)
+        supervisor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = supervisor.metrics().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        if family == socket.AF_UNIX:
+            raise ValueError("the metrics endpoint needs a TCP address")
+        server_class = type('MetricsServer', (ThreadingHTTPServer,), {'address_family': family, 'daemon_threads': True})
+        server = server_class(address, Handler)
+        threading.Thread(target=server.serve_forever, name='supervisor-metrics', daemon=True).start()
+        self.log.info(f"📊 Metrics at http://{bind}/metrics")
+        return server
+
+
+def worker_bind(bind, index):
+    """Bind address of worker `index`: consecutive ports, or a numbered socket path"""
+    family, address = parse_bind(bind)
+    if index == 0:
+        return bind
+    if family == socket.AF_UNIX:
+        return f"unix:{address}.{index}"
+    host = f"[{address[0]}]" if family == socket.AF_INET6 else address[0]
+    return f"{host}:{address[1] + index}"
+
+
+def build_children(args):
+    argv = shlex.split(args.command) if args.command else [sys.executable, str(FLASK_APP)]
+    children = []
+    for index in range(args.workers):
+        bind = worker_bind(args.bind, index)
+        children.append(Child(f"{args.name}-{index}" if args.workers > 1 else args.name, argv,
+                              {'BIND': bind, 'WORKER_ID': str(index)}, bind, health=args.health))
+    return children
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run and supervise the server process(es)")
+    parser.add_argument('--command', help="command to run (default: python backend/app.py)")
+    parser.add_argument('--name', default='web', help="child name, used for its log file and metrics")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SUPERVISOR_WORKERS', 1)),
+                        help="children to run; each gets BIND with the port increased by its index")
+    parser.add_argument('--bind', default=os.environ.get('BIND', DEFAULT_BIND))
+    parser.add_argument('--no-health', dest='health', action='store_false', help="only restart on exit")
+    parser.add_argument('--metrics-bind', default=METRICS_BIND, help="where to serve /metrics ('' to disable)")
+    args = parser.parse_args(argv)
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log = rotating_logger('supervisor', LOG_DIR / "supervisor.log", console=True)
+    children = build_children(args)
+    supervisor = Supervisor(children, log)
+    log.info("=" * 70)
+    log.info("🔍 SUPERVISOR STARTED - Auto-recovery enabled")
+    log.info(f"📁 Project: {PROJECT_DIR}")
+    for child in children:
+        probe = f"probing /healthz every {CHECK_INTERVAL:g}s" if child.prober else "restart on exit only"
+        log.info(f"🧩 {child.name}: {' '.join(child.argv)} on {child.bind} ({probe}), log {LOG_DIR / child.name}.log")
+    log.info("=" * 70)
+    metrics_server = None
+    if args.metrics_bind:
+        try:
+            metrics_server = supervisor.serve_metrics(args.metrics_bind)
+        except (OSError, ValueError) as e:
+            log.info(f"⚠️ Metrics disabled, could not bind {args.metrics_bind}: {e}")
+    try:
+        supervisor.run()
+    finally:
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        log.info("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
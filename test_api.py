@@ -3,11 +3,14 @@
 Test script for Waste Management System API endpoints
 """
 
+import os
 import requests
 import json
 import time
 
-BASE_URL = "http://127.0.0.1:5000"
+# Same address the server binds (BIND, default 127.0.0.1:8000); LOAD_TEST_URL overrides it.
+# For concurrent load and every /api/* route, use load_test.py.
+BASE_URL = os.environ.get('LOAD_TEST_URL', f"http://{os.environ.get('BIND', '127.0.0.1:8000')}")
 
 def test_endpoint(method, endpoint, data=None):
     """Test an API endpoint"""
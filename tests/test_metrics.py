@@ -0,0 +1,38 @@
+"""
+SQL statement fingerprints: batches of different sizes must share one metrics series
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from metrics import statement_key  # noqa: E402
+
+
+def derived_rows(columns, count):
+    """The inline table app.derived_rows builds for count rows"""
+    select = 'SELECT ' + ', '.join(f'%s AS {column}' for column in columns)
+    return ' UNION ALL '.join([select] * count)
+
+
+def test_union_all_batches_share_a_fingerprint():
+    def key(count):
+        rows = derived_rows(('bin_id', 'recorded_at', 'fill_level'), count)
+        return statement_key(f"""INSERT INTO bin_fill_history (bin_id, recorded_at, fill_level)
+                                 SELECT r.bin_id, r.recorded_at, r.fill_level FROM ({rows}) r
+                                 JOIN Bins b ON b.bin_id = r.bin_id""")[0]
+
+    assert key(2) == key(37) == key(1000)
+    assert key(2)[1:] == ('INSERT', 'bin_fill_history')
+
+
+def test_values_and_in_lists_share_a_fingerprint():
+    assert (statement_key("INSERT INTO Bins (a, b) VALUES (%s, %s), (%s, %s)")[0] ==
+            statement_key("INSERT INTO Bins (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)")[0])
+    assert (statement_key("SELECT * FROM Bill WHERE bill_id IN (%s, %s)")[0] ==
+            statement_key("SELECT * FROM Bill WHERE bill_id IN (%s, %s, %s)")[0])
+
+
+def test_different_unions_keep_their_own_fingerprint():
+    assert (statement_key("SELECT a FROM Area UNION ALL SELECT b FROM Crew")[0] !=
+            statement_key("SELECT a FROM Area UNION ALL SELECT c FROM Crew")[0])
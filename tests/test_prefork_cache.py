@@ -0,0 +1,82 @@
+"""
+Cross-process cache invalidation: two forked workers share TABLE_VERSIONS_FILE, so a
+write handled by one makes the other's cached list (and its ETag) stale
+"""
+import json
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+
+
+def worker(conn, data_file):
+    """A prefork-style worker: imports the app after the fork and serves commands from conn"""
+    sys.path.insert(0, BACKEND_DIR)
+    import app as flask_app
+
+    def execute_query(query, params=None, fetch_all=True):
+        with open(data_file) as f:
+            return json.load(f)
+
+    flask_app.execute_query = execute_query
+    client = flask_app.app.test_client()
+    while True:
+        command, arg = conn.recv()
+        if command == 'get':
+            response = client.get('/api/areas-list', headers={'If-None-Match': arg} if arg else {})
+            conn.send((response.status_code, response.headers.get('ETag'), response.get_data(as_text=True)))
+        elif command == 'write':
+            # What execute_update does after committing an INSERT
+            with open(data_file, 'w') as f:
+                json.dump(arg, f)
+            flask_app.notify_table_write('Area', 'INSERT')
+            conn.send(None)
+        else:
+            conn.send(None)
+            return
+
+
+@pytest.fixture
+def workers(tmp_path, monkeypatch):
+    data_file = str(tmp_path / 'areas.json')
+    with open(data_file, 'w') as f:
+        json.dump([{'area_id': 1, 'area_name': 'Gulshan'}], f)
+    monkeypatch.setenv('TABLE_VERSIONS_FILE', str(tmp_path / 'table_versions.bin'))
+    monkeypatch.setenv('SLOW_QUERY_LOG', 'False')
+    monkeypatch.setenv('SLOW_QUERY_FILE', str(tmp_path / 'slow_queries.ndjson'))
+    monkeypatch.setenv('AUDIT_LOG_DIR', str(tmp_path / 'audit_log'))
+    context = multiprocessing.get_context('fork')
+    pipes, processes = [], []
+    for _ in range(2):
+        parent, child = context.Pipe()
+        process = context.Process(target=worker, args=(child, data_file), daemon=True)
+        process.start()
+        pipes.append(parent)
+        processes.append(process)
+
+    def call(index, command, arg=None):
+        pipes[index].send((command, arg))
+        assert pipes[index].poll(60), f"worker {index} did not answer '{command}'"
+        return pipes[index].recv()
+
+    yield call
+    for index, process in enumerate(processes):
+        call(index, 'stop')
+        process.join(10)
+
+
+def test_write_in_one_worker_invalidates_the_other(workers):
+    status, etag, body = workers(1, 'get')
+    assert status == 200 and 'Gulshan' in body
+    assert workers(1, 'get', etag)[0] == 304
+
+    workers(0, 'write', [{'area_id': 1, 'area_name': 'Gulshan'}, {'area_id': 2, 'area_name': 'Banani'}])
+
+    status, new_etag, body = workers(1, 'get', etag)
+    assert status == 200
+    assert 'Banani' in body
+    assert new_etag != etag
+    assert workers(1, 'get', new_etag)[0] == 304